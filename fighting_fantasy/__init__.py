@@ -0,0 +1,16 @@
+"""
+Alasdair Smith
+Started 20/12/2016
+
+The Fighting Fantasy Program
+Tracks character attributes and combat during a Fighting Fantasy Gamebook
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Run with `fighting-fantasy COMMAND` once installed, or
+    python -m fighting_fantasy COMMAND
+(see ff_cli). Nothing is imported here, so importing one of the headless
+    modules (ff_combatengine, ff_oddstable, ff_replay, ff_sessions, ...)
+    never loads tkinter; only the GUI modules import it.
+"""
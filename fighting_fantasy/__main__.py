@@ -0,0 +1,11 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Runs the Fighting Fantasy Program: python -m fighting_fantasy COMMAND (see ff_cli)
+"""
+import sys
+from . import ff_cli
+
+if __name__ == "__main__": #Not when a process pool's worker imports this module again
+    sys.exit(ff_cli.main())
@@ -0,0 +1,176 @@
+"""
+Alasdair Smith
+Started 20/12/2016
+
+Module for the Fighting Fantasy Program
+Defines the Character Object Class, on its own so it can be used without a GUI
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter.
+
+Initial stats are rolled using a 6-sided die as follows:
+    1 roll + 6 for skill
+    1 roll + 6 for luck
+    2 rolls + 12 for stamina
+
+Simulations make and change millions of characters, so a Character has
+    __slots__ and keeps its stats in a fixed-layout array of ints, in
+    STAT_NAMES order. character.stats still works like the old dict of
+    {stat: value}; hot loops can index character.stat_values with SKILL,
+    LUCK, STAMINA and RATIONS instead
+"""
+import array
+import collections.abc
+from . import ff_dice
+
+STAT_NAMES = ("skill", "luck", "stamina", "rations") #The layout of Character.stat_values
+STAT_INDEX = {stat: i for i, stat in enumerate(STAT_NAMES)}
+SKILL, LUCK, STAMINA, RATIONS = range(len(STAT_NAMES))
+DEFAULT_STATS = {"skill": 1, "luck": 1, "stamina": 1, "rations": 0}
+DEFAULT_VALUES = array.array('q', [DEFAULT_STATS[stat] for stat in STAT_NAMES]) #Copied by new characters
+DEFAULT_NAME = "Champion"
+ENEMY_NAME = "Enemy"
+INVENTORY_TEXT = "Items:\n"
+
+class Stats(collections.abc.MutableMapping):
+    """
+    The stats of a Character by name, e.g. stats['skill'], as a view of its
+    stat_values: there's no copy, and only the stats in STAT_NAMES can be set
+    
+    Attributes:
+    array values - the character's stat_values
+    """
+    __slots__ = ('values',)
+    
+    def __init__(self, values):
+        """Makes a view of values (an array of ints in STAT_NAMES order)"""
+        self.values = values
+    
+    def __repr__(self):
+        """For testing"""
+        return repr(dict(self))
+    
+    def __getitem__(self, stat):
+        return self.values[STAT_INDEX[stat]]
+    
+    def __setitem__(self, stat, value):
+        self.values[STAT_INDEX[stat]] = value
+    
+    def __delitem__(self, stat):
+        raise TypeError("Stats can't be removed from a character: {}".format(stat))
+    
+    def __contains__(self, stat):
+        return stat in STAT_INDEX
+    
+    def __iter__(self):
+        return iter(STAT_NAMES)
+    
+    def __len__(self):
+        return len(STAT_NAMES)
+
+class Character:
+    """
+    Defines the Character class for Fighting Fantasy Main Characters
+    
+    Attributes:
+    str   name - the character name, unique identifier
+    array stat_values - the ints of 'skill', 'luck', 'stamina' & 'rations', in
+        STAT_NAMES order
+    obj   stats - Stats: stat_values by name, used like a dict of {stat: value}
+    str   potion - a separate item held by the character, no particular value
+    str   inventory - all other items held by the character, formatted by the player
+    tuple listeners - functions called with (character, field) whenever a field
+        changes, so GUIs only need to update what actually changed. A tuple,
+        so characters nobody listens to share the empty one
+    
+    Methods:
+    change_char_stat: Changes the given stat of the character by the given amount
+    set_stat: Sets the given stat of the character
+    set_detail: Sets the name, potion or inventory of the character
+    roll_stats: Automatically assigns valid stats to the character
+    """
+    __slots__ = ('name', 'stat_values', 'stats', 'potion', 'inventory', 'listeners')
+    
+    def __init__(self, name=DEFAULT_NAME, stats=None, potion=None, inventory=INVENTORY_TEXT):
+        """Initialises the character, based on given data input
+        stats is a dict of {stat: value}, which is copied; any stat missing
+        from it starts at its DEFAULT_STATS value"""
+        self.name = name
+        if stats is None:
+            self.stat_values = DEFAULT_VALUES[:]
+        elif isinstance(stats, Stats):
+            self.stat_values = stats.values[:]
+        else:
+            self.stat_values = array.array('q', [stats.get(stat, DEFAULT_STATS[stat])
+                                                 for stat in STAT_NAMES])
+        self.stats = Stats(self.stat_values)
+        if potion is None:
+            potion = ""
+        self.potion = potion
+        self.inventory = inventory
+        self.listeners = ()
+    
+    def __repr__(self):
+        """For testing"""
+        template = "Name: {}\nStats: {}\nPotion: {}\n"
+        return template.format(self.name, self.stats, self.potion)
+    
+    def add_listener(self, listener):
+        """Calls listener(character, field) whenever a field of this character changes"""
+        self.listeners += (listener,)
+    
+    def remove_listener(self, listener):
+        """Stops calling listener, if it was added"""
+        if listener in self.listeners:
+            listeners = list(self.listeners)
+            listeners.remove(listener)
+            self.listeners = tuple(listeners)
+    
+    def changed(self, field):
+        """Tells all the listeners that field has changed"""
+        for listener in self.listeners:
+            listener(self, field)
+    
+    def change_char_stat(self, stat, amount):
+        """Changes the primary stat given by amount."""
+        if amount:
+            self.stat_values[STAT_INDEX[stat]] += amount
+            if self.listeners:
+                self.changed(stat)
+    
+    def set_stat(self, stat, value):
+        """Sets the primary stat given to value, telling listeners if it changed
+        Returns True if it changed"""
+        i = STAT_INDEX[stat]
+        if self.stat_values[i] == value:
+            return False
+        self.stat_values[i] = value
+        if self.listeners:
+            self.changed(stat)
+        return True
+    
+    def set_detail(self, field, value):
+        """Sets the 'name', 'potion' or 'inventory' of the character to value,
+        telling listeners if it changed. Returns True if it changed"""
+        if getattr(self, field) == value:
+            return False
+        setattr(self, field, value)
+        self.changed(field)
+        return True
+    
+    def roll_stats(self, dice=None):
+        """Assigns valid skill, luck & stamina stats
+        dice is the DiceRoller to use, the default ff_dice stream if None"""
+        if dice is None:
+            dice = ff_dice.roller
+        skill, luck = dice.roll_many(1, 6, 2)
+        self.set_stat('skill', skill + 6)
+        self.set_stat('luck', luck + 6)
+        self.set_stat('stamina', dice.roll(dice=2) + 12)
+
+def make_default_enemy():
+    """Creates a basic enemy Character from global ENEMY_NAME"""
+    return Character(name=ENEMY_NAME)
@@ -3,79 +3,34 @@ Alasdair Smith
 Started 20/12/2016
 
 Module for the Fighting Fantasy Program
-Defines the Character Sheet GUI Class and Character Object Class
+Defines the Character Sheet GUI Class (the Character Object Class is in ff_character)
 
 For Fighting Fantasy Gamebooks:
 Ian Livingstone's Caverns of the White Witch & similar
 
-Inlcudes all global (used by more than one module) global value declarations
-
-Initial stats are rolled using a 6-sided die as follows:
-    1 roll + 6 for skill
-    1 roll + 6 for luck
-    2 rolls + 12 for stamina
+Inlcudes all global (used by more than one module) GUI value declarations,
+    apart from the fonts and images shared through ff_resources
 """
 from tkinter import *
 from tkinter.font import *
 #from tkinter.ttk import * #Can't use because it's buttons don't support fonts
-import ff_extras
-import ff_combatscreen
-import ff_logbook
+from . import ff_logbook
+from . import ff_character
+from . import ff_combatengine
+from . import ff_resources
 
-FONT_FAMILY = "courier" #Use a monospaced font to make things easier
-BIG_FONT = 24    #Standard font size
-MIDDLE_FONT = 16 #For buttons
-SMALL_FONT = 10  #For credits and the logbook
-RATION_RESTORES = 4 #Stamina
-DEFAULT_STATS = {"skill": 1, "luck": 1, "stamina": 1, "rations": 0}
-DEFAULT_NAME = "Champion"
-ENEMY_NAME = "Enemy"
-INVENTORY_TEXT = "Items:\n"
 CREDITS_TEXT = """
 Made by Alasdair Smith (@ealasdair) for the Yogscast Charity Jingle Jam livesteams through December 2017
 
 Started: Dec 2016    Last Edit: Aug 2017
 """
 
-class Character:
-    """
-    Defines the Character class for Fighting Fantasy Main Characters
-    
-    Attributes:
-    str   name - the character name, unique identifier
-    dict  stats - dictionary of ints: {'skill', 'luck', 'stamina', 'rations'}
-    str   potion - a separate item held by the character, no particular value
-    str   inventory - all other items held by the character, formatted by the player
-    
-    Methods:
-    change_char_stat: Changes the given stat of the character by the given amount
-    roll_stats: Automatically assigns valid stats to the character
-    """
-    def __init__(self, name=DEFAULT_NAME, stats=None, potion=None, inventory=INVENTORY_TEXT):
-        """Initialises the character, based on given data input"""
-        self.name = name
-        self.stats = stats
-        self.potion = potion
-        self.inventory = inventory
-        if self.stats is None:
-            self.stats = ff_extras.copy_dict(DEFAULT_STATS)
-        if self.potion is None:
-            self.potion = ""
-    
-    def __repr__(self):
-        """For testing"""
-        template = "Name: {}\nStats: {}\nPotion: {}\n"
-        return template.format(self.name, self.stats, self.potion)
-    
-    def change_char_stat(self, stat, amount):
-        """Changes the primary stat given by amount."""
-        self.stats[stat] += amount
-    
-    def roll_stats(self):
-        """Assigns valid skill, luck & stamina stats"""
-        self.stats['skill'] = ff_extras.roll_dice() + 6
-        self.stats['luck'] = ff_extras.roll_dice() + 6
-        self.stats['stamina'] = ff_extras.roll_dice(dice=2) + 12
+def is_int_text(text):
+    """Returns True if text is a whole number, or could become one with more
+    typing (empty or just '-'). Used to validate stat entries as they're typed"""
+    if text.startswith('-'):
+        text = text[1:]
+    return text == "" or text.isdigit()
 
 class CharacterSheetGui:
     """
@@ -84,6 +39,8 @@ class CharacterSheetGui:
     
     Non-GUI Attributes:
     obj character: Character class object - The GUI is linked to this character
+    obj screens: ff_extras.ScreenManager that swaps between this and the combat screen,
+        and records every action for replays
     str std_val: Empty string with braces to display ints as though at least
         2 digits existed
     
@@ -96,25 +53,34 @@ class CharacterSheetGui:
     eat_ration: reduce rations by 1 and raise stamina by [RATION_RESTORES]
     change_stat: Calls Character.change_char_stat; which changes the given
         stat of the character by the given amount, then refreshes the stat labels
-    update_primary_labels: Catch-all that updates the values of all primary stat labels
+    log_stat_change: Logs a change to one of the character's stats
+    character_changed: Listener marking the widgets of changed character fields
+    mark_dirty: Marks a widget to be updated, and schedules a flush
+    flush: Updates every widget marked since the last flush, once per event loop turn
     auto_stats: Calls Character.roll_stats(), which assigns new valid stats to the
         character, then updates all relevant fields in the GUI
-    update_from_entrys: Updates character attributes from the values of user-input text fields
-    fight_battle: Runs the combat gui
+    entry_edited: Updates a character attribute as soon as its entry is typed in
+    inventory_edited: Updates the character inventory as soon as its text is typed in
+    fight_battle: Swaps to the combat screen
+    battle_over: Updates the screen after a battle
     refresh_logbook: Updates the logbook label
     """
-    def __init__(self, window, character):
+    def __init__(self, window, character, screens):
         """Initialises the class with the character it is representing
-        Then brings up the character sheet window"""
+        Then builds the character sheet in window (a frame of the main window)"""
         self.character = character #This just points self.character at the same place as character (good)
         self.character_window = window
+        self.screens = screens
         self.std_val = '{:2d}' #To display ints as though 2 digits existed
-        self.char_logs = ff_logbook.Logbook()
+        self.char_logs = ff_logbook.Logbook(bounded=True, archive=screens.archive)
+        self.dirty = set() #Fields whose widgets need updating, and 'logs'
+        self.flush_pending = False
         
-        #Set custom fonts
-        self.headerfont = Font(family=FONT_FAMILY, size=BIG_FONT)
-        self.buttonfont = Font(family=FONT_FAMILY, size=MIDDLE_FONT)
-        self.smallfont = Font(family=FONT_FAMILY, size=SMALL_FONT)
+        #Set custom fonts, shared with the other screens
+        self.resources = ff_resources.get_resources(window)
+        self.headerfont = self.resources.font('header')
+        self.buttonfont = self.resources.font('button')
+        self.smallfont = self.resources.font('small')
         
         #Finish by running the main character gui
         self.run_character_gui()
@@ -129,6 +95,10 @@ class CharacterSheetGui:
                   "potion"  : "Potion:",
                   "fight"   : "FIGHT\nBATTLE",
                   "logs"    : "Logbook:",
+                  "history" : "FULL LOG",
+                  "stats"   : "DICE STATS",
+                  "undo"    : "UNDO",
+                  "redo"    : "REDO",
                   "help"    : "More Info",
                   "reroll"  : "REROLL STATS",
                   "clear"   : "CLEAR",
@@ -137,8 +107,9 @@ class CharacterSheetGui:
                   }
         stats_frame_xpad = 20 #x-axis padding for the main stats row
         #ADD (SMALL) IMAGES FOR THE PLUS AND MINUS BUTTONS
-        plus_image = PhotoImage(file='plus.gif')
-        minus_image = PhotoImage(file='minus.gif')
+        #Loaded once and kept by ff_resources, which also stops them being garbage collected
+        plus_image = self.resources.image('plus')
+        minus_image = self.resources.image('minus')
         
         #This block specifies all the different widgets
         #----------------------------------------------------------------------#
@@ -155,8 +126,11 @@ class CharacterSheetGui:
         credits_frame.grid(row=5, column=0, columnspan=5, pady=10)
         
         #NAME SECTION
-        self.name_entry = Entry(title_frame, font=self.headerfont, width=16)
-        self.name_entry.insert(END, self.character.name)
+        #Entries are tied to Tk variables, and any edits go straight to the character
+        self.name_var = StringVar(self.character_window, value=self.character.name)
+        self.name_var.trace_add('write', lambda *args: self.entry_edited('name'))
+        self.name_entry = Entry(title_frame, font=self.headerfont, width=16,
+                                textvariable=self.name_var)
         self.name_entry.grid(row=0, column=0, columnspan=4)
         
         #STAMINA SECTION
@@ -175,12 +149,7 @@ class CharacterSheetGui:
         self.stamina_m_button = Button(stamina_button_frame, image=minus_image,
                                        command=lambda: self.change_stat('stamina', -1))
         self.stamina_m_button.grid(row=1, column=0)
-        
-        #Keep a reference - not sure how these two lines work
-        #but they are necessary to keep the 8 images on the screen
-        #It's something to do with the Python garbage collector
-        self.stamina_p_button.image = plus_image
-        self.stamina_m_button.image = minus_image
+
         
         #SKILL SECTION
         skill_frame = Frame(stats_frame)
@@ -244,8 +213,10 @@ class CharacterSheetGui:
         potion_frame.grid(row=1, column=0, columnspan=3, sticky='w')
         self.potion_label = Label(potion_frame, font=self.headerfont, text=g_text['potion'])
         self.potion_label.grid(row=0, column=0)
-        self.potion_entry = Entry(potion_frame, font=self.headerfont)
-        self.potion_entry.insert(END, self.character.potion)
+        self.potion_var = StringVar(self.character_window, value=self.character.potion)
+        self.potion_var.trace_add('write', lambda *args: self.entry_edited('potion'))
+        self.potion_entry = Entry(potion_frame, font=self.headerfont,
+                                  textvariable=self.potion_var)
         self.potion_entry.grid(row=0, column=1)
         self.clear_potion_button = Button(potion_frame, font=self.buttonfont,
                                           text=g_text['clear'], command=self.clear_potion)
@@ -258,6 +229,8 @@ class CharacterSheetGui:
         self.inventory_text = Text(inventory_frame, font=self.headerfont, height=8, width=32)
         self.inventory_text.grid(row=0, column=0, columnspan=2)
         self.inventory_text.insert(END, self.character.inventory)
+        self.inventory_text.edit_modified(False)
+        self.inventory_text.bind('<<Modified>>', self.inventory_edited)
         self.inventory_scroll = Scrollbar(inventory_frame)
         self.inventory_scroll.grid(row=0, column=2, sticky='nsw')
         self.inventory_scroll.config(command=self.inventory_text.yview)
@@ -280,6 +253,27 @@ class CharacterSheetGui:
                                 width=32, anchor='nw', justify='left')
         self.log_values.grid(row=2, column=0)
         self.log_values['text'] = self.char_logs.__repr__(is_rev=True)
+        self.history_button = Button(logs_frame, font=self.buttonfont, text=g_text['history'],
+                                     command=self.screens.show_history)
+        self.history_button.grid(row=3, column=0)
+        self.stats_button = Button(logs_frame, font=self.buttonfont, text=g_text['stats'],
+                                   command=self.screens.show_stats)
+        self.stats_button.grid(row=4, column=0)
+        undo_frame = Frame(logs_frame)
+        undo_frame.grid(row=5, column=0)
+        self.undo_button = Button(undo_frame, font=self.buttonfont, text=g_text['undo'],
+                                  command=self.screens.undo)
+        self.undo_button.grid(row=0, column=0)
+        self.redo_button = Button(undo_frame, font=self.buttonfont, text=g_text['redo'],
+                                  command=self.screens.redo)
+        self.redo_button.grid(row=0, column=1)
+        
+        #Value labels by stat, for flush
+        self.stat_labels = {"stamina" : self.stamina_value_label,
+                            "skill"   : self.skill_value_label,
+                            "luck"    : self.luck_value_label,
+                            "rations" : self.rations_value_label}
+        self.character.add_listener(self.character_changed)
         
         #CREDITS SECTION
         self.credits_label = Label(credits_frame, font=self.smallfont, text=CREDITS_TEXT)
@@ -290,26 +284,27 @@ class CharacterSheetGui:
     
     def clear_potion(self):
         """Clears the potion entry widget and updates Character attributes"""
-        self.potion_entry.delete(0, 'end')
-        self.update_from_entrys()
+        self.potion_var.set("")
         self.char_logs.add_log(ff_logbook.Log('clear_pot'))
         self.refresh_logbook()
     
     def eat_ration(self):
         """Consume a ration and increase stamina by default value"""
+        ff_combatengine.eat_ration(self.character)
+        self.screens.record(['eat'])
         self.char_logs.add_log(ff_logbook.Log('space'))
-        self.change_stat('stamina', RATION_RESTORES)
-        self.change_stat('rations', -1)
-        self.update_from_entrys()
+        self.log_stat_change('stamina', ff_combatengine.RATION_RESTORES)
+        self.log_stat_change('rations', -1)
         self.char_logs.add_log(ff_logbook.Log('eat', self.character.name))
         self.refresh_logbook()
     
     def roll_luck(self):
         """Determine whether a luck roll was successful"""
-        roll = ff_extras.roll_dice(dice=2) #Is it one or two dice? Neither seem quite right
+        success, roll = ff_combatengine.test_luck(self.character)
+        self.screens.record(['test_luck'])
         self.char_logs.add_log(ff_logbook.Log('space'))
-        if roll <= self.character.stats['luck']:
-            self.change_stat('luck', -1)
+        if success:
+            self.log_stat_change('luck', -1)
             self.char_logs.add_log(ff_logbook.Log('success'))
         else:
             self.char_logs.add_log(ff_logbook.Log('unchanged', "Luck"))
@@ -318,90 +313,97 @@ class CharacterSheetGui:
         self.refresh_logbook()
     
     def change_stat(self, stat, change):
-        """Calls the change_char_stat method of the character,
-        then updates primary labels"""
+        """Calls the change_char_stat method of the character, which marks the
+        stat's label to be updated"""
         self.character.change_char_stat(stat, change)
-        #Should I update all labels or use if statements and only update the one changed?
-        #I prefer the former as it's more of a catch-all and still isn't too taxing
-        self.update_primary_labels()
+        self.screens.record(['change', stat, change])
+        self.log_stat_change(stat, change)
+        self.refresh_logbook()
+    
+    def log_stat_change(self, stat, change):
+        """Logs a change to one of the character's stats"""
         if change >= 0:
             self.char_logs.add_log(ff_logbook.Log("stat_up", stat.title(), change))
         else:
             self.char_logs.add_log(ff_logbook.Log("stat_down", stat.title(), change * -1))
-        self.refresh_logbook()
         
-    def update_primary_labels(self):
-        """Catch-all update of all primary stat labels: Stamina, Skill, Luck & Rations"""
-        self.stamina_value_label['text'] = self.std_val.format(self.character.stats['stamina'])
-        self.skill_value_label['text'] = self.std_val.format(self.character.stats['skill'])
-        self.luck_value_label['text'] = self.std_val.format(self.character.stats['luck'])
-        self.rations_value_label['text'] = self.std_val.format(self.character.stats['rations'])
+    def character_changed(self, character, field):
+        """Listener for the character; marks the widget showing field to be updated"""
+        self.mark_dirty(field)
+    
+    def mark_dirty(self, field):
+        """Marks the widget for field (or 'logs') to be updated, and makes sure a
+        flush happens once the current event has been handled"""
+        self.dirty.add(field)
+        if not self.flush_pending:
+            self.flush_pending = True
+            self.character_window.after_idle(self.flush)
+    
+    def flush(self):
+        """Updates only the widgets marked since the last flush"""
+        self.flush_pending = False
+        dirty = self.dirty
+        self.dirty = set()
+        for field in dirty:
+            if field in self.stat_labels:
+                self.stat_labels[field]['text'] = self.std_val.format(self.character.stats[field])
+            elif field == 'logs':
+                #A bit more fiddling than just changing is_rev is required to get messages
+                #in order when displaying them un-reversed
+                self.log_values['text'] = self.char_logs.__repr__(is_rev=True)
+            elif field == 'name':
+                if self.name_var.get() != self.character.name:
+                    self.name_var.set(self.character.name)
+            elif field == 'potion':
+                if self.potion_var.get() != self.character.potion:
+                    self.potion_var.set(self.character.potion)
+            elif field == 'inventory':
+                if self.inventory_text.get("1.0", "end-1c") != self.character.inventory:
+                    self.inventory_text.delete("1.0", 'end')
+                    self.inventory_text.insert(END, self.character.inventory)
     
     def auto_stats(self):
-        """Calls the roll_stats method of the character, then updates related labels"""
+        """Calls the roll_stats method of the character, which marks the changed labels"""
         self.character.roll_stats()
-        self.update_primary_labels()
-        self.update_from_entrys()
+        self.screens.record(['reroll'])
         self.char_logs.add_log(ff_logbook.Log("new_stats"))
         self.refresh_logbook()
     
-    def update_from_entrys(self):
-        """Takes values from the name, potion and items fields to update their
-        associated character class attributes"""
-        self.character.name = self.name_entry.get()
-        self.character.potion = self.potion_entry.get()
-        #Read as: inventory_text.get(from line 1.0, to end of Text without last char ('\n'))
-        self.character.inventory = self.inventory_text.get("1.0", "end-1c")
+    def entry_edited(self, field):
+        """Trace callback of the name and potion variables; updates the
+        associated character class attribute"""
+        if field == 'name':
+            value = self.name_var.get()
+        else:
+            value = self.potion_var.get()
+        if self.character.set_detail(field, value):
+            self.screens.record(['detail', 0, field, value])
+    
+    def inventory_edited(self, event=None):
+        """Called when the inventory text is edited; updates the character's inventory"""
+        if self.inventory_text.edit_modified():
+            #Read as: inventory_text.get(from line 1.0, to end of Text without last char ('\n'))
+            inventory = self.inventory_text.get("1.0", "end-1c")
+            if self.character.set_detail('inventory', inventory):
+                self.screens.record(['detail', 0, 'inventory', inventory])
+            self.inventory_text.edit_modified(False) #Makes the next edit fire <<Modified>>
     
     def refresh_logbook(self):
-        """Updates the logbook label with the up-to-date logbook"""
-        #A bit more fiddling than just changing is_rev is required to get messages
-        #in order when displaying them un-reversed
-        self.log_values['text'] = self.char_logs.__repr__(is_rev=True)
+        """Marks the logbook label to be updated with the up-to-date logbook"""
+        self.mark_dirty('logs')
     
     def fight_battle(self):
-        """Ensures consistency between the character attributes and displayed information,
-        then runs the main combat gui, using a function outside of the class"""
-        
-        #Ensure all Character attributes are correct
-        self.update_from_entrys()
-        
-        #Destroy the window
-        self.character_window.destroy()
-        
-        #Do the fight and get the window back; I beleive self.character is still
-        #just a reference to the original character object passed to __init__()
-        external_fight(self.character, None)
+        """Swaps this screen for the combat screen in the same window
+        The character attributes are already up to date with every entry"""
         
-        #I want as little of the old gui class object as possible to be saved in memory
-        #But I'm not sure how to do that :/        
-        #This method of course ends up being a recursive process
-        #print("END OF CLASS")
-
-def external_fight(player1, player2):
-    """It is 'external' cos it is outside of the CharacterSheetGui class object that calls it.
-    Runs the combat gui with the two characters specified. player2 is a standard enemy if None.
-    Afterwards it brings up a new CharacterSheetGui with the updated player1.
-    
-    Currently the updated player2 is ignored, but some framework exists for a potential
-    combat between two 'main' characters
-    """
-    #Do the fight
-    ff_combatscreen.run_combat_gui(player1, player2)
+        #The screen manager hides this screen and shows the combat screen,
+        #then calls battle_over() when the fight ends. Nothing is rebuilt
+        self.screens.show_combat(self.character, None)
     
-    #Get the window back again (Well actually make a new one with the saved character)
-    #This could potentially overextend the memory, depending on how much of the old classes are kept
-    new_characterwindow = Tk()
-    new_character_gui = CharacterSheetGui(new_characterwindow, player1)
-    new_character_gui.char_logs.add_log(ff_logbook.Log('space'))
-    new_character_gui.char_logs.add_log(ff_logbook.Log('refresh'))
-    new_character_gui.char_logs.add_log(ff_logbook.Log('battle', player1.name))
-    new_character_gui.refresh_logbook()
-    new_characterwindow.mainloop()
-
-def main():
-    """Starts the entire program"""
-    if __name__ == "__main__":
-        ff_extras.run_code()
-
-main()
\ No newline at end of file
+    def battle_over(self):
+        """Logs the battle. Any changes to the character on the combat screen
+        have already been marked by character_changed"""
+        self.char_logs.add_log(ff_logbook.Log('space'))
+        self.char_logs.add_log(ff_logbook.Log('refresh'))
+        self.char_logs.add_log(ff_logbook.Log('battle', self.character.name))
+        self.refresh_logbook()
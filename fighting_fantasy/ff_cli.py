@@ -0,0 +1,186 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the command line entry point - `fighting-fantasy` once installed, or
+    python -m fighting_fantasy
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Does not import tkinter until the gui command opens a window.
+
+Commands:
+    gui [--overlay] [--profile] [--seed N] [--session NAME]
+                                                     - the whole program
+    sessions                                         - list the saved sessions
+    sim --player SKILL STAMINA --enemy SKILL STAMINA [--trials N] [--seed N]
+                                                     - simulate many fights
+    odds --player SKILL STAMINA --enemy SKILL STAMINA
+                                                     - exact odds of a fight
+    odds --build                                     - (re)build the odds table
+    replay [PATH] [--to N]                           - replay a recording
+    play SCRIPT [--runs N] [--seed N] [--workers N]  - playthroughs of a script
+Every command takes --data-dir DIR first, to keep the program's files in DIR
+    instead of the usual data directory (see ff_files)
+Each command only imports the modules it needs when it runs, so sim, odds,
+    replay and play start without loading any of the GUI (see ff_importcheck)
+"""
+import argparse
+import sys
+
+SIM_TRIALS = 10000 #Fights simulated by the sim command unless --trials is given
+PLAY_RUNS = 10000 #Playthroughs played by the play command unless --runs is given
+
+def run_gui(args):
+    """The gui command: opens the program's window"""
+    if args.session is not None:
+        from . import ff_sessions
+        if not ff_sessions.NAME_PATTERN.fullmatch(args.session):
+            print("Session names can only have letters, numbers, _ and -", file=sys.stderr)
+            return 1
+    from . import ff_extras #Imports tkinter
+    ff_extras.run_code(overlay_on=args.overlay or None, seed=args.seed,
+                       profile_on=args.profile or None, session_name=args.session)
+    return 0
+
+def run_sessions(args):
+    """The sessions command: lists the sessions saved by gui --session"""
+    from . import ff_sessions
+    host = ff_sessions.SessionHost()
+    names = host.names()
+    if not names:
+        print("No sessions in {}".format(host.directory))
+    for name in names:
+        try:
+            player = host.get(name).game.player
+        except (KeyError, ValueError) as error:
+            print("{}: can't load ({})".format(name, error))
+            continue
+        print("{}: {} (skill {}, stamina {}, luck {})".format(
+            name, player.name, player.stats['skill'], player.stats['stamina'], player.stats['luck']))
+    return 0
+
+def run_sim(args):
+    """The sim command: prints the outcome of many simulated fights"""
+    from . import ff_character
+    from . import ff_combatengine
+    player = ff_character.Character(stats={'skill': args.player[0], 'stamina': args.player[1]})
+    enemy = ff_character.Character(name=ff_character.ENEMY_NAME,
+                                   stats={'skill': args.enemy[0], 'stamina': args.enemy[1]})
+    result = ff_combatengine.simulate(player, enemy, args.trials, seed=args.seed)
+    print(result, end="")
+    return 0
+
+def run_odds(args):
+    """The odds command: prints the exact odds of a fight, or builds the odds table"""
+    from . import ff_oddstable
+    if args.build:
+        from . import ff_files
+        ff_oddstable.build_table()
+        print("Odds table written to {}".format(ff_files.data_path(ff_oddstable.ODDS_FILE)))
+        return 0
+    win_chance, rounds = ff_oddstable.fight_odds(args.player[0] - args.enemy[0],
+                                                 args.player[1], args.enemy[1])
+    print("Win chance: {:.4f}\nExpected rounds: {:.2f}".format(win_chance, rounds))
+    return 0
+
+def run_replay(args):
+    """The replay command: replays a recording and prints where it got to"""
+    from . import ff_files
+    from . import ff_replay
+    try:
+        recording = ff_replay.load_recording(args.path or ff_files.data_path(ff_replay.RECORDING_FILE))
+    except (OSError, ValueError) as error:
+        print("Can't load recording: {}".format(error), file=sys.stderr)
+        return 1
+    index = len(recording) if args.to is None else args.to
+    try:
+        session = recording.seek(index)
+    except IndexError as error:
+        print(error, file=sys.stderr)
+        return 1
+    print("Action {} of {}".format(index, len(recording)))
+    print(session.player, end="")
+    if session.melee is not None:
+        for enemy in session.melee.fighters[session.melee.n_players:]:
+            print(enemy, end="")
+    return 0
+
+def run_play(args):
+    """The play command: plays a script many times, printing the survival
+    curve so far as each chunk of playthroughs comes back"""
+    from . import ff_playthrough
+    try:
+        script = ff_playthrough.load_script(args.script)
+    except (OSError, ValueError) as error:
+        print("Can't load script: {}".format(error), file=sys.stderr)
+        return 1
+    results = None
+    for results in ff_playthrough.run_playthroughs(script, args.runs, args.seed, args.workers):
+        print("{}/{} playthroughs: {:.2%} survived".format(results.n_runs, args.runs,
+                                                           results.survival()[-1]), flush=True)
+    if results is not None:
+        print(results, end="")
+        print("Rations eaten: {}\nLuck tests: {}".format(results.rations_eaten, results.luck_tests))
+    return 0
+
+def make_parser():
+    """Returns the ArgumentParser of every command"""
+    parser = argparse.ArgumentParser(prog="fighting-fantasy",
+                                     description="Character sheet and combat for Fighting Fantasy gamebooks")
+    parser.add_argument("--data-dir", metavar="DIR",
+                        help="keep the odds table, journal, history and sessions in DIR (see ff_files)")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+
+    gui = commands.add_parser("gui", help="open the character sheet and combat screen")
+    gui.add_argument("--overlay", action="store_true", help="serve the stream overlay (see ff_overlay)")
+    gui.add_argument("--profile", action="store_true",
+                     help="time every button and the event loop (F12 shows them, see ff_profiler)")
+    gui.add_argument("--seed", type=int, help="seed for the dice (random if not given)")
+    gui.add_argument("--session", metavar="NAME",
+                     help="play the session NAME, starting it if it's new (F9 switches, see ff_sessions)")
+    gui.set_defaults(run=run_gui)
+
+    sessions = commands.add_parser("sessions", help="list the sessions saved by gui --session")
+    sessions.set_defaults(run=run_sessions)
+
+    sim = commands.add_parser("sim", help="simulate many fights, without luck checks")
+    sim.add_argument("--player", type=int, nargs=2, metavar=("SKILL", "STAMINA"), required=True)
+    sim.add_argument("--enemy", type=int, nargs=2, metavar=("SKILL", "STAMINA"), required=True)
+    sim.add_argument("--trials", type=int, default=SIM_TRIALS, help="number of fights")
+    sim.add_argument("--seed", type=int, help="seed for the dice (random if not given)")
+    sim.set_defaults(run=run_sim)
+
+    odds = commands.add_parser("odds", help="exact odds of a fight, without luck checks")
+    odds.add_argument("--player", type=int, nargs=2, metavar=("SKILL", "STAMINA"))
+    odds.add_argument("--enemy", type=int, nargs=2, metavar=("SKILL", "STAMINA"))
+    odds.add_argument("--build", action="store_true", help="(re)build the odds table instead")
+    odds.set_defaults(run=run_odds)
+
+    replay = commands.add_parser("replay", help="replay a recording without a GUI")
+    replay.add_argument("path", nargs="?",
+                        help="the recording (default: ff_replay.RECORDING_FILE in the data directory)")
+    replay.add_argument("--to", type=int, metavar="N", help="stop after N actions (default: all)")
+    replay.set_defaults(run=run_replay)
+
+    play = commands.add_parser("play", help="play a script of encounters many times (see ff_playthrough)")
+    play.add_argument("script", help="the script, JSON (or YAML with PyYAML installed)")
+    play.add_argument("--runs", type=int, default=PLAY_RUNS, help="number of playthroughs")
+    play.add_argument("--seed", type=int, help="seed for the dice (random if not given)")
+    play.add_argument("--workers", type=int, help="worker processes (default: one per CPU, 1 for none)")
+    play.set_defaults(run=run_play)
+    return parser
+
+def main(argv=None):
+    """Runs the command given in argv (sys.argv if None), returning the exit status"""
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.command == "odds" and not args.build and (args.player is None or args.enemy is None):
+        parser.error("odds needs --player and --enemy, or --build")
+    if args.data_dir is not None:
+        from . import ff_files
+        ff_files.set_data_dir(args.data_dir)
+    return args.run(args)
@@ -0,0 +1,523 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the combat rules on their own, with no GUI attached - used by the
+    combat screen and by simulations that fight many battles at once
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter, so it can be used without a display.
+
+Two dice rolls + skill level = attack value
+Character with lowest attack value takes STD_DMG damage, this ends the 'round'
+Tie if equal attack value - ends 'round' with no damage
+Can do luck check after a 'round' which (if successful) either reduces damage
+taken or increases damage done by CHANGE_ON_LUCK
+"""
+import functools
+from . import ff_character
+from . import ff_dice
+
+numpy = None #Imported by load_numpy() when a simulation first needs it, as it's slow to import
+_numpy_tried = False
+
+CHANGE_ON_LUCK = 1 #This amount is added to or subtracted from the damage done,
+                   #based on luck roll and situation
+STD_DMG = 2 #Amount of damage taken on a round loss
+RATION_RESTORES = 4 #Stamina
+MAX_ROUNDS = 1000 #Simulated fights still going after this many rounds are stopped
+SOLVE_DEPTH = 200 #Most rounds fight_odds solves by plain recursion
+POLICY_STAMINA = 30 #Luck policy tables cover at least this much stamina on each side
+POLICY_LUCK = 12    #and at least this much luck; they grow when bigger stats show up
+TARGET_RULES = ('together', 'one_at_a_time', 'spread') #See Melee
+
+def get_attack(skill, dice=None):
+    """Returns attack power and the two dice rolled, for a character with the given skill
+    dice is the DiceRoller to use, the default ff_dice stream if None"""
+    if dice is None:
+        dice = ff_dice.roller
+    roll1 = dice.roll()
+    roll2 = dice.roll()
+    return roll1 + roll2 + skill, roll1, roll2
+
+def round_result(p_power, e_power):
+    """Returns "p_win", "e_win" or "draw" for the two attack powers given"""
+    if p_power > e_power:
+        return 'p_win'
+    elif p_power < e_power:
+        return 'e_win'
+    return 'draw'
+
+def fight_round(player, enemy, dice=None):
+    """Fights one round between the player and enemy Characters, taking STD_DMG
+    stamina off whoever loses.
+    Returns the result of the round and each character's (power, roll1, roll2)"""
+    p_attack = get_attack(player.stat_values[ff_character.SKILL], dice)
+    e_attack = get_attack(enemy.stat_values[ff_character.SKILL], dice)
+    result = round_result(p_attack[0], e_attack[0])
+    if result == 'p_win':
+        enemy.change_char_stat('stamina', STD_DMG * -1)
+    elif result == 'e_win':
+        player.change_char_stat('stamina', STD_DMG * -1)
+    return result, p_attack, e_attack
+
+def luck_check(player, enemy, last_round, dice=None):
+    """Makes a luck roll for the player after a won or lost round.
+    On a success the player loses 1 luck and the damage of the last round is
+    changed by CHANGE_ON_LUCK in the player's favour
+    Returns whether the roll succeeded, and the roll itself"""
+    if last_round not in ('p_win', 'e_win'):
+        raise ValueError("Cannot do luck check after round result: {}".format(last_round))
+    if dice is None:
+        dice = ff_dice.roller
+    roll = dice.roll(dice=2)
+    success = roll <= player.stat_values[ff_character.LUCK]
+    if success:
+        player.change_char_stat('luck', -1)
+        if last_round == 'e_win':
+            player.change_char_stat('stamina', CHANGE_ON_LUCK)
+        else:
+            enemy.change_char_stat('stamina', CHANGE_ON_LUCK * -1)
+    return success, roll
+
+@functools.lru_cache(maxsize=None)
+def luck_odds(luck):
+    """Returns the chance that a luck check with the given luck stat succeeds"""
+    return min(1.0, sum(chance for total, chance in ff_dice.roll_distribution(dice=2).items()
+                        if total <= luck))
+
+def eat_ration(character):
+    """Consumes one of the character's rations, raising stamina by RATION_RESTORES"""
+    character.change_char_stat('stamina', RATION_RESTORES)
+    character.change_char_stat('rations', -1)
+
+def test_luck(character, dice=None):
+    """A luck test outside of combat: succeeds if a 2 dice roll is no more than
+    the character's luck, which then goes down by 1
+    Returns whether the roll succeeded, and the roll itself"""
+    if dice is None:
+        dice = ff_dice.roller
+    roll = dice.roll(dice=2)
+    success = roll <= character.stat_values[ff_character.LUCK]
+    if success:
+        character.change_char_stat('luck', -1)
+    return success, roll
+
+def melee_result(hits, i):
+    """Returns how the round went for fighter i, given the melee round's hits:
+    "e_win" if i was hit, otherwise "p_win" if i hit their target, or "draw"
+    (so a luck check after it works just as after a one-on-one round)"""
+    if any(target == i for attacker, target in hits):
+        return 'e_win'
+    if any(attacker == i for attacker, target in hits):
+        return 'p_win'
+    return 'draw'
+
+class Melee:
+    """
+    A fight between a side of players and a side of enemies, with any number on
+    each side
+    
+    Every round, each fighter attacks their target: all of the round's dice are
+    rolled in one batch, and if a fighter's attack power beats their target's,
+    the target takes STD_DMG damage. Someone attacked by a fighter they aren't
+    targeting themselves only defends - beating that attacker does no damage.
+    With one player and one enemy this is an ordinary round, with the same dice.
+    
+    Targeting rules (TARGET_RULES), for which enemies fight:
+        together - every enemy fights at once, as in "fight them at the same time"
+        one_at_a_time - only the first enemy still standing fights
+        spread - every enemy fights, shared out between the players in turn
+    Players attack the enemy chosen with set_target() while it's fighting,
+    otherwise the first enemy fighting (who then becomes their choice).
+    Enemies attack the first player standing, apart from under spread
+    
+    Attributes:
+    list fighters - Characters: the players, then the enemies
+    int  n_players - how many of fighters are players
+    str  rule - one of TARGET_RULES
+    dict chosen - {player index: index of the enemy they chose to attack}
+    list targets - targets[i] is the index of who fighter i attacks this
+        round, None if they aren't fighting
+    """
+    def __init__(self, players, enemies, rule='together'):
+        """Sets up the fight between the lists of player and enemy Characters"""
+        self.fighters = list(players) + list(enemies)
+        self.n_players = len(players)
+        self.chosen = {}
+        self.targets = [None] * len(self.fighters)
+        self.set_rule(rule)
+    
+    def standing(self, i):
+        """Returns True if fighter i has stamina left"""
+        return self.fighters[i].stat_values[ff_character.STAMINA] > 0
+    
+    def over(self):
+        """Returns True once either side has no one standing"""
+        return (not any(self.standing(i) for i in range(self.n_players)) or
+                not any(self.standing(i) for i in range(self.n_players, len(self.fighters))))
+    
+    def target(self, player=0):
+        """Returns the index of the enemy the player (index) attacks, or last
+        attacked if they're not fighting now"""
+        if self.targets[player] is not None:
+            return self.targets[player]
+        return self.chosen.get(player, self.n_players)
+    
+    def set_target(self, player, enemy):
+        """Makes the player (index) attack the enemy (index) whenever it's fighting"""
+        self.chosen[player] = enemy
+        self.assign_targets()
+    
+    def set_rule(self, rule):
+        """Changes the targeting rule, from the next round"""
+        if rule not in TARGET_RULES:
+            raise ValueError("Unknown targeting rule: {}".format(rule))
+        self.rule = rule
+        self.assign_targets()
+    
+    def add_enemy(self, enemy):
+        """Adds an enemy Character to the fight, returning its index"""
+        self.fighters.append(enemy)
+        self.targets.append(None)
+        self.assign_targets()
+        return len(self.fighters) - 1
+    
+    def remove_enemy(self, i):
+        """Takes the enemy at index i out of the fight; later enemies move down one"""
+        if i < self.n_players:
+            raise ValueError("Fighter {} is not an enemy".format(i))
+        del self.fighters[i]
+        del self.targets[i]
+        self.chosen = {player: enemy - (enemy > i) for player, enemy in self.chosen.items()
+                       if enemy != i}
+        self.assign_targets()
+    
+    def assign_targets(self):
+        """Works out who attacks whom this round, by the targeting rule"""
+        players = [i for i in range(self.n_players) if self.standing(i)]
+        enemies = [i for i in range(self.n_players, len(self.fighters)) if self.standing(i)]
+        if self.rule == 'one_at_a_time':
+            enemies = enemies[:1]
+        self.targets = [None] * len(self.fighters)
+        if not players or not enemies:
+            return
+        for player in players:
+            chosen = self.chosen.get(player)
+            self.targets[player] = chosen if chosen in enemies else enemies[0]
+        for k, enemy in enumerate(enemies):
+            if self.rule == 'spread':
+                self.targets[enemy] = players[k % len(players)]
+            else:
+                self.targets[enemy] = players[0]
+    
+    def fight_round(self, dice=None):
+        """Fights one round, taking STD_DMG stamina off everyone hit.
+        Returns {fighter index: (power, roll1, roll2)} of everyone who attacked,
+        and the list of hits as (attacker index, target index)"""
+        if dice is None:
+            dice = ff_dice.roller
+        self.assign_targets()
+        fighting = [i for i, target in enumerate(self.targets) if target is not None]
+        faces = dice.roll_many(1, 6, len(fighting) * 2)
+        attacks = {}
+        for k, i in enumerate(fighting):
+            roll1, roll2 = faces[k * 2], faces[k * 2 + 1]
+            attacks[i] = (roll1 + roll2 + self.fighters[i].stat_values[ff_character.SKILL], roll1, roll2)
+        for i in range(self.n_players):
+            if self.targets[i] is not None:
+                self.chosen[i] = self.targets[i]
+        hits = [(i, self.targets[i]) for i in fighting
+                if attacks[i][0] > attacks[self.targets[i]][0]]
+        for attacker, target in hits: #After all the attacks, as they happen at once
+            self.fighters[target].change_char_stat('stamina', STD_DMG * -1)
+        return attacks, hits
+
+@functools.lru_cache(maxsize=None)
+def attack_difference_odds(skill_diff):
+    """Returns the probabilities (p_win, e_win, draw) of a single round, where
+    skill_diff is the player's skill minus the enemy's skill"""
+    #Each 2d6 total from 2 to 12 can be made in 6 - |total - 7| ways
+    ways = [(total, 6 - abs(total - 7)) for total in range(2, 13)]
+    p_win = e_win = draw = 0
+    for p_total, p_ways in ways:
+        for e_total, e_ways in ways:
+            power_diff = p_total + skill_diff - e_total
+            if power_diff > 0:
+                p_win += p_ways * e_ways
+            elif power_diff < 0:
+                e_win += p_ways * e_ways
+            else:
+                draw += p_ways * e_ways
+    return p_win / 1296, e_win / 1296, draw / 1296
+
+def fight_odds(skill_diff, p_stamina, e_stamina):
+    """Returns the exact chance the player wins and the expected number of rounds
+    left, for a fight without luck checks from the given staminas.
+    skill_diff is the player's skill minus the enemy's skill
+    
+    Each round only depends on skill_diff and the two staminas, so the fight is
+    a small Markov chain; draws are left out as they don't change the state"""
+    if p_stamina > 0 and e_stamina > 0 and (p_stamina + e_stamina) // STD_DMG > SOLVE_DEPTH:
+        #Solve the smaller fights first, from the lowest staminas up, so every
+        #one is only a single step of recursion from fights already solved
+        for p in range((p_stamina - 1) % STD_DMG + 1, p_stamina + 1, STD_DMG):
+            for e in range((e_stamina - 1) % STD_DMG + 1, e_stamina + 1, STD_DMG):
+                solve_fight(skill_diff, p, e)
+    return solve_fight(skill_diff, p_stamina, e_stamina)
+
+@functools.lru_cache(maxsize=None)
+def solve_fight(skill_diff, p_stamina, e_stamina):
+    """fight_odds() by recursion, which is only safe to call directly for
+    fights of up to SOLVE_DEPTH rounds"""
+    if e_stamina <= 0:
+        return 1.0, 0.0
+    if p_stamina <= 0:
+        return 0.0, 0.0
+    p_win, e_win, draw = attack_difference_odds(skill_diff)
+    decisive = p_win + e_win
+    win_after_p, rounds_after_p = solve_fight(skill_diff, p_stamina, e_stamina - STD_DMG)
+    win_after_e, rounds_after_e = solve_fight(skill_diff, p_stamina - STD_DMG, e_stamina)
+    win_chance = (p_win * win_after_p + e_win * win_after_e) / decisive
+    rounds = (1 + p_win * rounds_after_p + e_win * rounds_after_e) / decisive
+    return win_chance, rounds
+
+class LuckPolicy:
+    """
+    When testing luck after a round is worth it, for one skill difference
+    
+    Luck checks only ever help the player in this ruleset, but a success costs
+    1 luck, making later checks less likely to succeed. The table of win
+    chances over (p_stamina, e_stamina, luck) is filled in once by value
+    iteration, picking the better of testing and not testing after every round.
+    Every move lowers a stamina, so sweeping the states from the lowest
+    staminas upwards settles each value in a single pass
+    
+    Attributes:
+    int  skill_diff - the player's skill minus the enemy's skill
+    int  max_stamina - the highest stamina (on either side) in the table
+    int  max_luck - the highest luck in the table
+    list values - values[p][e][luck] is the win chance at the start of a round
+    """
+    def __init__(self, skill_diff, max_stamina=POLICY_STAMINA, max_luck=POLICY_LUCK):
+        """Builds the table of win chances for the given skill difference"""
+        self.skill_diff = skill_diff
+        self.max_stamina = max_stamina
+        self.max_luck = max_luck
+        p_win, e_win, draw = attack_difference_odds(skill_diff)
+        decisive = p_win + e_win
+        self.values = [[[0.0] * (max_luck + 1) for e in range(max_stamina + 1)]
+                       for p in range(max_stamina + 1)]
+        for p in range(1, max_stamina + 1):
+            for e in range(1, max_stamina + 1):
+                for luck in range(max_luck + 1):
+                    after_p_win = self.best_after_round('p_win', p, e - STD_DMG, luck)[1]
+                    after_e_win = self.best_after_round('e_win', p - STD_DMG, e, luck)[1]
+                    self.values[p][e][luck] = (p_win * after_p_win + e_win * after_e_win) / decisive
+    
+    def win_chance(self, p_stamina, e_stamina, luck):
+        """Returns the chance of winning from the start of a round, testing luck
+        whenever it is worth it"""
+        if e_stamina <= 0:
+            return 1.0
+        if p_stamina <= 0:
+            return 0.0
+        return self.values[p_stamina][e_stamina][max(luck, 0)]
+    
+    def best_after_round(self, last_round, p_stamina, e_stamina, luck):
+        """Returns whether to test luck and the resulting win chance, just after a
+        round with the given result, once its damage has been taken"""
+        keep = self.win_chance(p_stamina, e_stamina, luck)
+        success = luck_odds(luck)
+        if last_round == 'p_win':
+            lucky = self.win_chance(p_stamina, e_stamina - CHANGE_ON_LUCK, luck - 1)
+        else:
+            lucky = self.win_chance(p_stamina + CHANGE_ON_LUCK, e_stamina, luck - 1)
+        test = success * lucky + (1 - success) * keep
+        if test > keep:
+            return True, test
+        return False, keep
+    
+    def covers(self, p_stamina, e_stamina, luck):
+        """Returns whether the given stats (after a round) fit in the table"""
+        return (max(p_stamina + CHANGE_ON_LUCK, e_stamina) <= self.max_stamina
+                and luck <= self.max_luck)
+    
+    def should_test_luck(self, last_round, p_stamina, e_stamina, luck):
+        """Returns True if testing luck now, after a won or lost round, raises
+        the player's chance of winning"""
+        if last_round not in ('p_win', 'e_win') or e_stamina <= 0:
+            return False
+        return self.best_after_round(last_round, p_stamina, e_stamina, luck)[0]
+
+_luck_policies = {} #LuckPolicy tables already built, by skill difference
+
+def get_luck_policy(skill_diff, p_stamina=0, e_stamina=0, luck=0):
+    """Returns the LuckPolicy for skill_diff, only building a new table the
+    first time a skill difference is seen or when the stats outgrow the old table"""
+    policy = _luck_policies.get(skill_diff)
+    if policy is None or not policy.covers(p_stamina, e_stamina, luck):
+        max_stamina = max(POLICY_STAMINA, p_stamina + CHANGE_ON_LUCK, e_stamina)
+        max_luck = max(POLICY_LUCK, luck)
+        if policy is not None:
+            max_stamina = max(max_stamina, policy.max_stamina)
+            max_luck = max(max_luck, policy.max_luck)
+        policy = LuckPolicy(skill_diff, max_stamina, max_luck)
+        _luck_policies[skill_diff] = policy
+    return policy
+
+class SimulationResult:
+    """
+    The outcome of many simulated fights between the same two characters
+
+    Attributes:
+    int   n_trials - number of fights simulated
+    int   wins - number of fights won by the player
+    float win_rate - wins / n_trials
+    list  stamina_left - stamina_left[s] is the number of fights the player
+        finished with s stamina (losses count as 0)
+    list  rounds - rounds[r] is the number of fights that lasted r rounds
+    """
+    def __init__(self, n_trials, wins, stamina_left, rounds):
+        """Stores the counts; stamina_left and rounds are lists of counts"""
+        self.n_trials = n_trials
+        self.wins = wins
+        self.win_rate = wins / n_trials if n_trials else 0.0
+        self.stamina_left = stamina_left
+        self.rounds = rounds
+
+    def __repr__(self):
+        """For testing"""
+        template = "Fights: {}\nWin rate: {:.4f}\nMean rounds: {:.2f}\n"
+        return template.format(self.n_trials, self.win_rate, self.mean_rounds())
+
+    def mean_rounds(self):
+        """Returns the average number of rounds fought"""
+        if not self.n_trials:
+            return 0.0
+        return sum(r * count for r, count in enumerate(self.rounds)) / self.n_trials
+
+def load_numpy():
+    """Returns NumPy, importing it the first time, or None if it isn't
+    installed (it's optional, simulate() falls back to plain Python without it)"""
+    global numpy, _numpy_tried
+    if not _numpy_tried:
+        _numpy_tried = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+    return numpy
+
+def simulate(player, enemy, n_trials, seed=None, dice=None):
+    """Fights n_trials battles between copies of the player and enemy Characters,
+    without luck checks, and returns a SimulationResult.
+    The Characters themselves are not changed.
+    The fights draw from a new DiceRoller(seed) if seed is given, otherwise
+    from dice (the default ff_dice stream if None).
+    The battles are fought a round at a time, each round's attack rolls for
+    every battle still going drawn together with dice.roll_many() - the same
+    dice the GUI rolls. NumPy, when installed, fights the round with arrays;
+    it takes the same dice, so a seed gives the same result either way"""
+    if seed is not None:
+        dice = ff_dice.DiceRoller(seed)
+    elif dice is None:
+        dice = ff_dice.roller
+    p_stamina = player.stat_values[ff_character.STAMINA]
+    e_stamina = enemy.stat_values[ff_character.STAMINA]
+    skill_diff = player.stat_values[ff_character.SKILL] - enemy.stat_values[ff_character.SKILL]
+    if load_numpy() is not None:
+        return _simulate_numpy(skill_diff, p_stamina, e_stamina, n_trials, dice)
+    return _simulate_python(skill_diff, p_stamina, e_stamina, n_trials, dice)
+
+def round_rolls(dice, going):
+    """Returns the 2d6 attack rolls of a round of every battle still going, as
+    (the players' rolls, the enemies' rolls), each an array of length going"""
+    rolls = dice.roll_many(2, 6, 2 * going)
+    return rolls[:going], rolls[going:]
+
+def _simulate_numpy(skill_diff, p_stamina, e_stamina, n_trials, dice):
+    """simulate() using NumPy arrays, one entry for every fight still going"""
+    if p_stamina <= 0 or e_stamina <= 0: #Every fight is over before it starts
+        return _simulate_python(skill_diff, p_stamina, e_stamina, n_trials, dice)
+    stamina_left = numpy.zeros(p_stamina + 1, dtype=numpy.int64)
+    rounds = numpy.zeros(MAX_ROUNDS + 1, dtype=numpy.int64)
+    wins = 0
+    p_st = numpy.full(n_trials, p_stamina, dtype=numpy.int32)
+    e_st = numpy.full(n_trials, e_stamina, dtype=numpy.int32)
+
+    round_num = 0
+    while p_st.size and round_num < MAX_ROUNDS:
+        round_num += 1
+        p_rolls, e_rolls = round_rolls(dice, p_st.size)
+        power_diff = (numpy.frombuffer(p_rolls, dtype=numpy.uint16).astype(numpy.int32)
+                      - numpy.frombuffer(e_rolls, dtype=numpy.uint16) + skill_diff)
+        e_st -= (power_diff > 0) * STD_DMG
+        p_st -= (power_diff < 0) * STD_DMG
+        going = (p_st > 0) & (e_st > 0)
+        if not going.all():
+            finished = ~going
+            won = e_st[finished] <= 0
+            wins += int(numpy.count_nonzero(won))
+            stamina_left += numpy.bincount(numpy.where(won, p_st[finished], 0),
+                                           minlength=stamina_left.size)
+            rounds[round_num] += int(numpy.count_nonzero(finished))
+            p_st = p_st[going]
+            e_st = e_st[going]
+    #Anything left over ran out of rounds - not a win
+    stamina_left[0] += p_st.size
+    rounds[MAX_ROUNDS] += p_st.size
+    return SimulationResult(n_trials, wins, stamina_left.tolist(), _trim(rounds.tolist()))
+
+def _simulate_python(skill_diff, p_stamina, e_stamina, n_trials, dice):
+    """simulate() in plain Python, keeping lists of the fights still going"""
+    stamina_left = [0] * (max(p_stamina, 0) + 1)
+    rounds = [0] * (MAX_ROUNDS + 1)
+    if p_stamina <= 0 or e_stamina <= 0: #Every fight is over before it starts
+        wins = n_trials if e_stamina <= 0 else 0
+        stamina_left[max(p_stamina, 0) if wins else 0] = n_trials
+        return SimulationResult(n_trials, wins, stamina_left, [n_trials])
+    wins = 0
+    p_st = [p_stamina] * n_trials
+    e_st = [e_stamina] * n_trials
+
+    round_num = 0
+    while p_st and round_num < MAX_ROUNDS:
+        round_num += 1
+        p_rolls, e_rolls = round_rolls(dice, len(p_st))
+        p_going = []
+        e_going = []
+        for p, e, p_roll, e_roll in zip(p_st, e_st, p_rolls, e_rolls):
+            power_diff = p_roll - e_roll + skill_diff
+            if power_diff > 0:
+                e -= STD_DMG
+                if e <= 0:
+                    wins += 1
+                    stamina_left[p] += 1
+                    rounds[round_num] += 1
+                    continue
+            elif power_diff < 0:
+                p -= STD_DMG
+                if p <= 0:
+                    stamina_left[0] += 1
+                    rounds[round_num] += 1
+                    continue
+            p_going.append(p)
+            e_going.append(e)
+        p_st = p_going
+        e_st = e_going
+    #Anything left over ran out of rounds - not a win
+    stamina_left[0] += len(p_st)
+    rounds[MAX_ROUNDS] += len(p_st)
+    return SimulationResult(n_trials, wins, stamina_left, _trim(rounds))
+
+def _trim(counts):
+    """Returns the list of counts without its trailing zeros"""
+    end = len(counts)
+    while end > 1 and counts[end - 1] == 0:
+        end -= 1
+    return counts[:end]
@@ -0,0 +1,700 @@
+"""
+Alasdair Smith
+Started 20/12/2016
+
+Module for the Fighting Fantasy program
+Includes entire combat process
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Two dice rolls + skill level = attack value
+Character with lowest attack value takes 2 damage, this ends the 'round'
+Tie if equal attack value - ends 'round' with no damage
+Can do luck check after a 'round' which (if successful) either reduces damage
+taken or increases damage done by 1
+    If successful character luck will always go down by 1
+    luck roll is successful if the roll made is less than or equal to the luck stat
+Any number of enemies can join the fight (ADD ENEMY), who fight by the
+    targeting rule chosen - see ff_combatengine.Melee
+"""
+from tkinter import *
+from tkinter.font import *
+#from tkinter.ttk import * #Can't use because it's buttons don't support fonts
+from . import ff_character
+from . import ff_charactersheet
+from . import ff_logbook
+from . import ff_combatengine
+from . import ff_oddstable
+from . import ff_replay
+from . import ff_resources
+
+AUTO_FPS = 4 #Rounds shown per second when "fight to the end" is animated
+
+class CombatGui:
+    """
+    This gui handles each combat stage in the game
+    
+    Player and enemy stats can be modified at any time
+    Finish and apply changes button at end of match to close window and modify
+    player character attributes as appropriate
+    
+    Non-GUI Attributes:
+    obj player: Character object
+    obj enemy: Character object, the enemy the player is attacking
+    obj melee: ff_combatengine.Melee of the player against every enemy
+    str last_round: Result of previous round, "p_win", "e_win", "draw", or None
+    func on_end: Called when the fight is ended, instead of closing the window
+    func on_record: Called with each action taken, for ff_replay; None to not record
+    func on_history: Called to show the full logbook history; None for no FULL LOG button
+    func on_stats: Called to show the dice statistics; None for no DICE STATS button
+    obj  history: ff_undo.UndoHistory keeping the fight's changes; None for no undo
+    func on_undo, on_redo: Called by the UNDO and REDO buttons; None for no buttons
+    set  dirty: Widgets waiting to be updated - (fighter index, field), 'logs' or 'odds'
+    
+    The screen is only built once; start_fight() reuses it for each new fight
+    Fighters are known by their index in the melee: 0 for the player, then
+    1 on for the enemies, each shown as a row of the enemy frame
+    Widgets aren't written to straight away: changes to either Character (and
+    the logbook) mark their widgets as dirty, and flush() updates just those
+    widgets once the current event has been handled
+    
+    All widgets are classified by self.widgetname
+    Frames are classified just as framename
+    """
+    
+    def __init__(self, window, player, enemy, on_end=None, on_record=None,
+                 archive=None, on_history=None, on_stats=None, history=None,
+                 on_undo=None, on_redo=None):
+        """Initialises the class with the two characters it is representing
+        then builds the combat screen in window (a frame of the main window)
+        Logs go to archive once they leave the logbook, a new LogArchive if None"""
+        
+        self.combat_window = window
+        self.player = player
+        self.enemy = enemy
+        self.melee = ff_combatengine.Melee([player], [enemy], ff_combatengine.TARGET_RULES[0])
+        self.on_end = on_end
+        self.on_record = on_record
+        self.on_history = on_history
+        self.on_stats = on_stats
+        self.history = history
+        self.on_undo = on_undo
+        self.on_redo = on_redo
+        self.combat_logs = ff_logbook.Logbook(bounded=True, archive=archive)
+        self.last_round = None
+        self.animation = None #Tk after() id of the next animated round, if animating
+        self.dirty = set()
+        self.flush_pending = False
+        
+        #Set custom fonts
+        resources = ff_resources.get_resources(window)
+        self.headerfont = resources.font('header')
+        self.buttonfont = resources.font('button')
+        self.smallfont = resources.font('small')
+        
+        #Finish by running the main combat gui
+        self.build_combat_gui()
+    
+    def build_combat_gui(self):
+        """Brings up the main combat window with all its widgets"""
+        g_text = {"versus"    : "VERSUS",
+                  "fight"     : "FIGHT",
+                  "roll_luck" : "ROLL LUCK",
+                  "settings"  : "SETTINGS",
+                  "end_fight" : "END FIGHT",
+                  "logs"      : "Logbook:",
+                  "history"   : "FULL LOG",
+                  "stats"     : "DICE STATS",
+                  "undo"      : "UNDO",
+                  "redo"      : "REDO",
+                  "stamina"   : "STAMINA:",
+                  "skill"     : "SKILL:  ",
+                  "luck"      : "LUCK:   ",
+                  "s_change"  : "SET STATS",
+                  "odds"      : "Win: {:.1%}\n~{:.1f} rounds",
+                  "luck_yes"  : "Test luck: YES",
+                  "luck_no"   : "Test luck: NO",
+                  "auto"      : "TO THE END",
+                  "pause_at"  : "Pause below:",
+                  "pause_luck": "Pause for luck",
+                  "animate"   : "Animate",
+                  "e_stamina" : "STAMINA",
+                  "e_skill"   : "SKILL",
+                  "remove"    : "X",
+                  "add_enemy" : "ADD ENEMY",
+                  "rule"      : "Enemies fight:",
+                  "together"  : "all together",
+                  "one_at_a_time" : "one at a time",
+                  "spread"    : "spread out",
+                  }
+        
+        #BUILD FRAMES
+        combat_frame = Frame(self.combat_window)
+        combat_frame.grid(row=0, column=0)
+        log_frame = Frame(self.combat_window)
+        log_frame.grid(row=1, column=0)
+        credits_frame = Frame(self.combat_window)
+        credits_frame.grid(row=2, column=0)
+        
+        player_stats_frame = Frame(combat_frame)
+        player_stats_frame.grid(row=1, column=0, sticky='n')
+        actions_frame = Frame(combat_frame)
+        actions_frame.grid(row=1, column=1, padx=20, sticky='n')
+        self.enemy_stats_frame = Frame(combat_frame)
+        self.enemy_stats_frame.grid(row=1, column=2, sticky='n')
+        
+        #PLAYER STATS FRAME
+        self.player_name_entry = Entry(player_stats_frame, font=self.headerfont,
+                                       width=16, justify='right')
+        self.player_name_entry.grid(row=0, column=0, columnspan=2)
+        self.p_stamina_label = Label(player_stats_frame, font=self.headerfont,
+                                     text=g_text['stamina'])
+        self.p_stamina_label.grid(row=1, column=0, sticky='e')
+        self.p_stamina_entry = Entry(player_stats_frame, font=self.headerfont,
+                                     width=3, justify='right')
+        self.p_stamina_entry.grid(row=1, column=1, sticky='e')
+        self.p_skill_label = Label(player_stats_frame, font=self.headerfont,
+                                   text=g_text['skill'])
+        self.p_skill_label.grid(row=2, column=0, sticky='e')
+        self.p_skill_entry = Entry(player_stats_frame, font=self.headerfont,
+                                     width=3, justify='right')
+        self.p_skill_entry.grid(row=2, column=1, sticky='e')
+        self.p_luck_label = Label(player_stats_frame, font=self.headerfont,
+                                  text=g_text['luck'])
+        self.p_luck_label.grid(row=3, column=0, sticky='e')
+        self.p_luck_entry = Entry(player_stats_frame, font=self.headerfont,
+                                     width=3, justify='right')
+        self.p_luck_entry.grid(row=3, column=1, sticky='e')
+        
+        #ENEMY STATS FRAME
+        #The rows of enemies are built by build_enemy_rows(), as they come and go
+        self.enemy_rows_frame = None
+        self.enemy_headings = (g_text['e_stamina'], g_text['e_skill'])
+        self.remove_text = g_text['remove']
+        self.target_var = IntVar(self.combat_window, value=self.melee.target())
+        self.add_enemy_button = Button(self.enemy_stats_frame, font=self.buttonfont,
+                                       text=g_text['add_enemy'], command=self.add_enemy)
+        self.add_enemy_button.grid(row=1, column=0, sticky='w')
+        rule_frame = Frame(self.enemy_stats_frame)
+        rule_frame.grid(row=2, column=0, sticky='w')
+        self.rule_label = Label(rule_frame, font=self.smallfont, text=g_text['rule'])
+        self.rule_label.grid(row=0, column=0)
+        self.rule_texts = {rule: g_text[rule] for rule in ff_combatengine.TARGET_RULES}
+        self.rule_names = {text: rule for rule, text in self.rule_texts.items()}
+        self.rule_var = StringVar(self.combat_window, value=self.rule_texts[self.melee.rule])
+        self.rule_var.trace_add('write', lambda *args: self.rule_chosen())
+        self.rule_menu = OptionMenu(rule_frame, self.rule_var, *self.rule_names)
+        self.rule_menu.config(font=self.smallfont)
+        self.rule_menu.grid(row=0, column=1)
+        
+        #ACTIONS FRAME
+        self.versus_label = Label(actions_frame, font=self.headerfont, text=g_text['versus'])
+        self.versus_label.grid(row=0, column=0, padx=30)
+        self.odds_template = g_text['odds']
+        self.odds_label = Label(actions_frame, font=self.smallfont)
+        self.odds_label.grid(row=1, column=0)
+        self.fight_button = Button(actions_frame, font=self.buttonfont, text=g_text['fight'],
+                                   command=self.fight_round, width=10)
+        self.fight_button.grid(row=2, column=0)
+        self.roll_button = Button(actions_frame, font=self.buttonfont, text=g_text['roll_luck'],
+                                       command=self.roll_luck, width=10)
+        self.roll_button.grid(row=3, column=0)        
+        self.luck_hint_text = {True: g_text['luck_yes'], False: g_text['luck_no']}
+        self.luck_hint_label = Label(actions_frame, font=self.smallfont)
+        self.luck_hint_label.grid(row=4, column=0)
+        self.auto_button = Button(actions_frame, font=self.buttonfont, text=g_text['auto'],
+                                  command=self.fight_to_end, width=10)
+        self.auto_button.grid(row=5, column=0)
+        auto_frame = Frame(actions_frame)
+        auto_frame.grid(row=6, column=0)
+        self.pause_at_label = Label(auto_frame, font=self.smallfont, text=g_text['pause_at'])
+        self.pause_at_label.grid(row=0, column=0, sticky='e')
+        self.pause_at_var = StringVar(self.combat_window, value="0")
+        self.pause_at_entry = Entry(auto_frame, font=self.smallfont, width=3,
+                                    textvariable=self.pause_at_var, validate='key',
+                                    validatecommand=(self.combat_window.register(
+                                        ff_charactersheet.is_int_text), '%P'))
+        self.pause_at_entry.grid(row=0, column=1, sticky='w')
+        self.pause_luck_var = BooleanVar(self.combat_window, value=False)
+        self.pause_luck_check = Checkbutton(auto_frame, font=self.smallfont,
+                                           text=g_text['pause_luck'], variable=self.pause_luck_var)
+        self.pause_luck_check.grid(row=1, column=0, columnspan=2, sticky='w')
+        self.animate_var = BooleanVar(self.combat_window, value=False)
+        self.animate_check = Checkbutton(auto_frame, font=self.smallfont,
+                                         text=g_text['animate'], variable=self.animate_var)
+        self.animate_check.grid(row=2, column=0, columnspan=2, sticky='w')
+        #self.other_button = Button(actions_frame, font=self.buttonfont, text=g_text['settings'],
+                                 #command=None, width=10)
+        #self.other_button.grid(row=7, column=0)
+        ##Put this somewhere
+        self.end_button = Button(actions_frame, font=self.buttonfont, text=g_text['end_fight'],
+                                 command=self.end_fight, width=10)
+        self.end_button.grid(row=7, column=0)
+        self.update_odds_label()
+        
+        #LOG FRAME
+        self.logs_label = Label(log_frame, font=self.buttonfont, text=g_text['logs'])
+        self.logs_label.grid(row=0, column=0)
+        self.logs_text = Label(log_frame, font=self.smallfont, height=ff_logbook.NUM_LOGS,
+                               width=88, anchor='n', justify='left')
+        self.logs_text.grid(row=1, column=0, sticky='w')
+        self.logs_text['text'] = self.combat_logs.__repr__(is_rev=True)
+        if self.on_history is not None:
+            self.history_button = Button(log_frame, font=self.buttonfont, text=g_text['history'],
+                                         command=self.on_history)
+            self.history_button.grid(row=2, column=0)
+        if self.on_stats is not None:
+            self.stats_button = Button(log_frame, font=self.buttonfont, text=g_text['stats'],
+                                       command=self.on_stats)
+            self.stats_button.grid(row=3, column=0)
+        if self.on_undo is not None:
+            undo_frame = Frame(log_frame)
+            undo_frame.grid(row=4, column=0)
+            self.undo_button = Button(undo_frame, font=self.buttonfont, text=g_text['undo'],
+                                      command=self.on_undo)
+            self.undo_button.grid(row=0, column=0)
+            self.redo_button = Button(undo_frame, font=self.buttonfont, text=g_text['redo'],
+                                      command=self.on_redo)
+            self.redo_button.grid(row=0, column=1)
+        
+        #CREDITS FRAME
+        self.credits_label = Label(credits_frame, font=self.smallfont,
+                                   text=ff_charactersheet.CREDITS_TEXT)
+        self.credits_label.grid(row=0, column=0)
+        
+        #Widgets by (fighter index, field), for flush
+        self.stat_entrys = {}
+        self.entry_vars = {}
+        self.int_check = (self.combat_window.register(ff_charactersheet.is_int_text), '%P')
+        self.tie_entry((0, 'name'), self.player_name_entry)
+        self.tie_entry((0, 'stamina'), self.p_stamina_entry)
+        self.tie_entry((0, 'skill'), self.p_skill_entry)
+        self.tie_entry((0, 'luck'), self.p_luck_entry)
+        self.build_enemy_rows()
+        self.attach_fighters()
+    
+    def tie_entry(self, item, entry):
+        """Ties the entry showing item (fighter index, field) to a Tk variable,
+        so edits go straight to the character
+        Stat entries only accept (possibly half-typed) whole numbers"""
+        self.stat_entrys[item] = entry
+        self.entry_vars[item] = StringVar(self.combat_window, value=self.get_field(item))
+        self.entry_vars[item].trace_add('write', lambda *args, item=item: self.entry_edited(item))
+        entry['textvariable'] = self.entry_vars[item]
+        if item[1] != 'name':
+            entry.config(validate='key', validatecommand=self.int_check)
+    
+    def build_enemy_rows(self):
+        """(Re)builds a row for each enemy in the melee: a button to choose them
+        as the player's target, their name, stamina and skill, and (if there's
+        more than one enemy) a button to remove them from the fight"""
+        for item in [item for item in self.stat_entrys if item[0] != 0]:
+            del self.stat_entrys[item]
+            del self.entry_vars[item]
+        if self.enemy_rows_frame is not None:
+            self.enemy_rows_frame.destroy()
+        self.enemy_rows_frame = Frame(self.enemy_stats_frame)
+        self.enemy_rows_frame.grid(row=0, column=0, sticky='w')
+        for column, heading in enumerate(self.enemy_headings, 2):
+            Label(self.enemy_rows_frame, font=self.smallfont, text=heading).grid(row=0, column=column)
+        n_fighters = len(self.melee.fighters)
+        for who in range(self.melee.n_players, n_fighters):
+            Radiobutton(self.enemy_rows_frame, variable=self.target_var, value=who,
+                        command=self.target_chosen).grid(row=who, column=0)
+            name_entry = Entry(self.enemy_rows_frame, font=self.buttonfont, width=16, justify='left')
+            name_entry.grid(row=who, column=1, sticky='w')
+            stamina_entry = Entry(self.enemy_rows_frame, font=self.buttonfont, width=3, justify='left')
+            stamina_entry.grid(row=who, column=2)
+            skill_entry = Entry(self.enemy_rows_frame, font=self.buttonfont, width=3, justify='left')
+            skill_entry.grid(row=who, column=3)
+            self.tie_entry((who, 'name'), name_entry)
+            self.tie_entry((who, 'stamina'), stamina_entry)
+            self.tie_entry((who, 'skill'), skill_entry)
+            if n_fighters - self.melee.n_players > 1:
+                Button(self.enemy_rows_frame, font=self.smallfont, text=self.remove_text,
+                       command=lambda who=who: self.remove_enemy(who)).grid(row=who, column=4)
+    
+    def add_enemy(self):
+        """ADD ENEMY button; a standard enemy joins the fight"""
+        before = self.fight_state()
+        enemy = ff_character.make_default_enemy()
+        self.melee.add_enemy(enemy)
+        self.attach_fighters()
+        #The luck check is only for the round just fought; cleared before recording,
+        #so a checkpoint taken on this action matches its replay
+        self.set_last_round(None)
+        self.record(['add_enemy', ff_replay.character_snapshot(enemy)])
+        self.fight_changed(before)
+        self.build_enemy_rows()
+        self.update_target()
+    
+    def remove_enemy(self, who):
+        """Takes the enemy at index who out of the fight, unless they're the last"""
+        if len(self.melee.fighters) - self.melee.n_players <= 1:
+            return
+        before = self.fight_state()
+        self.detach_fighter(self.melee.fighters[who])
+        self.melee.remove_enemy(who)
+        self.set_last_round(None)
+        self.record(['remove_enemy', who])
+        self.fight_changed(before)
+        self.build_enemy_rows()
+        self.update_target()
+    
+    def target_chosen(self):
+        """Command of the enemies' buttons; the player attacks the one chosen"""
+        who = self.target_var.get()
+        if who == self.melee.target():
+            return
+        before = self.fight_state()
+        self.melee.set_target(0, who)
+        self.set_last_round(None)
+        self.record(['target', who])
+        self.fight_changed(before)
+        self.update_target()
+    
+    def rule_chosen(self):
+        """Trace callback of the targeting rule menu"""
+        rule = self.rule_names[self.rule_var.get()]
+        if rule == self.melee.rule:
+            return
+        before = self.fight_state()
+        self.melee.set_rule(rule)
+        self.record(['rule', rule])
+        self.fight_changed(before)
+        self.update_target()
+    
+    def fight_state(self):
+        """Returns who's in the fight, the player's chosen target and the rule,
+        as a tuple for the undo history (the Characters are shared, not copied)"""
+        return (tuple(self.melee.fighters), tuple(self.melee.chosen.items()), self.melee.rule)
+    
+    def fight_changed(self, before):
+        """Keeps a change to the fight_state() in the undo history"""
+        if self.history is not None:
+            self.history.changed(self.melee, 'fight', before, self.fight_state(),
+                                 self.restore_fight_state)
+    
+    def restore_fight_state(self, melee, field, state):
+        """Puts a fight_state() back into melee, for undo and redo"""
+        fighters, chosen, rule = state
+        if melee is self.melee:
+            self.detach_fighters()
+        melee.fighters = list(fighters)
+        melee.chosen = dict(chosen)
+        melee.set_rule(rule)
+        if melee is self.melee:
+            self.attach_fighters()
+            if self.rule_var.get() != self.rule_texts[rule]:
+                self.rule_var.set(self.rule_texts[rule])
+            self.build_enemy_rows()
+            self.update_target()
+            self.update_primary_entrys()
+    
+    def set_last_round(self, last_round):
+        """Sets last_round, keeping the change in the undo history"""
+        before = self.last_round
+        self.last_round = last_round
+        if self.history is not None and before != last_round:
+            self.history.changed(self.melee, 'last_round', before, last_round,
+                                 self.restore_last_round)
+    
+    def restore_last_round(self, melee, field, last_round):
+        """Puts last_round back, for undo and redo, if melee is still being fought"""
+        if melee is self.melee:
+            self.last_round = last_round
+            self.mark_dirty('odds')
+    
+    def update_target(self):
+        """Makes enemy the one the player is attacking (which changes when their
+        target falls, or isn't fighting) and marks the target button and odds"""
+        who = self.melee.target()
+        self.enemy = self.melee.fighters[who]
+        if self.target_var.get() != who:
+            self.target_var.set(who)
+        self.mark_dirty('odds')
+    
+    def end_fight(self):
+        """Ends the fight, that's it"""
+        self.stop_animation()
+        self.detach_fighters()
+        if self.on_end is None:
+            self.combat_window.destroy()
+        else:
+            self.on_end()
+    
+    def start_fight(self, player, enemy):
+        """Reuses the combat screen for a new fight between player and enemy"""
+        self.combat_logs.clear() #The archive keeps the logs of old fights
+        self.resume_fight(ff_combatengine.Melee([player], [enemy], self.melee.rule), None)
+    
+    def resume_fight(self, melee, last_round):
+        """Reuses the combat screen for melee (an ff_combatengine.Melee of one
+        player), a fight that may already be under way"""
+        self.stop_animation()
+        self.detach_fighters()
+        self.melee = melee
+        self.player = melee.fighters[0]
+        self.attach_fighters()
+        self.last_round = last_round
+        if self.rule_var.get() != self.rule_texts[melee.rule]:
+            self.rule_var.set(self.rule_texts[melee.rule])
+        self.build_enemy_rows()
+        self.update_target()
+        self.update_primary_entrys()
+        self.refresh_logbook()
+    
+    def attach_fighters(self):
+        """Listens to every fighter (and keeps their changes in the undo history)"""
+        for fighter in self.melee.fighters:
+            fighter.remove_listener(self.character_changed) #Never listen twice
+            fighter.add_listener(self.character_changed)
+            if self.history is not None:
+                self.history.watch(fighter)
+    
+    def detach_fighters(self):
+        """Stops listening to the fighters, e.g. before the screen is destroyed"""
+        for fighter in self.melee.fighters:
+            self.detach_fighter(fighter)
+    
+    def detach_fighter(self, fighter):
+        """Stops listening to fighter, and keeping their changes in the undo
+        history unless they're a player (the player's changes are always kept)"""
+        fighter.remove_listener(self.character_changed)
+        if self.history is not None and fighter not in self.melee.fighters[:self.melee.n_players]:
+            self.history.unwatch(fighter)
+    
+    def refresh_logbook(self):
+        """Marks the logbook label to be updated with the up-to-date logbook"""
+        self.mark_dirty('logs')
+    
+    def character_changed(self, character, field):
+        """Listener for every fighter; marks the widget showing field to be updated"""
+        for who, fighter in enumerate(self.melee.fighters):
+            if fighter is character:
+                self.mark_dirty((who, field))
+        if field in ('skill', 'stamina', 'luck'):
+            self.mark_dirty('odds')
+    
+    def mark_dirty(self, item):
+        """Marks the widget for item to be updated, and makes sure a flush happens
+        once the current event has been handled"""
+        self.dirty.add(item)
+        if not self.flush_pending:
+            self.flush_pending = True
+            self.combat_window.after_idle(self.flush)
+    
+    def flush(self):
+        """Updates only the widgets marked since the last flush"""
+        self.flush_pending = False
+        dirty = self.dirty
+        self.dirty = set()
+        for item in dirty:
+            if item in self.entry_vars:
+                value = str(self.get_field(item))
+                if self.entry_vars[item].get() != value:
+                    self.entry_vars[item].set(value)
+        if 'logs' in dirty:
+            self.logs_text['text'] = self.combat_logs.__repr__(is_rev=True)
+        if 'odds' in dirty:
+            self.update_odds_label()
+    
+    def get_field(self, item):
+        """Returns the value of the fighter's field given by item: (fighter index, field)"""
+        who, field = item
+        character = self.melee.fighters[who]
+        if field == 'name':
+            return character.name
+        return character.stats[field]
+    
+    def entry_edited(self, item):
+        """Trace callback of each entry's variable; updates the fighter's
+        name or stat as it is typed, so buttons never have to read the entries"""
+        who, field = item
+        character = self.melee.fighters[who]
+        text = self.entry_vars[item].get()
+        if field == 'name':
+            if character.set_detail('name', text):
+                self.record(['detail', who, 'name', text])
+        else:
+            try:
+                value = int(text)
+            except ValueError: #Empty or just '-' while typing; keep the last good value
+                return
+            try:
+                changed = character.set_stat(field, value)
+            except OverflowError: #Too big for the character's stats; keep the last good value
+                return
+            if changed:
+                self.record(['stat', who, field, value])
+    
+    def record(self, action):
+        """Passes an action just taken on to on_record, if recording"""
+        if self.on_record is not None:
+            self.on_record(action)
+    
+    def update_primary_entrys(self):
+        """Opposite of entry_edited
+        Catch-all marking of every entry of player & enemy stats and names to be updated"""
+        for item in self.stat_entrys:
+            self.mark_dirty(item)
+        self.mark_dirty('odds')
+    
+    def update_odds_label(self):
+        """Shows the player's exact chance of beating the enemy they're attacking
+        from the current stats, as if the other enemies weren't there
+        The odds come from the memory-mapped odds table if it has been built,
+        or are solved and cached by ff_combatengine, so this is cheap to call often"""
+        skill_diff = self.player.stats['skill'] - self.enemy.stats['skill']
+        win_chance, rounds = ff_oddstable.fight_odds(skill_diff, self.player.stats['stamina'],
+                                                     self.enemy.stats['stamina'])
+        self.odds_label['text'] = self.odds_template.format(win_chance, rounds)
+        self.update_luck_hint()
+    
+    def update_luck_hint(self):
+        """Shows whether testing luck now would help. Blank when there's nothing to test"""
+        test_luck = self.luck_advised()
+        if test_luck is None:
+            self.luck_hint_label['text'] = ""
+        else:
+            self.luck_hint_label['text'] = self.luck_hint_text[test_luck]
+    
+    def luck_advised(self):
+        """Returns whether testing luck now would help, using the cached LuckPolicy
+        table for the current skill difference, or None if there's nothing to test"""
+        if self.last_round not in ('p_win', 'e_win'):
+            return None
+        skill_diff = self.player.stats['skill'] - self.enemy.stats['skill']
+        p_stamina = self.player.stats['stamina']
+        e_stamina = self.enemy.stats['stamina']
+        luck = self.player.stats['luck']
+        policy = ff_combatengine.get_luck_policy(skill_diff, p_stamina, e_stamina, luck)
+        return policy.should_test_luck(self.last_round, p_stamina, e_stamina, luck)
+    
+    def fight_round(self):
+        """Initiates one phase of combat between the player and enemies
+        Two dice rolls + skill level = attack value
+        Character with lowest attack value takes 2 damage, this ends the 'round'
+        Tie if equal attack value - ends 'round' with no damage
+        The rules themselves (and for several enemies) are in ff_combatengine"""
+        self.combat_logs.add_logs(self.play_round())
+        self.refresh_logbook()
+        self.mark_dirty('odds') #For the luck hint after this round
+    
+    def play_round(self):
+        """Fights one round, returning its logs in the order they're added to the logbook"""
+        attacks, hits = self.melee.fight_round()
+        self.set_last_round(ff_combatengine.melee_result(hits, 0))
+        self.record(['fight'])
+        fighters = self.melee.fighters
+        logs = [ff_logbook.Log('space')]
+        if not hits:
+            if attacks: #Otherwise there was nobody left to fight
+                logs.append(ff_logbook.Log('draw'))
+        elif len(attacks) == 2: #One on one, so who hit whom goes without saying
+            logs.append(ff_logbook.Log('take_dmg', fighters[hits[0][1]].name, ff_combatengine.STD_DMG))
+        else:
+            for attacker, target in hits:
+                logs.append(ff_logbook.Log('hit_by', fighters[target].name, fighters[attacker].name,
+                                           ff_combatengine.STD_DMG))
+        for who in reversed(list(attacks)): #So the player's attack shows first
+            logs.append(self.get_attack_log(fighters[who], attacks[who]))
+        self.update_target()
+        return logs
+    
+    def fight_to_end(self):
+        """Fights rounds until a stamina runs out or a pause condition is met after
+        a round: the player's stamina falling below the "pause below" value, or (if
+        ticked) the luck policy advising a luck test. The logs of every round are added
+        in one batch and the screen is repainted once at the end, unless
+        animating, when one round is shown every 1/AUTO_FPS seconds instead"""
+        if self.animation is not None: #Already running
+            return
+        if self.animate_var.get():
+            self.animate_round()
+            return
+        logs = []
+        rounds = 0
+        while self.fight_going() and rounds < ff_combatengine.MAX_ROUNDS:
+            logs.extend(self.play_round())
+            rounds += 1
+            if self.auto_should_pause():
+                break
+        self.combat_logs.add_logs(logs)
+        self.refresh_logbook()
+        self.mark_dirty('odds')
+    
+    def animate_round(self):
+        """Fights one round of an animated fight_to_end, then schedules the next"""
+        self.animation = None
+        if not self.fight_going():
+            return
+        self.combat_logs.add_logs(self.play_round())
+        self.refresh_logbook()
+        self.mark_dirty('odds')
+        if not self.auto_should_pause():
+            self.animation = self.combat_window.after(1000 // AUTO_FPS, self.animate_round)
+    
+    def stop_animation(self):
+        """Cancels the next animated round, if there is one"""
+        if self.animation is not None:
+            self.combat_window.after_cancel(self.animation)
+            self.animation = None
+    
+    def fight_going(self):
+        """Returns True while the player and any enemy have stamina left"""
+        return not self.melee.over()
+    
+    def auto_should_pause(self):
+        """Returns True if fight_to_end should pause after the round just fought"""
+        try:
+            pause_at = int(self.pause_at_var.get())
+        except ValueError: #Empty or half-typed
+            pause_at = 0
+        if self.player.stats['stamina'] < pause_at:
+            return True
+        return bool(self.pause_luck_var.get() and self.luck_advised())
+    
+    def get_attack_log(self, character, attack):
+        """Returns a new Log describing the given character's (power, roll1, roll2) attack"""
+        power, roll1, roll2 = attack
+        log = ff_logbook.Log('roll_die', character.name, roll1)
+        log.append_log(ff_logbook.Log('roll_die_ext', roll2))
+        log.append_log(ff_logbook.Log('total_roll', roll1 + roll2))
+        log.append_log(ff_logbook.Log('attack_val', power))
+        return log
+    
+    def roll_luck(self):
+        """Depending on the result of the previous engagement, makes a luck roll"""
+        self.combat_logs.add_log(ff_logbook.Log('space'))        
+        if self.last_round in ("p_win", "e_win"):
+            self.luck_check()
+        elif self.last_round == "draw":
+            self.combat_logs.add_log(ff_logbook.Log('err_draw'))
+        elif self.last_round is None:
+            self.combat_logs.add_log(ff_logbook.Log('err_no_fight'))
+        else: #impossible
+            raise ValueError("Previous round set to unknown value: {}".format(self.last_round))
+        self.set_last_round(None)
+        self.record(['luck'])
+        self.mark_dirty('odds') #Clears the luck hint
+        self.refresh_logbook()
+    
+    def luck_check(self):
+        """On a successful luck roll, reduces or increases damage done by CHANGE_ON_LUCK"""
+        success, roll = ff_combatengine.luck_check(self.player, self.enemy, self.last_round)
+        if success:
+            self.combat_logs.add_log(ff_logbook.Log("stat_down", "Luck", 1))
+            if self.last_round == 'e_win':
+                self.combat_logs.add_log(ff_logbook.Log('less_dmg', self.player.name,
+                                                        ff_combatengine.CHANGE_ON_LUCK))
+            else:
+                self.combat_logs.add_log(ff_logbook.Log('more_dmg', self.enemy.name,
+                                                        ff_combatengine.CHANGE_ON_LUCK))
+            self.combat_logs.add_log(ff_logbook.Log('success'))
+        else:
+            self.combat_logs.add_log(ff_logbook.Log('unchanged', "Luck"))
+            self.combat_logs.add_log(ff_logbook.Log('failure'))
+        self.combat_logs.add_log(ff_logbook.Log('roll_luck', roll))
+        self.refresh_logbook()
@@ -0,0 +1,228 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the DiceRoller class - the one source of dice rolls for the GUIs,
+    combat engine and simulations
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter.
+
+Every die is rolled on its own and added up, so 2 dice give a proper 2d6
+    (7 is six times as likely as 2), not an even spread from 2 to 12
+Dice are made in blocks from random bytes, one byte per die, taken from the
+    generator in one go: each byte under the largest multiple of the sides
+    below 256 gives the die (byte % sides) + 1, and the rest are dropped so
+    every face is as likely. NumPy (when installed) turns big blocks into dice
+    all at once; it gives the same dice as plain Python, so a seed always
+    rolls the same whether NumPy is there or not
+"""
+import array
+import operator
+import random
+
+BLOCK_SIZE = 1024 #Least number of dice drawn at a time to refill a DiceRoller's buffer
+BYTE_VALUES = 256
+NUMPY_MIN_DICE = 16 * 1024 #Blocks this big are made by NumPy, if installed; smaller ones aren't worth importing it for
+
+numpy = None #Imported by load_numpy(), the first time a big block is made
+_numpy_tried = False
+
+def load_numpy():
+    """Returns NumPy, importing it the first time, or None if it isn't installed"""
+    global numpy, _numpy_tried
+    if not _numpy_tried:
+        _numpy_tried = True
+        try:
+            import numpy
+        except ImportError: #Optional, the dice are the same without it
+            numpy = None
+    return numpy
+
+def dice_from_bytes(data, sides):
+    """Returns a list of the [sides] sided dice in data (random bytes), one die
+    per byte, dropping the bytes that would make the low faces more likely"""
+    if len(data) >= NUMPY_MIN_DICE and load_numpy() is not None:
+        return numpy_dice(data, sides).tolist()
+    limit = BYTE_VALUES - BYTE_VALUES % sides
+    return [byte % sides + 1 for byte in data if byte < limit]
+
+def numpy_dice(data, sides):
+    """dice_from_bytes() as a NumPy array (NumPy must be loaded)"""
+    limit = BYTE_VALUES - BYTE_VALUES % sides
+    values = numpy.frombuffer(data, dtype=numpy.uint8)
+    values = values[values < limit].astype(numpy.uint16) #A d256 rolls up to 256
+    return values % sides + 1
+
+class DiceRoller:
+    """
+    A seedable stream of dice rolls, one per session.
+    Dice are drawn from the random generator in blocks of at least BLOCK_SIZE
+    (see above), added to the end of a buffer, and handed out in order from
+    there, so the same seed always gives the same rolls
+
+    Attributes:
+    int    seed - the seed the stream started from
+    Random rng - the stream's own random number generator
+    dict   buffers - {sides: list of dice drawn}
+    dict   positions - {sides: index in its buffer of the next die to roll}
+    list   listeners - functions called with (sides, list of faces) for every roll
+    """
+    def __init__(self, seed=None):
+        """Starts a new stream from seed, or from a random seed if None"""
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.buffers = {}
+        self.positions = {}
+        self.listeners = []
+
+    def __repr__(self):
+        """For testing"""
+        return "DiceRoller(seed={})".format(self.seed)
+
+    def draw(self, sides, count):
+        """Returns a list of about count new [sides] sided dice (a few fewer,
+        as some bytes are dropped)"""
+        if sides > BYTE_VALUES: #Never used by the gamebooks, so no need to be quick
+            return [self.rng.randrange(sides) + 1 for _ in range(count)]
+        #As Random.randbytes (Python 3.9 on) makes them
+        data = self.rng.getrandbits(count * 8).to_bytes(count, 'little')
+        return dice_from_bytes(data, sides)
+
+    def take_array(self, sides, count):
+        """take() as a NumPy array, for big rolls: the same dice, drawn the
+        same way, without making a list of them (NumPy must be loaded)"""
+        buffer = self.buffers.get(sides, [])
+        kept = buffer[self.positions.get(sides, 0):]
+        pieces = [numpy.array(kept, dtype=numpy.uint16)]
+        length = len(kept)
+        while length < count:
+            size = max(BLOCK_SIZE, count - length)
+            pieces.append(numpy_dice(self.rng.getrandbits(size * 8).to_bytes(size, 'little'), sides))
+            length += pieces[-1].size
+        faces = numpy.concatenate(pieces)
+        self.buffers[sides] = faces[count:].tolist()
+        self.positions[sides] = 0
+        return faces[:count]
+
+    def take(self, sides, count):
+        """Returns a list of the next count [sides] sided dice, refilling the
+        buffer as needed"""
+        buffer = self.buffers.get(sides)
+        start = self.positions.get(sides, 0)
+        if buffer is None or len(buffer) - start < count:
+            #Only the dice not yet rolled are kept, and new ones go after them
+            buffer = [] if buffer is None else buffer[start:]
+            while len(buffer) < count:
+                buffer.extend(self.draw(sides, max(BLOCK_SIZE, count - len(buffer))))
+            self.buffers[sides] = buffer
+            start = 0
+        self.positions[sides] = start + count
+        return buffer[start:start + count]
+
+    def add_listener(self, listener):
+        """Calls listener(sides, faces) with the faces of every roll from now on"""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stops calling listener, if it was added"""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def roll(self, dice=1, sides=6):
+        """Returns an integer representing a throw of [dice] [sides] sided dice"""
+        buffer = self.buffers.get(sides)
+        if buffer is not None and not self.listeners:
+            start = self.positions[sides]
+            end = start + dice
+            if end <= len(buffer): #The usual case, no need to refill
+                self.positions[sides] = end
+                total = 0
+                for face in buffer[start:end]:
+                    total += face
+                return total
+        faces = self.take(sides, dice)
+        for listener in self.listeners:
+            listener(sides, faces)
+        return sum(faces)
+
+    def roll_many(self, dice, sides, count):
+        """Returns an array of count throws of [dice] [sides] sided dice"""
+        if (dice * count >= NUMPY_MIN_DICE and sides <= BYTE_VALUES
+                and load_numpy() is not None):
+            faces = self.take_array(sides, dice * count)
+            if self.listeners:
+                face_list = faces.tolist()
+                for listener in self.listeners:
+                    listener(sides, face_list)
+            totals = faces[0::dice].copy()
+            for i in range(1, dice):
+                totals += faces[i::dice]
+            rolls = array.array('H')
+            rolls.frombytes(totals.tobytes())
+            return rolls
+        faces = self.take(sides, dice * count)
+        for listener in self.listeners:
+            listener(sides, faces)
+        if dice == 1:
+            return array.array('H', faces)
+        totals = faces[0::dice]
+        for i in range(1, dice):
+            totals = map(operator.add, totals, faces[i::dice])
+        return array.array('H', totals)
+
+    def getstate(self):
+        """Returns the state of the stream, including the dice already drawn
+        but not yet rolled, in the order they'll be rolled"""
+        return (self.seed, self.rng.getstate(),
+                {sides: buffer[self.positions[sides]:] for sides, buffer in self.buffers.items()})
+
+    def setstate(self, state):
+        """Restores a state from getstate(); the same rolls then follow"""
+        self.seed, rng_state, buffers = state
+        self.rng.setstate(rng_state)
+        self.buffers = {sides: list(buffer) for sides, buffer in buffers.items()}
+        self.positions = {sides: 0 for sides in self.buffers}
+
+roller = DiceRoller() #The stream used by default, replaced by new_session()
+
+def new_session(seed=None):
+    """Starts a new default stream from seed (random if None), and returns it"""
+    global roller
+    roller = DiceRoller(seed)
+    return roller
+
+def resume_session(stream):
+    """Makes stream (a DiceRoller) the default stream again, e.g. when the
+    session it belongs to is switched back to"""
+    global roller
+    roller = stream
+    return roller
+
+def roll_dice(dice=1, sides=6):
+    """Returns an integer representing a throw of [dice] [sides] sided dice,
+    from the default stream"""
+    return roller.roll(dice, sides)
+
+def roll_many(dice, sides, count):
+    """Returns an array of count throws of [dice] [sides] sided dice, from the
+    default stream"""
+    return roller.roll_many(dice, sides, count)
+
+def roll_distribution(dice=1, sides=6):
+    """Returns a dict of {total: probability} for a throw of [dice] [sides] sided dice"""
+    ways = {0: 1}
+    for _ in range(dice):
+        next_ways = {}
+        for total, count in ways.items():
+            for face in range(1, sides + 1):
+                next_ways[total + face] = next_ways.get(total + face, 0) + count
+        ways = next_ways
+    outcomes = sides ** dice
+    return {total: count / outcomes for total, count in sorted(ways.items())}
@@ -0,0 +1,572 @@
+"""
+Alasdair Smith
+Started 20/12/2016
+
+Module for the Fighting Fantasy Program
+Includes the initial decision question GUI, a few helper functions,
+    and code to run the whole program (started by ff_cli's gui command)
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+"""
+from tkinter import *
+from tkinter.font import *
+#from tkinter.ttk import * #Can't use because it's buttons don't support fonts
+from . import ff_charactersheet
+from . import ff_combatscreen
+from . import ff_combatengine
+from . import ff_character
+from . import ff_dice
+from . import ff_files
+from . import ff_replay
+from . import ff_journal
+from . import ff_logbook
+from . import ff_history
+from . import ff_logsearch
+from . import ff_historyscreen
+from . import ff_rollstats
+from . import ff_statsscreen
+from . import ff_overlay
+from . import ff_profiler
+from . import ff_profilescreen
+from . import ff_sessions
+from . import ff_sessionscreen
+from . import ff_undo
+from . import ff_resources
+
+EVICT_MS = 60 * 1000 #How often idle sessions are looked for, with gui --session
+
+#THIS IS THE INITIAL QUESTION GUI FOR THE PROGRAM
+class QuestionGui:
+    """
+    Full program or just combat calculator button window
+    
+    Attributes:
+    questionwindow: the frame holding the gui
+    full_or_combat: the word states the program to be run, None if not chosen
+    on_choice: called with full_or_combat once the choice is made
+    """
+    
+    def __init__(self, window, on_choice=None):
+        """Initialises, then opens the gui for the question to be answered"""
+        self.questionwindow = window
+        self.full_or_combat = None
+        self.on_choice = on_choice
+        
+        #Set custom fonts
+        self.headerfont = ff_resources.get_resources(window).font('header')
+        
+        #Finish by running the main question screen
+        self.run_question()
+    
+    def run_question(self):
+        """Brings up a window asking whether the user wants to run just the
+        combat calculator or the full gui"""
+        text_question = "What do you want to do?"
+        text_full =   "Build Character Sheet"
+        text_combat = "   Fight a Battle!   " #Try get it with equal spacing to the above line
+        question_label = Label(self.questionwindow, font=self.headerfont, text=text_question)
+        combat_button = Button(self.questionwindow, font=self.headerfont, text=text_combat,
+                               command=lambda: self.choose_mode("combat"))
+        full_button = Button(self.questionwindow, font=self.headerfont, text=text_full,
+                             command=lambda: self.choose_mode("full"))
+        question_label.grid(row=0, column=0, columnspan=2, pady=10)
+        combat_button.grid(row=1, column=1, padx=10, pady=10, ipadx=35, ipady=5)
+        full_button.grid(row=1, column=0, padx=10, pady=10, ipadx=35, ipady=5)
+    
+    def choose_mode(self, mode_choice):
+        """Saves mode choice and closes the question frame"""
+        self.questionwindow.destroy()
+        self.full_or_combat = mode_choice
+        if self.on_choice is not None:
+            self.on_choice(mode_choice)
+
+class ScreenManager:
+    """
+    Holds the one Tk window used by the whole program, with the character sheet
+    and combat screen as frames inside it. Only one frame is shown at a time;
+    each screen is built the first time it is needed and then just hidden and
+    shown again, so going to and from battles doesn't rebuild anything
+    
+    Attributes:
+    root: the Tk window
+    character: the main Character
+    sheet_frame, combat_frame: the frames holding each screen
+    sheet_gui: CharacterSheetGui, None until first shown (stays None in combat-only mode)
+    combat_gui: CombatGui, None until first shown
+    in_combat: True while the combat screen is shown
+    recording: ff_replay.Recording of every action taken on either screen
+    journal: ff_journal.Journal saving the character and logbooks, None to not save
+    saved_logs: {book: [Log]} loaded from the journal, put back in each logbook when built
+    archive: ff_logbook.LogArchive shared by both logbooks, holding the full history
+    history_gui: HistoryGui of the archive, None unless its window is open
+    roll_stats: ff_rollstats.RollStats of every roll and attack this session
+    stats_gui: StatsGui of roll_stats, None unless its window is open
+    overlay: ff_overlay.OverlayServer the state is published to, None for no overlay
+    profiler: ff_profiler.Profiler timing the buttons, None when not profiling
+    profile_gui: ProfileGui of profiler, None unless its window is open (F12)
+    dice: the ff_dice.DiceRoller of the session (made the default stream)
+    session: ff_sessions.Session shown, None unless attached by attach_session()
+    history: ff_undo.UndoHistory of both screens, each event loop turn one step
+    overlay_logs: logs added since the overlay was last published to
+    overlay_pending: True if the overlay is waiting to be published to
+    notices: logs from notify() waiting for a screen to be shown
+    """
+    def __init__(self, root, character, seed=None, journal=None, saved_logs=None,
+                 archive=None, overlay=None, dice=None, profiler=None):
+        """Sets up the (empty) screens in root for the given character, and starts
+        recording the session with dice from seed (random if None), or carrying
+        on with the DiceRoller dice if given
+        archive is a new in-memory LogArchive, with a LogIndex, if None"""
+        self.root = root
+        self.character = character
+        self.sheet_frame = Frame(self.root)
+        self.combat_frame = Frame(self.root)
+        self.sheet_gui = None
+        self.combat_gui = None
+        self.in_combat = False
+        self.journal = journal
+        self.saved_logs = saved_logs
+        if self.saved_logs is None:
+            self.saved_logs = {}
+        self.archive = archive
+        if self.archive is None:
+            self.archive = ff_logbook.LogArchive(index=ff_logsearch.LogIndex())
+        self.history_gui = None
+        self.roll_stats = ff_rollstats.RollStats()
+        self.stats_gui = None
+        self.overlay = overlay
+        self.overlay_logs = []
+        self.overlay_pending = False
+        if self.overlay is not None:
+            self.mark_overlay()
+        if self.journal is not None:
+            self.journal.watch_character(self.character)
+        if dice is None:
+            self.dice = ff_dice.new_session(seed)
+        else:
+            self.dice = ff_dice.resume_session(dice)
+        self.dice.add_listener(self.dice_rolled)
+        self.session = None
+        self.history = ff_undo.UndoHistory(on_step=self.mark_step)
+        self.history.watch(self.character)
+        self.root.bind('<Control-z>', lambda event: self.undo())
+        self.root.bind('<Control-y>', lambda event: self.redo())
+        self.profiler = profiler
+        self.profile_gui = None
+        if self.profiler is not None:
+            self.root.bind('<F12>', lambda event: self.show_profile())
+        self.recording = ff_replay.Recording(self.snapshot(), snapshot_source=self.snapshot)
+        self.notices = []
+    
+    def restore_logs(self, logbook, book):
+        """Puts the saved logs of book back into logbook, then journals it and
+        keeps the history window up to date with it, and adds any notices"""
+        logbook.restore(self.saved_logs.pop(book, []))
+        if self.journal is not None:
+            self.journal.watch_logbook(logbook, book)
+        logbook.add_listener(self.logs_added)
+        if self.notices:
+            logbook.add_logs(self.notices)
+            self.notices = []
+    
+    def logs_added(self, logs):
+        """Logbook listener; passes new logs on to the roll stats, and to the
+        history and stats windows, if open"""
+        self.roll_stats.logs_added(logs)
+        if self.history_gui is not None:
+            self.history_gui.logs_added(logs)
+        if self.stats_gui is not None:
+            self.stats_gui.mark_dirty()
+        if self.overlay is not None:
+            self.overlay_logs.extend(logs)
+            self.mark_overlay()
+    
+    def dice_rolled(self, sides, faces):
+        """DiceRoller listener; passes the faces on to the roll stats, and to
+        the stats window if open"""
+        self.roll_stats.dice_rolled(sides, faces)
+        if self.stats_gui is not None:
+            self.stats_gui.mark_dirty()
+    
+    def show_history(self):
+        """Opens the full history window, or brings it to the front if it's open"""
+        if self.history_gui is None:
+            window = Toplevel(self.root)
+            window.title("Logbook History")
+            window.protocol('WM_DELETE_WINDOW', self.close_history)
+            self.history_gui = ff_historyscreen.HistoryGui(window, self.archive)
+        else:
+            self.history_gui.history_window.lift()
+    
+    def close_history(self):
+        """Closes the full history window"""
+        self.history_gui.history_window.destroy()
+        self.history_gui = None
+    
+    def show_stats(self):
+        """Opens the dice stats window, or brings it to the front if it's open"""
+        if self.stats_gui is None:
+            window = Toplevel(self.root)
+            window.title("Dice Stats")
+            window.protocol('WM_DELETE_WINDOW', self.close_stats)
+            self.stats_gui = ff_statsscreen.StatsGui(window, self.roll_stats)
+        else:
+            self.stats_gui.stats_window.lift()
+    
+    def close_stats(self):
+        """Closes the dice stats window"""
+        self.stats_gui.stats_window.destroy()
+        self.stats_gui = None
+    
+    def show_profile(self):
+        """Opens the profile window, or brings it to the front if it's open"""
+        if self.profile_gui is None:
+            window = Toplevel(self.root)
+            window.title("Profile")
+            window.protocol('WM_DELETE_WINDOW', self.close_profile)
+            self.profile_gui = ff_profilescreen.ProfileGui(window, self.profiler)
+        else:
+            self.profile_gui.profile_window.lift()
+    
+    def close_profile(self):
+        """Closes the profile window"""
+        self.profile_gui.close()
+        self.profile_gui = None
+    
+    def record(self, action):
+        """Adds an action just taken on either screen to the recording"""
+        self.recording.record(action)
+        if self.overlay is not None:
+            self.mark_overlay()
+    
+    def mark_step(self):
+        """Called when a new undo step starts; ends it once the current event
+        has been handled, so a click (or a whole fight_to_end) is one step"""
+        self.root.after_idle(self.history.end_step)
+    
+    def undo(self):
+        """UNDO button; undoes the last step on either screen"""
+        if self.history.undo():
+            self.changes_undone('undo')
+    
+    def redo(self):
+        """REDO button; redoes the last step undone"""
+        if self.history.redo():
+            self.changes_undone('redo')
+    
+    def changes_undone(self, key):
+        """Logs an undo or redo on the screen shown, and records the state it
+        left, as replays can't undo"""
+        self.notify(ff_logbook.Log(key))
+        self.record(['restore', self.snapshot()])
+    
+    def notify(self, log):
+        """Logs a message from the program on the screen shown, or on the first
+        screen shown if there isn't one yet"""
+        if self.in_combat:
+            self.combat_gui.combat_logs.add_log(log)
+            self.combat_gui.refresh_logbook()
+        elif self.sheet_gui is not None:
+            self.sheet_gui.char_logs.add_log(log)
+            self.sheet_gui.refresh_logbook()
+        else:
+            self.notices.append(log)
+    
+    def mark_overlay(self):
+        """Makes sure the overlay is published to once the current event has
+        been handled, so a whole fight_to_end() goes out as one diff"""
+        if not self.overlay_pending:
+            self.overlay_pending = True
+            self.root.after_idle(self.publish_overlay)
+    
+    def publish_overlay(self):
+        """Publishes the current state and the logs added since last time"""
+        self.overlay_pending = False
+        logs = self.overlay_logs[ff_logbook.NUM_LOGS * -1:] #Only these are ever shown
+        self.overlay_logs = []
+        self.overlay.publish(self.overlay_state(), [log.log_string for log in logs])
+    
+    def overlay_state(self):
+        """Returns the state shown by the overlay, as plain lists and dicts"""
+        state = {'screen': 'combat' if self.in_combat else 'sheet',
+                 'player': {'name': self.character.name, 'stats': dict(self.character.stats)},
+                 'enemies': [], 'target': None, 'last_round': None}
+        if self.in_combat:
+            melee = self.combat_gui.melee
+            state['enemies'] = [{'name': enemy.name, 'stats': dict(enemy.stats)}
+                                for enemy in melee.fighters[melee.n_players:]]
+            state['target'] = melee.target()
+            state['last_round'] = self.combat_gui.last_round
+        return state
+    
+    def snapshot(self):
+        """Returns an ff_replay checkpoint of the session as it is now"""
+        rule = ff_combatengine.TARGET_RULES[0]
+        if self.combat_gui is not None:
+            rule = self.combat_gui.melee.rule
+        if self.in_combat:
+            return ff_replay.make_snapshot(self.character, self.combat_gui.melee, rule,
+                                           self.combat_gui.last_round, ff_dice.roller)
+        return ff_replay.make_snapshot(self.character, None, rule, None, ff_dice.roller)
+    
+    def start(self, mode_choice):
+        """Opens the first screen for the mode chosen in the QuestionGui"""
+        if mode_choice == "combat":
+            self.show_combat(self.character, None)
+        elif mode_choice == "full":
+            self.show_sheet()
+    
+    def show_sheet(self):
+        """Hides the combat screen and shows the character sheet"""
+        self.combat_frame.grid_remove()
+        if self.sheet_gui is None:
+            self.sheet_gui = ff_charactersheet.CharacterSheetGui(self.sheet_frame,
+                                                                 self.character, self)
+            self.restore_logs(self.sheet_gui.char_logs, 'sheet')
+            self.sheet_gui.refresh_logbook()
+        self.sheet_frame.grid(row=0, column=0)
+    
+    def show_combat(self, player, enemy):
+        """Hides the character sheet and shows the combat screen, for a new fight
+        between player and enemy. enemy is a standard enemy if None"""
+        if enemy is None:
+            enemy = ff_character.make_default_enemy()
+        self.sheet_frame.grid_remove()
+        if self.combat_gui is None:
+            self.combat_gui = ff_combatscreen.CombatGui(self.combat_frame, player, enemy,
+                                                        on_end=self.end_combat,
+                                                        on_record=self.record,
+                                                        archive=self.archive,
+                                                        on_history=self.show_history,
+                                                        on_stats=self.show_stats,
+                                                        history=self.history,
+                                                        on_undo=self.undo, on_redo=self.redo)
+            self.restore_logs(self.combat_gui.combat_logs, 'combat')
+            self.combat_gui.refresh_logbook()
+        else:
+            self.combat_gui.start_fight(player, enemy)
+        self.in_combat = True
+        self.record(['new_fight', ff_replay.character_snapshot(enemy)])
+        self.combat_frame.grid(row=0, column=0)
+    
+    def resume_combat(self, melee, last_round):
+        """Hides the character sheet and shows the combat screen for melee, a
+        fight already under way (e.g. in a session switched back to)"""
+        self.sheet_frame.grid_remove()
+        if self.combat_gui is None:
+            self.combat_gui = ff_combatscreen.CombatGui(self.combat_frame, melee.fighters[0],
+                                                        melee.fighters[melee.n_players],
+                                                        on_end=self.end_combat,
+                                                        on_record=self.record,
+                                                        archive=self.archive,
+                                                        on_history=self.show_history,
+                                                        on_stats=self.show_stats,
+                                                        history=self.history,
+                                                        on_undo=self.undo, on_redo=self.redo)
+            self.restore_logs(self.combat_gui.combat_logs, 'combat')
+        self.combat_gui.resume_fight(melee, last_round)
+        self.in_combat = True
+        #The recording starts again from here, as it can't replay how the fight began
+        self.recording = ff_replay.Recording(self.snapshot(), snapshot_source=self.snapshot)
+        self.combat_frame.grid(row=0, column=0)
+    
+    def sync(self):
+        """Writes the fight and logbooks shown back into session"""
+        game = self.session.game
+        game.melee = self.combat_gui.melee if self.in_combat else None
+        game.last_round = self.combat_gui.last_round if self.in_combat else None
+        if self.combat_gui is not None:
+            game.rule = self.combat_gui.melee.rule
+        #A screen never built leaves its logs as they were
+        logbooks = {}
+        if self.sheet_gui is not None:
+            logbooks['sheet'] = self.sheet_gui.char_logs
+        if self.combat_gui is not None:
+            logbooks['combat'] = self.combat_gui.combat_logs
+        for book, logbook in logbooks.items():
+            self.session.logs[book].clear()
+            self.session.logs[book].extend(logbook.log_list)
+    
+    def detach(self):
+        """Hands the session back (see sync) and takes the screens down, leaving
+        root empty for the next session"""
+        self.root.update_idletasks() #Finish any redraws waiting on the screens
+        if self.session is not None:
+            self.sync()
+        if self.history_gui is not None:
+            self.close_history()
+        if self.stats_gui is not None:
+            self.close_stats()
+        if self.profile_gui is not None:
+            self.close_profile()
+        if self.combat_gui is not None:
+            self.combat_gui.stop_animation()
+            self.combat_gui.detach_fighters()
+        if self.sheet_gui is not None:
+            self.character.remove_listener(self.sheet_gui.character_changed)
+        self.history.close()
+        self.dice.remove_listener(self.dice_rolled)
+        self.sheet_frame.destroy()
+        self.combat_frame.destroy()
+    
+    def end_combat(self):
+        """Goes back to the character sheet after a fight, or closes the program
+        if it was only run as a combat calculator"""
+        self.in_combat = False
+        self.record(['end_fight'])
+        if self.sheet_gui is None:
+            self.root.destroy()
+        else:
+            self.show_sheet()
+            self.sheet_gui.battle_over()
+
+
+class SessionWindows:
+    """
+    What gui --session keeps whichever session is shown: the sessions window,
+    and evicting idle sessions to disk every EVICT_MS
+    
+    Attributes:
+    root: the Tk window
+    host: ff_sessions.SessionHost whose sessions are shown in root
+    sessions_gui: SessionsGui of host, None unless its window is open (F9)
+    evict_id: Tk after() id of the next look for idle sessions
+    recording: ff_replay.Recording of the session shown when the program
+        closed, None until then
+    """
+    def __init__(self, root, host):
+        """Starts looking for idle sessions, and opens the sessions window"""
+        self.root = root
+        self.host = host
+        self.sessions_gui = None
+        self.recording = None
+        self.evict_id = self.root.after(EVICT_MS, self.evict_idle)
+        self.root.bind('<F9>', lambda event: self.show_sessions())
+        self.show_sessions()
+    
+    def show_sessions(self):
+        """Opens the sessions window, or brings it to the front if it's open"""
+        if self.sessions_gui is None:
+            window = Toplevel(self.root)
+            window.title("Sessions")
+            window.protocol('WM_DELETE_WINDOW', self.close_sessions)
+            self.sessions_gui = ff_sessionscreen.SessionsGui(window, self.host)
+        else:
+            self.sessions_gui.sessions_window.lift()
+    
+    def close_sessions(self):
+        """Closes the sessions window"""
+        self.sessions_gui.close()
+        self.sessions_gui = None
+    
+    def evict_idle(self):
+        """Saves the sessions left idle to disk and drops them from memory"""
+        self.host.evict_idle()
+        self.evict_id = self.root.after(EVICT_MS, self.evict_idle)
+    
+    def close(self):
+        """Saves every session to disk (while the window is still there to
+        hand the one shown back) and closes the program, keeping the recording
+        of the one shown, as closing the host detaches its screens"""
+        self.root.after_cancel(self.evict_id)
+        if self.sessions_gui is not None:
+            self.close_sessions()
+        if self.host.gui is not None:
+            self.recording = self.host.gui.recording
+        self.host.close()
+        self.root.destroy()
+
+def attach_session(root, archive=None, overlay=None, profiler=None):
+    """Returns the attach function for an ff_sessions.SessionHost, which shows
+    each session switched to on the full program in root (sharing the archive,
+    overlay and profiler), and returns its ScreenManager"""
+    def attach(session):
+        screens = ScreenManager(root, session.game.player, archive=archive, overlay=overlay,
+                                dice=session.game.dice, profiler=profiler,
+                                saved_logs={book: list(logs) for book, logs in session.logs.items()})
+        screens.session = session
+        screens.start("full")
+        if session.game.melee is not None:
+            screens.resume_combat(session.game.melee, session.game.last_round)
+        return screens
+    return attach
+
+def run_code(overlay_on=None, seed=None, profile_on=None, session_name=None):
+    """Little bit of code that runs everything
+    overlay_on starts the stream overlay (ff_overlay.OVERLAY_ON if None),
+    seed starts the dice (random if None), and profile_on times every button
+    and the event loop (ff_profiler.PROFILE_ON if None)
+    With a session_name, the program shows that session of ff_sessions
+    (started with seed if it's new) instead of the journal's character, and
+    the sessions window switches to the others"""
+    if overlay_on is None:
+        overlay_on = ff_overlay.OVERLAY_ON
+    if profile_on is None:
+        profile_on = ff_profiler.PROFILE_ON
+    root = Tk()
+    profiler = None
+    if profile_on: #Before any screen is built, so their buttons get the timed handlers
+        profiler = ff_profiler.Profiler()
+        profiler.instrument(ff_charactersheet.CharacterSheetGui)
+        profiler.instrument(ff_combatscreen.CombatGui)
+        profiler.start(root)
+    history = ff_history.HistoryFile()
+    history_path = ff_files.data_path(ff_history.HISTORY_FILE)
+    records = ff_history.HistoryFile(history_path + ff_logsearch.RECORDS_SUFFIX)
+    index = ff_logsearch.LogIndex(records, history_path + ff_logsearch.TERMS_SUFFIX)
+    notices = [] #Logged on the screen once it's shown
+    if profiler is not None:
+        notices.append(ff_logbook.Log('profiling', ff_files.data_path(ff_profiler.PROFILE_FILE)))
+    overlay = None
+    if overlay_on:
+        overlay = ff_overlay.OverlayServer()
+        try:
+            overlay.start()
+        except OSError as error: #The overlay is optional, so carry on without it
+            notices.append(ff_logbook.Log('no_overlay', str(error)))
+            overlay = None
+    archive = ff_logbook.LogArchive(history, index)
+    journal = None
+    screens = None
+    session_windows = None
+    if session_name is None:
+        journal = ff_journal.Journal()
+        character, saved_logs = journal.load(ff_character.Character())
+        screens = ScreenManager(root, character, seed, journal=journal, saved_logs=saved_logs,
+                                archive=archive, overlay=overlay, profiler=profiler)
+        question_frame = Frame(root)
+        question_frame.grid(row=0, column=0)
+        question_gui = QuestionGui(question_frame, on_choice=screens.start)
+        shown = screens
+    else:
+        host = ff_sessions.SessionHost(attach=attach_session(root, archive, overlay, profiler))
+        if session_name not in host.names():
+            host.new_session(session_name, seed=seed)
+        host.switch(session_name)
+        session_windows = SessionWindows(root, host)
+        root.protocol('WM_DELETE_WINDOW', session_windows.close)
+        shown = host.gui
+    for log in notices:
+        shown.notify(log)
+    root.mainloop()
+    #If the window is closed before a choice is made, no further action is taken
+    if journal is not None:
+        journal.close()
+    if overlay is not None:
+        overlay.stop()
+    if profiler is not None:
+        profiler.stop()
+        profiler.restore()
+        profiler.save()
+    archive.flush()
+    index.save_terms()
+    history.close()
+    records.close()
+    recording = None
+    if screens is not None:
+        recording = screens.recording
+    elif session_windows is not None:
+        recording = session_windows.recording
+    if recording is not None and len(recording) > 0:
+        recording.save(ff_files.data_path(ff_replay.RECORDING_FILE))
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes where the program keeps its files - the odds table, journal, logbook
+    history, recording, sessions and profile all go in one data directory,
+    whichever directory the program is started from - and how the ones saved
+    whole are written, so a crash never leaves them half written
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter.
+
+The data directory is the first of:
+    the one given to set_data_dir() (the --data-dir option of ff_cli)
+    the one in the DATA_DIR_VARIABLE environment variable
+    the user's own data directory: %APPDATA%/fighting_fantasy on Windows,
+        ~/Library/Application Support/fighting_fantasy on macOS, and
+        $XDG_DATA_HOME/fighting_fantasy (~/.local/share/fighting_fantasy) elsewhere
+"""
+import os
+import sys
+
+APP_DIR_NAME = "fighting_fantasy" #The program's directory in the user's data directory
+DATA_DIR_VARIABLE = "FF_DATA_DIR" #Environment variable naming the data directory
+
+_data_dir = None #Set by set_data_dir(), None to use the environment or the user's directory
+
+def user_data_dir():
+    """Returns the program's directory in the user's data directory for this platform"""
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser("~")
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser("~/.local/share")
+    return os.path.join(base, APP_DIR_NAME)
+
+def set_data_dir(path):
+    """Keeps the program's files in path from now on (None to go back to the default)"""
+    global _data_dir
+    _data_dir = path
+
+def data_dir():
+    """Returns the directory the program's files are kept in (see above)"""
+    return _data_dir or os.environ.get(DATA_DIR_VARIABLE) or user_data_dir()
+
+def data_path(name):
+    """Returns the path of the file (or directory) called name in the data
+    directory, making the data directory if it isn't there yet"""
+    directory = data_dir()
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name)
+
+def write_file(path, text):
+    """Replaces the file at path with text, so that after a crash it holds
+    either all of the old text or all of the new"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w') as temp_file:
+        temp_file.write(text)
+        temp_file.flush()
+        os.fsync(temp_file.fileno())
+    os.replace(temp_path, path)
@@ -0,0 +1,128 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the HistoryFile class - the full logbook history, kept on disk and
+    memory-mapped so it costs the same memory however long it gets
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter.
+
+Two files make up a history:
+    HISTORY_FILE - every log in turn (see ff_logbook.LogArchive), each
+        followed by a newline
+    HISTORY_FILE + INDEX_SUFFIX - for each log, the offset (OFFSET_FORMAT)
+        in the first file just past its newline
+so log i runs from the end of log i - 1 to its own end, and any log can be
+    read without reading the ones before it
+The logbook history is HISTORY_FILE in the data directory (see ff_files)
+"""
+import mmap
+import os
+import struct
+from . import ff_files
+
+HISTORY_FILE = "ff_history.dat"
+INDEX_SUFFIX = ".idx"
+OFFSET_FORMAT = "<Q"
+OFFSET_SIZE = struct.calcsize(OFFSET_FORMAT)
+
+class HistoryFile:
+    """
+    An append-only list of strings on disk, read through memory maps
+
+    Attributes:
+    str  path - the data file; the index file is path + INDEX_SUFFIX
+    int  count - number of strings in the history
+    int  data_end - size of the data file
+    mmap data_map, index_map - maps of both files, None until first read
+    int  mapped_count - count when the maps were made; they're remade once it changes
+    """
+    def __init__(self, path=None):
+        """Opens (or creates) the history at path (HISTORY_FILE in the data
+        directory if None), dropping anything half written if the program
+        stopped partway through an append"""
+        if path is None:
+            path = ff_files.data_path(HISTORY_FILE)
+        self.path = path
+        self.data_file = open(path, 'a+b')
+        self.index_file = open(path + INDEX_SUFFIX, 'a+b')
+        self.count = os.path.getsize(path + INDEX_SUFFIX) // OFFSET_SIZE
+        self.data_end = 0
+        if self.count > 0:
+            with open(path + INDEX_SUFFIX, 'rb') as index_file:
+                index_file.seek((self.count - 1) * OFFSET_SIZE)
+                self.data_end = struct.unpack(OFFSET_FORMAT, index_file.read(OFFSET_SIZE))[0]
+        if self.data_end > os.path.getsize(path): #Index written past the data, can't trust it
+            self.count = self.data_end = 0
+        #The data is written before the index, so any extra data was never indexed
+        self.data_file.truncate(self.data_end)
+        self.index_file.truncate(self.count * OFFSET_SIZE)
+        self.data_map = None
+        self.index_map = None
+        self.mapped_count = 0
+
+    def __len__(self):
+        """Returns the number of strings in the history"""
+        return self.count
+
+    def __getitem__(self, index):
+        """Returns the string at index, or a list of strings for a slice"""
+        if isinstance(index, slice):
+            return [self.read(i) for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("History index out of range")
+        return self.read(index)
+
+    def read(self, index):
+        """Returns the string at index, which must be in range"""
+        if self.mapped_count != self.count:
+            self.map()
+        end = struct.unpack_from(OFFSET_FORMAT, self.index_map, index * OFFSET_SIZE)[0]
+        start = 0
+        if index > 0:
+            start = struct.unpack_from(OFFSET_FORMAT, self.index_map, (index - 1) * OFFSET_SIZE)[0]
+        return self.data_map[start:end - 1].decode('utf-8')
+
+    def map(self):
+        """(Re)maps both files, to include everything appended so far"""
+        self.unmap()
+        self.data_map = mmap.mmap(self.data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index_map = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.mapped_count = self.count
+
+    def unmap(self):
+        """Closes the maps, if there are any"""
+        if self.data_map is not None:
+            self.data_map.close()
+            self.index_map.close()
+            self.data_map = self.index_map = None
+        self.mapped_count = 0
+
+    def append(self, texts):
+        """Adds each string in texts to the end of the history"""
+        data = bytearray()
+        offsets = bytearray()
+        for text in texts:
+            data += text.encode('utf-8') + b"\n"
+            offsets += struct.pack(OFFSET_FORMAT, self.data_end + len(data))
+        if not data:
+            return
+        self.data_file.write(data)
+        self.data_file.flush()
+        self.index_file.write(offsets)
+        self.index_file.flush()
+        self.data_end += len(data)
+        self.count += len(offsets) // OFFSET_SIZE
+
+    def close(self):
+        """Closes the files"""
+        self.unmap()
+        self.data_file.close()
+        self.index_file.close()
@@ -0,0 +1,149 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the HistoryGui class - a scrollable window of the full logbook history,
+    which can be filtered down to the logs found by an ff_logsearch search
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+
+Only the HISTORY_ROWS logs in view are ever read from the archive and
+    formatted, so the window opens and scrolls just as fast with half a
+    million logs as with ten
+
+Filters are typed as words separated by spaces (see ff_logsearch.parse_filter):
+    take_dmg name=Champion  - every time Champion took damage
+    roll_luck <5            - all luck rolls below 5
+"""
+from tkinter import *
+from tkinter.font import *
+from . import ff_resources
+from . import ff_logsearch
+
+HISTORY_ROWS = 30 #Logs shown at once
+
+class HistoryGui:
+    """
+    A window showing any part of a LogArchive, HISTORY_ROWS logs at a time
+
+    Non-GUI Attributes:
+    obj  archive: ff_logbook.LogArchive being shown
+    dict query: ff_logsearch.parse_filter() of the filter typed, None if there isn't one
+    obj  shown: the archive, or the SearchResults of query
+    int  searched: length of the archive when shown was last searched
+    int  top: index of the first log in view
+    bool follow: True while the view is at the end, so it follows new logs
+    bool flush_pending: True if the view is waiting to be redrawn
+
+    All widgets are classified by self.widgetname
+    """
+    def __init__(self, window, archive):
+        """Builds the history view of archive in window (a Toplevel), starting
+        at the most recent logs"""
+        self.history_window = window
+        self.archive = archive
+        self.query = None
+        self.shown = archive
+        self.searched = 0
+        self.top = 0
+        self.follow = True
+        self.flush_pending = False
+
+        self.smallfont = ff_resources.get_resources(window).font('small')
+        self.build_history_gui()
+        self.flush()
+
+    def build_history_gui(self):
+        """Builds the filter box, the rows label and its scrollbar"""
+        filter_frame = Frame(self.history_window)
+        filter_frame.grid(row=0, column=0, columnspan=2, sticky='w')
+        self.filter_label = Label(filter_frame, font=self.smallfont, text="Filter:")
+        self.filter_label.grid(row=0, column=0)
+        self.filter_var = StringVar(self.history_window)
+        self.filter_var.trace_add('write', lambda *args: self.filter_edited())
+        self.filter_entry = Entry(filter_frame, font=self.smallfont, width=40,
+                                  textvariable=self.filter_var)
+        self.filter_entry.grid(row=0, column=1)
+        self.status_label = Label(filter_frame, font=self.smallfont)
+        self.status_label.grid(row=0, column=2, padx=10)
+        self.rows_label = Label(self.history_window, font=self.smallfont, height=HISTORY_ROWS,
+                                width=88, anchor='nw', justify='left')
+        self.rows_label.grid(row=1, column=0, sticky='nsew')
+        self.rows_scroll = Scrollbar(self.history_window, command=self.scroll)
+        self.rows_scroll.grid(row=1, column=1, sticky='ns')
+        #Mouse wheel on Windows & Mac, then X11
+        self.history_window.bind('<MouseWheel>',
+                                 lambda event: self.scroll('scroll', -1 * event.delta // 120, 'units'))
+        self.history_window.bind('<Button-4>', lambda event: self.scroll('scroll', -1, 'units'))
+        self.history_window.bind('<Button-5>', lambda event: self.scroll('scroll', 1, 'units'))
+        self.history_window.bind('<Prior>', lambda event: self.scroll('scroll', -1, 'pages'))
+        self.history_window.bind('<Next>', lambda event: self.scroll('scroll', 1, 'pages'))
+        self.history_window.bind('<Home>', lambda event: self.scroll('moveto', 0))
+        self.history_window.bind('<End>', lambda event: self.scroll('moveto', 1))
+
+    def filter_edited(self):
+        """Trace callback of the filter box; shows only the matching logs, or
+        every log if the filter is empty"""
+        text = self.filter_var.get()
+        if text.strip() == "":
+            self.query = None
+            self.shown = self.archive
+            self.status_label['text'] = ""
+        else:
+            try:
+                self.query = ff_logsearch.parse_filter(text)
+            except ValueError as error: #Probably still being typed; keep the last good filter
+                self.status_label['text'] = str(error)
+                return
+            self.search()
+        self.follow = True
+        self.mark_dirty()
+    
+    def search(self):
+        """Searches the archive for the current query"""
+        self.shown = ff_logsearch.search(self.archive, **self.query)
+        self.searched = len(self.archive)
+        self.status_label['text'] = "{} found".format(len(self.shown))
+    
+    def scroll(self, action, amount, unit=None):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units' or 'pages')"""
+        if action == 'moveto':
+            self.top = int(float(amount) * len(self.shown))
+        elif unit == 'pages':
+            self.top += int(amount) * HISTORY_ROWS
+        else:
+            self.top += int(amount)
+        self.top = max(0, min(self.top, len(self.shown) - HISTORY_ROWS))
+        self.follow = self.top >= len(self.shown) - HISTORY_ROWS
+        self.mark_dirty()
+
+    def logs_added(self, logs):
+        """Logbook listener; redraws the view if it's following the end or
+        filtered (as the new logs might match)"""
+        if self.follow or self.query is not None:
+            self.mark_dirty()
+
+    def mark_dirty(self):
+        """Makes sure the view is redrawn once the current event has been handled"""
+        if not self.flush_pending:
+            self.flush_pending = True
+            self.history_window.after_idle(self.flush)
+
+    def flush(self):
+        """Redraws the logs in view and the scrollbar"""
+        self.flush_pending = False
+        if self.query is not None and self.searched != len(self.archive):
+            self.search()
+        total = len(self.shown)
+        if self.follow:
+            self.top = max(0, total - HISTORY_ROWS)
+        rows = self.shown[self.top:self.top + HISTORY_ROWS]
+        self.rows_label['text'] = "\n".join(log.log_string for log in rows)
+        if total == 0:
+            self.rows_scroll.set(0, 1)
+        else:
+            self.rows_scroll.set(self.top / total, (self.top + len(rows)) / total)
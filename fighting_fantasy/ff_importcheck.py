@@ -0,0 +1,95 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the import-time benchmark - checks that the headless modules and
+    commands stay quick to start, and never load tkinter (or NumPy before
+    a simulation needs it)
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Run to check for regressions, e.g. before a release:
+    python -m fighting_fantasy.ff_importcheck
+Prints the best of REPEATS fresh interpreters for each check, and exits with
+    status 1 if any is over its budget.
+Does not import tkinter.
+"""
+import subprocess
+import sys
+import time
+
+REPEATS = 5 #Fresh interpreters timed per check; the fastest counts, as the others were slowed by something else
+HEADLESS_MODULES = ('ff_cli', 'ff_character', 'ff_combatengine', 'ff_dice', 'ff_oddstable',
+                    'ff_replay', 'ff_journal', 'ff_sessions', 'ff_logbook', 'ff_logsearch',
+                    'ff_history', 'ff_rollstats', 'ff_undo', 'ff_playthrough', 'ff_profiler',
+                    'ff_files')
+#ff_overlay isn't in HEADLESS_MODULES: asyncio alone takes ~30ms, and only the gui command loads it
+NEVER_IMPORTED = ('tkinter', 'numpy') #Not loaded by importing any headless module
+IMPORT_BUDGET = 0.05 #Seconds to import every headless module
+COMMAND_BUDGET = 0.15 #Seconds for each of COMMANDS, interpreter start up included
+COMMANDS = (('odds', '--player', '10', '20', '--enemy', '8', '12'),
+            ('sim', '--player', '10', '20', '--enemy', '8', '12', '--trials', '1')) #Timed from start to finish
+IMPORT_CODE = """
+import sys, time
+start = time.perf_counter()
+{imports}
+print(time.perf_counter() - start)
+print(' '.join(name for name in {never!r} if name in sys.modules))
+"""
+
+def time_imports():
+    """Returns the best time to import every headless module in a fresh
+    interpreter, and the NEVER_IMPORTED modules they loaded"""
+    imports = "\n".join("import fighting_fantasy.{}".format(module) for module in HEADLESS_MODULES)
+    code = IMPORT_CODE.format(imports=imports, never=NEVER_IMPORTED)
+    best = None
+    for _ in range(REPEATS):
+        output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True,
+                                text=True).stdout.split("\n")
+        seconds, loaded = float(output[0]), output[1].split()
+        if best is None or seconds < best:
+            best = seconds
+    return best, loaded
+
+def time_command(command):
+    """Returns the best time to run a fighting_fantasy command in a fresh interpreter"""
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "fighting_fantasy"] + list(command), check=True,
+                       stdout=subprocess.DEVNULL)
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    return best
+
+def check():
+    """Runs every check, printing the results; returns True if they all passed"""
+    passed = True
+    seconds, loaded = time_imports()
+    print("Import headless modules: {:.1f}ms (budget {:.0f}ms)".format(seconds * 1000,
+                                                                      IMPORT_BUDGET * 1000))
+    if seconds > IMPORT_BUDGET:
+        print("    Over budget - run python -X importtime to see what's slow")
+        passed = False
+    if loaded:
+        print("    Imported {}".format(", ".join(loaded)))
+        passed = False
+    for command in COMMANDS:
+        seconds = time_command(command)
+        print("{}: {:.1f}ms (budget {:.0f}ms)".format(" ".join(command), seconds * 1000,
+                                                      COMMAND_BUDGET * 1000))
+        if seconds > COMMAND_BUDGET:
+            print("    Over budget")
+            passed = False
+    return passed
+
+def main():
+    """Runs the checks, exiting with status 1 if any failed"""
+    if not check():
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the Journal class - saves the main character and the logbooks to
+    disk as they change, so the next run carries on where the last one stopped
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter.
+
+Every change is appended to JOURNAL_FILE as one line of JSON:
+    [seq, 'stat', stat, value]      - a change to Character.stats
+    [seq, 'detail', field, text]    - a change to the name, potion or inventory
+    [seq, 'log', book, log]         - a new log in the 'sheet' or 'combat' logbook,
+                                      as ff_logbook.Log.to_json() (or its text,
+                                      in journals written before)
+The lines are written, flushed and fsynced in batches by a background thread,
+    so the GUI never waits on the disk. Every COMPACT_EVERY entries the thread
+    writes the whole state to SNAPSHOT_FILE and starts the journal again, so
+    loading only ever reads one snapshot and at most COMPACT_EVERY lines
+Both files are kept in the data directory (see ff_files)
+"""
+import collections
+import json
+import os
+import queue
+import threading
+from . import ff_files
+from . import ff_logbook
+from . import ff_replay
+
+JOURNAL_FILE = "ff_journal.jsonl"
+SNAPSHOT_FILE = "ff_journal_snapshot.json"
+JOURNAL_VERSION = 1
+COMPACT_EVERY = 1000 #Journal entries between snapshots
+BATCH_SIZE = 256     #Most entries written (and fsynced) at once
+
+def new_state(character):
+    """Returns the journal's record of a character with empty logbooks"""
+    return {'seq': 0, 'character': ff_replay.character_snapshot(character),
+            'logs': {book: collections.deque(maxlen=ff_logbook.NUM_LOGS)
+                     for book in ff_logbook.LOG_BOOKS}}
+
+def apply_entry(state, entry):
+    """Updates state with one journal entry"""
+    seq, kind, key, value = entry
+    if kind == 'stat':
+        state['character']['stats'][key] = value
+    elif kind == 'detail':
+        state['character'][key] = value
+    elif kind == 'log':
+        state['logs'][key].append(value)
+    else:
+        raise ValueError("Unknown journal entry: {}".format(entry))
+    state['seq'] = seq
+
+class Journal:
+    """
+    The on-disk record of the main character and the logbooks
+
+    Attributes:
+    str    path - the journal file
+    str    snapshot_path - the snapshot file
+    int    seq - number of the last entry given to the writer
+    dict   state - the state as last written, only touched by the writer thread
+    int    since_compact - entries in the journal file since the last snapshot
+    Queue  entries - entries waiting for the writer thread; None closes it
+    Thread writer - the background thread writing entries
+    """
+    def __init__(self, path=None, snapshot_path=None):
+        """Sets up the journal, which does nothing until load() is called.
+        The files are JOURNAL_FILE and SNAPSHOT_FILE in the data directory if None"""
+        if path is None:
+            path = ff_files.data_path(JOURNAL_FILE)
+        if snapshot_path is None:
+            snapshot_path = ff_files.data_path(SNAPSHOT_FILE)
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.seq = 0
+        self.state = None
+        self.since_compact = 0
+        self.entries = queue.Queue()
+        self.writer = None
+
+    def load(self, default_character):
+        """Reads the snapshot and journal, starts the writer thread, and returns
+        the saved character and logs as (Character, {book: [Log]}).
+        If nothing has been saved yet, default_character is used"""
+        state = new_state(default_character)
+        try:
+            with open(self.snapshot_path) as snapshot_file:
+                saved = json.load(snapshot_file)
+            if saved.get('version') == JOURNAL_VERSION:
+                state['seq'] = saved['seq']
+                state['character'] = saved['character']
+                for book in ff_logbook.LOG_BOOKS:
+                    state['logs'][book].extend(saved['logs'][book])
+        except FileNotFoundError:
+            pass
+        try:
+            with open(self.path, 'rb+') as journal_file:
+                good_end = 0
+                for line in journal_file:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError
+                        entry = json.loads(line)
+                    except ValueError: #Half-written when the program stopped
+                        journal_file.truncate(good_end) #So new entries follow the last good one
+                        break
+                    good_end += len(line)
+                    if entry[0] > state['seq']: #Older entries are already in the snapshot
+                        apply_entry(state, entry)
+                        self.since_compact += 1
+        except FileNotFoundError:
+            pass
+        self.state = state
+        self.seq = state['seq']
+        self.writer = threading.Thread(target=self.write_entries, daemon=True)
+        self.writer.start()
+        character = ff_replay.character_from_snapshot(state['character'])
+        logs = {book: [ff_logbook.log_from_json(log) for log in state['logs'][book]]
+                for book in ff_logbook.LOG_BOOKS}
+        return character, logs
+
+    def watch_character(self, character):
+        """Journals every change to character from now on"""
+        character.add_listener(self.character_changed)
+
+    def watch_logbook(self, logbook, book):
+        """Journals every log added to logbook from now on, under book"""
+        logbook.add_listener(lambda logs: self.logs_added(book, logs))
+
+    def character_changed(self, character, field):
+        """Listener for the character; queues the new value of field"""
+        if field in character.stats:
+            self.add_entry('stat', field, character.stats[field])
+        else:
+            self.add_entry('detail', field, getattr(character, field))
+
+    def logs_added(self, book, logs):
+        """Listener for a logbook; queues the new logs, unformatted. They're
+        turned into plain lists here, as the Logs themselves belong to the GUI
+        (formatting one caches the string in it), not the writer thread"""
+        for log in logs:
+            self.add_entry('log', book, log.to_json())
+
+    def add_entry(self, kind, key, value):
+        """Queues an entry for the writer thread"""
+        self.seq += 1
+        self.entries.put([self.seq, kind, key, value])
+
+    def write_entries(self):
+        """The writer thread: writes each batch of queued entries with one
+        fsync, compacting the journal into a snapshot when it gets long"""
+        journal_file = open(self.path, 'a')
+        closing = False
+        while not closing:
+            batch = [self.entries.get()] #Waits for the next entry
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.entries.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            for entry in batch:
+                if entry is None:
+                    closing = True
+                    break
+                apply_entry(self.state, entry)
+                lines.append(json.dumps(entry) + "\n")
+            journal_file.write("".join(lines))
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+            self.since_compact += len(lines)
+            if self.since_compact >= COMPACT_EVERY:
+                journal_file.close()
+                self.compact()
+                journal_file = open(self.path, 'w')
+        journal_file.close()
+
+    def compact(self):
+        """Writes the whole state to the snapshot file, then empties the journal.
+        If the program stops in between, load() skips the entries already in
+        the snapshot by their seq"""
+        snapshot = {'version': JOURNAL_VERSION, 'seq': self.state['seq'],
+                    'character': self.state['character'],
+                    'logs': {book: list(logs) for book, logs in self.state['logs'].items()}}
+        ff_files.write_file(self.snapshot_path, json.dumps(snapshot))
+        self.since_compact = 0
+
+    def close(self):
+        """Writes any entries still queued, then stops the writer thread"""
+        if self.writer is not None:
+            self.entries.put(None)
+            self.writer.join()
+            self.writer = None
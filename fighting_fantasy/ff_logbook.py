@@ -0,0 +1,288 @@
+"""
+Alasdair Smith
+Started 12/08/2017
+
+Module for the Fighting Fantasy Program
+Includes the Log and Logbook classes - for representing action logs in the
+    charactersheet and combatscreen GUIs
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+
+Contains its own set of globals
+"""
+import collections
+import json
+
+NUM_LOGS = 8 #Number of most recent logs to be formatted
+LOG_BOOKS = ('sheet', 'combat') #The logbooks of the character sheet and combat screen, as saved
+
+#These can't have more than 3 different format vars!
+# - Enforced by the Log initialiser
+STANDARD_LOGS = {
+    "space"        : "",
+    "eat"          : "{0} ate a ration.",               #0 = player
+    "roll_die"     : "{0} rolled a {1}",                #0 = player, 1 = roll
+    "roll_die_ext" : " and a {0}",                      #0 = roll
+    "total_roll"   : ", totalling {0}",                 #0 = sum
+    "attack_val"   : ", for an attack value of {0}.",   #0 = attack value
+    "take_dmg"     : "{0} was hit for {1} damage.",     #0 = player, 1 = dmg
+    "hit_by"       : "{0} was hit by {1} for {2} damage.", #0 = player, 1 = attacker, 2 = dmg
+    "draw"         : "Draw, no damage dealt.",          #No formats
+    "roll_luck"    : "Rolled for luck, got {0}.",       #0 = roll
+    "less_dmg"     : "{0} took {1} less damage!",       #0 = player, 1 = dmg
+    "more_dmg"     : "{0} took {1} more damage!",       #0 = player, 1 = dmg
+    "success"      : "Success!",                        #No formats
+    "failure"      : "Failure!",                        #No formats
+    "stat_up"      : "{0} increased by {1}.",           #0 = stat, 1 = amount
+    "stat_down"    : "{0} reduced by {1}.",             #0 = stat, 1 = amount
+    "refresh"      : "Stats updated successfully!",     #No formats
+    "battle"       : "{0} fought a battle.",            #0 = player
+    "new_stats"    : "Stats rerolled! Now updated.",    #No formats
+    "clear_pot"    : "Potion cleared.",                 #No formats
+    "unchanged"    : "{0} unchanged.",                  #0 = stat
+    "err_draw"     : "Cannot do luck check; last round was a draw.", #No formats
+    "err_no_fight" : "Cannot do luck check; no new combats.",        #No formats
+    "options"      : "Options updated",                 #No formats
+    "undo"         : "Last change undone.",             #No formats
+    "redo"         : "Last change redone.",             #No formats
+    "no_overlay"   : "Overlay not started: {0}",        #0 = error
+    "profiling"    : "Timings will be saved to {0}"     #0 = path
+    }
+
+class Log:
+    """
+    Defines objects representing a particular action made by the user or program
+    
+    Logs can be individual or a block of multiple logs joined into one line
+    
+    A Log only stores the STANDARD_LOGS key and its format arguments; the
+    string is formatted the first time it's displayed (most archived logs
+    never are), and a block of logs is joined in one go at that point
+    
+    Attributes:
+    str   key - a STANDARD_LOGS key, or a pre-formatted string
+    tuple args - the format arguments, None if key is pre-formatted
+    list  parts - the other Logs appended to this one, None if there are none
+    
+    NOTE: Try to avoid multiline logs, the display becomes erratic
+    """
+    __slots__ = ('key', 'args', 'parts', 'string')
+    
+    def __init__(self, log, format1=None, format2=None, format3=None):
+        """Creates the new Log object
+        Cannot be called with more than 3 formatting strings"""
+        if log in STANDARD_LOGS.keys(): #New log with formats
+            self.args = (format1, format2, format3)
+        elif type(log) == str: #Unknown or pre-formatted string as new log
+            self.args = None
+        else: #Type cannot be handled
+            raise TypeError("Attempted to create Log with {} attribute".format(type(log)))
+        self.key = log
+        self.parts = None
+        self.string = None #Formatted log_string, once it has been asked for
+    
+    def __repr__(self):
+        """Returns the string log_string for display"""
+        return self.log_string
+    
+    @property
+    def log_string(self):
+        """The formatted string of this log and any logs appended to it"""
+        if self.string is None:
+            if self.parts is None:
+                self.string = self.format_own()
+            else:
+                self.string = "".join([self.format_own()] +
+                                      [part.log_string for part in self.parts])
+        return self.string
+    
+    def format_own(self):
+        """Returns the formatted string of this log alone, without appended logs"""
+        if self.args is None:
+            return self.key
+        return STANDARD_LOGS[self.key].format(*self.args)
+    
+    def append_log(self, otherlog):
+        """Appends otherlog to the end of this log's string
+        """
+        if self.parts is None:
+            self.parts = []
+        self.parts.append(otherlog)
+        self.string = None
+    
+    def to_json(self):
+        """Returns the log as plain lists and strings, without formatting it:
+        a pre-formatted log as its string, a STANDARD_LOGS log as [key, format
+        args...], and a log with others appended as {'parts': [each of those]}
+        Only reads the log, so it's safe while another thread formats it"""
+        if self.args is None:
+            own = self.key
+        else:
+            own = [self.key] + list(self.args)
+            while own[-1] is None and len(own) > 1: #Unused format args
+                own.pop()
+        if self.parts is None:
+            return own
+        return {'parts': [own] + [part.to_json() for part in self.parts]}
+
+def log_from_json(saved):
+    """Returns a new Log made from Log.to_json()"""
+    if isinstance(saved, dict):
+        log = log_from_json(saved['parts'][0])
+        for part in saved['parts'][1:]:
+            log.append_log(log_from_json(part))
+        return log
+    if isinstance(saved, list):
+        return Log(*saved)
+    return Log(saved)
+
+def log_from_text(text):
+    """Returns the Log kept in a history file as text: the JSON of its
+    Log.to_json(), or its formatted string in histories written before"""
+    try:
+        saved = json.loads(text)
+    except ValueError:
+        return Log(text)
+    if not isinstance(saved, (str, list, dict)): #e.g. an old log that was just a number
+        return Log(text)
+    return log_from_json(saved)
+
+HISTORY_BATCH = 64 #Logs an on-disk archive holds in memory before writing them out
+
+class LogArchive:
+    """
+    The full history of every log added to a bounded Logbook, kept separately
+    from the few logs on display
+    
+    The history is kept in log_list, or on disk in an ff_history.HistoryFile if
+    one is given. On disk, logs are written out in batches of HISTORY_BATCH (or
+    when the history is read), so memory use doesn't grow with the history.
+    They're written unformatted, as the JSON of Log.to_json(), and only
+    formatted if they're read back and shown
+    
+    If given an index (an ff_logsearch.LogIndex), every log is also added to
+    it, so the archive can be searched with ff_logsearch.search()
+    """
+    def __init__(self, history=None, index=None):
+        """Makes a new, empty archive, or one continuing the HistoryFile history
+        The logs aren't indexed if index is None"""
+        self.log_list = []
+        self.history = history
+        self.index = index
+        if self.index is not None and self.history is not None:
+            self.index.pad_to(len(self.history))
+    
+    def __len__(self):
+        """Returns the number of logs archived"""
+        if self.history is None:
+            return len(self.log_list)
+        return len(self.history) + len(self.log_list)
+    
+    def __getitem__(self, index):
+        """Returns the log (or list of logs, for a slice) at index"""
+        if self.history is None:
+            return self.log_list[index]
+        self.flush()
+        if isinstance(index, slice):
+            return [log_from_text(text) for text in self.history[index]]
+        return log_from_text(self.history[index])
+    
+    def add_log(self, log):
+        """Archives a log"""
+        if self.index is not None:
+            self.index.add_log(log)
+        self.log_list.append(log)
+        if self.history is not None and len(self.log_list) >= HISTORY_BATCH:
+            self.flush()
+    
+    def flush(self):
+        """Writes the logs waiting in log_list out to the history file"""
+        if self.history is not None and self.log_list:
+            self.history.append([json.dumps(log.to_json()) for log in self.log_list])
+            self.log_list = []
+            if self.index is not None:
+                self.index.flush()
+
+class Logbook:
+    """
+    A list of log objects, with some code to format it effectively
+    
+    A bounded Logbook only holds the NUM_LOGS logs on display, in a deque, and
+    passes every log on to its archive for the full history. Either way the
+    formatted logbook is cached until the logs change
+    
+    listeners are functions called with a list of the new logs whenever logs
+    are added, e.g. to save them to the ff_journal
+    """
+    def __init__(self, logs=None, bounded=False, archive=None):
+        """Makes a new logbook object with the attribute log_list as logs
+        log_list is an empty list by default, or a deque of at most NUM_LOGS
+        logs if bounded; archive is a new LogArchive by default if bounded"""
+        self.log_list = logs
+        if self.log_list is None:
+            self.log_list = []
+        if type(self.log_list) != list:
+            raise TypeError("Attempted to create Logbook with non-list attribute")
+        self.bounded = bounded
+        self.archive = archive
+        if self.bounded:
+            if self.archive is None:
+                self.archive = LogArchive()
+            for log in self.log_list:
+                self.archive.add_log(log)
+            self.log_list = collections.deque(self.log_list, maxlen=NUM_LOGS)
+        self.rendered = {} #Formatted logbook strings, by is_rev
+        self.listeners = []
+    
+    def __repr__(self, is_rev=False):
+        """Returns a string formatted correctly as a logbook of the most recent
+        NUM_LOGS logs, if is_rev, logs are shown in reverse order"""
+        if is_rev not in self.rendered:
+            if self.bounded:
+                temp_logs = self.log_list #Only ever holds the most recent NUM_LOGS logs
+            else:
+                temp_logs = self.log_list[NUM_LOGS * -1:] #Get the most recent NUM_LOGS logs
+            if is_rev:
+                temp_logs = reversed(temp_logs) #Most-recent FIRST in the string
+            self.rendered[is_rev] = "".join(log.log_string + "\n" for log in temp_logs)
+        return self.rendered[is_rev]
+    
+    def add_listener(self, listener):
+        """Calls listener(logs) with the new logs whenever logs are added"""
+        self.listeners.append(listener)
+    
+    def restore(self, logs):
+        """Puts logs back on display (e.g. from the ff_journal) without archiving
+        them again or telling the listeners"""
+        self.log_list.extend(logs)
+        self.rendered.clear()
+    
+    def add_log(self, log):
+        """Adds a new log object to the list to be displayed"""
+        self.log_list.append(log)
+        if self.bounded:
+            self.archive.add_log(log)
+        self.rendered.clear()
+        for listener in self.listeners:
+            listener([log])
+    
+    def add_logs(self, logs):
+        """Adds a batch of new log objects to the list, in order"""
+        self.log_list.extend(logs)
+        if self.bounded:
+            for log in logs:
+                self.archive.add_log(log)
+        self.rendered.clear()
+        for listener in self.listeners:
+            listener(logs)
+    
+    def clear(self):
+        """Empties log_list, the archive keeps its history"""
+        if self.bounded:
+            self.log_list.clear()
+        else:
+            self.log_list = []
+        self.rendered.clear()
@@ -0,0 +1,267 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the LogIndex class - searches the logbook history by log key,
+    character name and number, without reading any logs that don't match
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter.
+
+Each archived log is kept as a record, a list of [key, format args...] for it
+    and every log appended to it, e.g. an attack log is
+    [["roll_die", "Champion", 3, null], ["roll_die_ext", 5, null, null],
+     ["total_roll", 8, null, null], ["attack_val", 18, null, null]]
+and indexed under the terms:
+    ('key', key)         - for each key in the record
+    ('name', name)       - the character it's about (lowercase), see NAME_ARG
+    ('value', key, num)  - the first number formatting each key
+Each term has a posting list, the archive positions of the logs with that
+    term in order, so a search only reads the posting lists it needs.
+The records are saved with the history (HISTORY_FILE + RECORDS_SUFFIX), and the
+    posting lists to HISTORY_FILE + TERMS_SUFFIX when the program closes, so the
+    index never has to be rebuilt from the start
+"""
+import array
+import bisect
+import json
+import os
+from . import ff_logbook
+
+RECORDS_SUFFIX = ".rec"
+TERMS_SUFFIX = ".terms"
+TERMS_VERSION = 1
+NAME_ARG = {"eat": 0, "roll_die": 0, "take_dmg": 0, "hit_by": 0, "less_dmg": 0,
+            "more_dmg": 0, "battle": 0} #Which format arg of these logs is a character's name
+COMPARISONS = ("<=", ">=", "<", ">", "=") #Longest first, for parse_filter
+
+def log_record(log):
+    """Returns the record of a Log: [key, format args...] for it and each log
+    appended to it. A pre-formatted log has no record"""
+    record = []
+    if log.args is not None:
+        record.append([log.key] + list(log.args))
+    if log.parts is not None:
+        for part in log.parts:
+            record.extend(log_record(part))
+    return record
+
+def record_terms(record):
+    """Returns the set of terms a record is indexed under"""
+    terms = set()
+    for i, (key, *args) in enumerate(record):
+        terms.add(('key', key))
+        if i == 0 and key in NAME_ARG and isinstance(args[NAME_ARG[key]], str):
+            terms.add(('name', args[NAME_ARG[key]].lower()))
+        for arg in args:
+            if isinstance(arg, int):
+                terms.add(('value', key, arg))
+                break
+    return terms
+
+def intersect(postings):
+    """Returns the positions in all of the sorted posting lists, checking each
+    position of the shortest list against the others"""
+    postings = sorted(postings, key=len)
+    matches = []
+    for position in postings[0]:
+        for others in postings[1:]:
+            i = bisect.bisect_left(others, position)
+            if i == len(others) or others[i] != position:
+                break
+        else:
+            matches.append(position)
+    return matches
+
+def union(postings):
+    """Returns the positions in any of the sorted posting lists, in order"""
+    if len(postings) == 1:
+        return postings[0]
+    return sorted(set().union(*postings))
+
+def search(archive, key=None, name=None, low=None, high=None):
+    """Returns the SearchResults of the logs in archive (an ff_logbook.LogArchive
+    with a LogIndex) with key, about the character name, and with a number
+    from low to high (any condition left as None isn't checked)"""
+    return SearchResults(archive, archive.index.search(key, name, low, high))
+
+def parse_filter(text):
+    """Returns the search() keyword arguments for a filter typed in the history window:
+    words separated by spaces, each a STANDARD_LOGS key, name=<name>, or a
+    comparison with a number: <5, <=5, >5, >=5 or =5. Raises ValueError if a
+    word can't be understood"""
+    query = {'key': None, 'name': None, 'low': None, 'high': None}
+    for word in text.split():
+        if word in ff_logbook.STANDARD_LOGS:
+            query['key'] = word
+        elif word.lower().startswith("name="):
+            query['name'] = word[len("name="):]
+        else:
+            for comparison in COMPARISONS:
+                if word.startswith(comparison):
+                    try:
+                        number = int(word[len(comparison):])
+                    except ValueError:
+                        raise ValueError("Not a number: {}".format(word)) from None
+                    if comparison in ("<", "<="):
+                        query['high'] = number - 1 if comparison == "<" else number
+                    elif comparison in (">", ">="):
+                        query['low'] = number + 1 if comparison == ">" else number
+                    else:
+                        query['low'] = query['high'] = number
+                    break
+            else:
+                raise ValueError("Unknown filter: {}".format(word))
+    return query
+
+class LogIndex:
+    """
+    The posting lists of every archived log, by term
+
+    Attributes:
+    int  count - number of logs indexed
+    dict postings - {term: array of archive positions}
+    dict values - {key: sorted list of the numbers indexed for that key}
+    obj  records - ff_history.HistoryFile of the records as JSON, None to only
+        keep the index in memory
+    list pending - records waiting to be written to records
+    """
+    def __init__(self, records=None, terms_path=None):
+        """Makes an index, continuing from the saved posting lists at terms_path
+        and the records after them, if given"""
+        self.count = 0
+        self.postings = {}
+        self.values = {}
+        self.records = records
+        self.terms_path = terms_path
+        self.pending = []
+        if self.terms_path is not None:
+            self.load_terms()
+        if self.records is not None:
+            for record in self.records[self.count:]:
+                self.add_record(json.loads(record))
+
+    def __len__(self):
+        """Returns the number of logs indexed"""
+        return self.count
+
+    def add_log(self, log):
+        """Indexes a log at the next archive position"""
+        record = log_record(log)
+        self.add_record(record)
+        if self.records is not None:
+            self.pending.append(record)
+
+    def add_record(self, record):
+        """Indexes a record at the next archive position"""
+        for term in record_terms(record):
+            if term not in self.postings:
+                self.postings[term] = array.array('I')
+                if term[0] == 'value':
+                    bisect.insort(self.values.setdefault(term[1], []), term[2])
+            self.postings[term].append(self.count)
+        self.count += 1
+
+    def pad_to(self, count):
+        """Adds empty records up to count, for logs archived before there was an
+        index (they can't be searched)"""
+        while self.count < count:
+            self.add_record([])
+            if self.records is not None:
+                self.pending.append([])
+
+    def flush(self):
+        """Writes the pending records out"""
+        if self.records is not None and self.pending:
+            self.records.append([json.dumps(record) for record in self.pending])
+            self.pending = []
+
+    def search(self, key=None, name=None, low=None, high=None):
+        """Returns the archive positions of the logs matching every given
+        condition, in order: having the key, about the character name, and with
+        a number from low to high (formatting key, if given, otherwise any key)"""
+        postings = []
+        if low is not None or high is not None:
+            keys = [key] if key is not None else list(self.values)
+            value_postings = []
+            for value_key in keys:
+                values = self.values.get(value_key, [])
+                start = 0 if low is None else bisect.bisect_left(values, low)
+                end = len(values) if high is None else bisect.bisect_right(values, high)
+                value_postings.extend(self.postings[('value', value_key, value)]
+                                      for value in values[start:end])
+            if not value_postings:
+                return []
+            postings.append(union(value_postings))
+        elif key is not None:
+            postings.append(self.postings.get(('key', key), []))
+        if name is not None:
+            postings.append(self.postings.get(('name', name.lower()), []))
+        if not postings:
+            return list(range(self.count))
+        return intersect(postings)
+
+    def load_terms(self):
+        """Reads the posting lists saved by save_terms(), if they're usable"""
+        try:
+            with open(self.terms_path, 'rb') as terms_file:
+                header = json.loads(terms_file.readline())
+                if header['version'] != TERMS_VERSION or header['count'] > len(self.records):
+                    return
+                postings = {}
+                for term, length in header['terms']:
+                    positions = array.array('I')
+                    positions.frombytes(terms_file.read(length * positions.itemsize))
+                    postings[tuple(term)] = positions
+        except (OSError, ValueError, KeyError):
+            return
+        self.postings = postings
+        self.count = header['count']
+        for term in self.postings:
+            if term[0] == 'value':
+                self.values.setdefault(term[1], []).append(term[2])
+        for values in self.values.values():
+            values.sort()
+
+    def save_terms(self):
+        """Writes the posting lists out, so the next load_terms() doesn't need
+        to read every record"""
+        self.flush()
+        if self.terms_path is None:
+            return
+        header = {'version': TERMS_VERSION, 'count': self.count,
+                  'terms': [[list(term), len(positions)] for term, positions in self.postings.items()]}
+        temp_path = self.terms_path + ".tmp"
+        with open(temp_path, 'wb') as terms_file:
+            terms_file.write(json.dumps(header).encode('utf-8') + b"\n")
+            for positions in self.postings.values():
+                terms_file.write(positions.tobytes())
+        os.replace(temp_path, self.terms_path)
+
+class SearchResults:
+    """
+    The logs of an archive at the positions found by a search, which can be
+    shown by the HistoryGui in place of the whole archive
+
+    Attributes:
+    obj  archive - the LogArchive searched
+    list positions - the archive positions of the matching logs
+    """
+    def __init__(self, archive, positions):
+        """Holds the search results"""
+        self.archive = archive
+        self.positions = positions
+
+    def __len__(self):
+        """Returns the number of matching logs"""
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        """Returns the matching log (or list of logs, for a slice) at index"""
+        if isinstance(index, slice):
+            return [self.archive[position] for position in self.positions[index]]
+        return self.archive[self.positions[index]]
@@ -0,0 +1,145 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the precomputed odds table - the exact win chance and expected
+    rounds of every fight within the normal stat ranges, saved to a binary
+    file so the combat screen can look them up without solving anything
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+To (re)build the table:
+    python -m fighting_fantasy odds --build
+Does not import tkinter.
+
+Fights only depend on the difference in skill, so the table is indexed by
+    skill difference rather than by each skill. File layout:
+    header (HEADER_FORMAT): magic, version, ruleset, table dimensions
+    then for each skill difference, player stamina and enemy stamina in turn:
+        two little-endian float32s - win chance, expected rounds
+"""
+import array
+import mmap
+import os
+import struct
+import sys
+from . import ff_combatengine
+from . import ff_files
+
+ODDS_FILE = "ff_odds.bin" #Kept in the data directory (see ff_files)
+MAGIC = b"FFOT"
+TABLE_VERSION = 1
+HEADER_FORMAT = "<4sHHHhhH" #magic, version, STD_DMG, CHANGE_ON_LUCK,
+                            #lowest & highest skill difference, highest stamina
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ENTRY_FORMAT = "<ff"
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+MAX_SKILL_DIFF = 12 #Player skill 7-12 against enemies of skill 1-18 or so
+MAX_STAMINA = 40    #Player stamina is 14-24 when rolled, plus room for rations
+
+def build_slab(skill_diff, max_stamina=MAX_STAMINA):
+    """Returns the bytes of the table for one skill difference: every
+    (player stamina, enemy stamina) pair from 0 to max_stamina"""
+    slab = array.array('f')
+    for p_stamina in range(max_stamina + 1):
+        for e_stamina in range(max_stamina + 1):
+            slab.extend(ff_combatengine.fight_odds(skill_diff, p_stamina, e_stamina))
+    if sys.byteorder != 'little':
+        slab.byteswap()
+    return slab.tobytes()
+
+def build_table(path=None, max_skill_diff=MAX_SKILL_DIFF, max_stamina=MAX_STAMINA):
+    """Solves every fight in the table's range across a process pool,
+    one skill difference per task, then replaces the table file (ODDS_FILE
+    in the data directory if path is None), so that a table left by a crash
+    or an interrupted build is either the whole old one or the whole new one"""
+    if path is None:
+        path = ff_files.data_path(ODDS_FILE)
+    skill_diffs = range(max_skill_diff * -1, max_skill_diff + 1)
+    header = struct.pack(HEADER_FORMAT, MAGIC, TABLE_VERSION, ff_combatengine.STD_DMG,
+                         ff_combatengine.CHANGE_ON_LUCK, skill_diffs[0], skill_diffs[-1],
+                         max_stamina)
+    import concurrent.futures #Only needed here, and slow to import for the lookups
+    with concurrent.futures.ProcessPoolExecutor() as pool:
+        slabs = pool.map(build_slab, skill_diffs, [max_stamina] * len(skill_diffs))
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as temp_file:
+            temp_file.write(header)
+            for slab in slabs:
+                temp_file.write(slab)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+    os.replace(temp_path, path)
+
+class OddsTable:
+    """
+    A memory-mapped odds table file, read only
+
+    Attributes:
+    mmap data - the mapped file
+    int  min_skill_diff, max_skill_diff - the skill differences in the table
+    int  max_stamina - the highest stamina in the table, on either side
+    """
+    def __init__(self, path=None):
+        """Maps the table file (ODDS_FILE in the data directory if path is None).
+        Raises ValueError if it was built by a different version or for
+        different rules, and OSError if it can't be opened"""
+        if path is None:
+            path = ff_files.data_path(ODDS_FILE)
+        with open(path, 'rb') as table_file:
+            self.data = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self.data) < HEADER_SIZE:
+                raise ValueError("Odds table {} is too short".format(path))
+            (magic, version, std_dmg, change_on_luck, self.min_skill_diff,
+             self.max_skill_diff, self.max_stamina) = struct.unpack_from(HEADER_FORMAT, self.data)
+            if magic != MAGIC or version != TABLE_VERSION:
+                raise ValueError("{} is not a version {} odds table".format(path, TABLE_VERSION))
+            if (std_dmg, change_on_luck) != (ff_combatengine.STD_DMG,
+                                             ff_combatengine.CHANGE_ON_LUCK):
+                raise ValueError("Odds table {} was built for different rules".format(path))
+            self.row_size = self.max_stamina + 1
+            self.slab_size = self.row_size * self.row_size
+            expected = (HEADER_SIZE + (self.max_skill_diff - self.min_skill_diff + 1)
+                        * self.slab_size * ENTRY_SIZE)
+            if len(self.data) != expected:
+                raise ValueError("Odds table {} is the wrong size".format(path))
+        except ValueError:
+            self.data.close()
+            raise
+
+    def lookup(self, skill_diff, p_stamina, e_stamina):
+        """Returns (win chance, expected rounds) for the fight, or None if it is
+        outside the table"""
+        if not self.min_skill_diff <= skill_diff <= self.max_skill_diff:
+            return None
+        if not (0 <= p_stamina <= self.max_stamina and 0 <= e_stamina <= self.max_stamina):
+            return None
+        index = ((skill_diff - self.min_skill_diff) * self.slab_size
+                 + p_stamina * self.row_size + e_stamina)
+        return struct.unpack_from(ENTRY_FORMAT, self.data, HEADER_SIZE + index * ENTRY_SIZE)
+
+_odds_table = None #The OddsTable opened by get_odds_table, False if there isn't a usable one
+
+def get_odds_table():
+    """Returns the OddsTable of ODDS_FILE in the data directory, opening it the first time this is
+    called, or None if there is no up-to-date table to use"""
+    global _odds_table
+    if _odds_table is None:
+        try:
+            _odds_table = OddsTable()
+        except (OSError, ValueError):
+            _odds_table = False
+    return _odds_table or None
+
+def fight_odds(skill_diff, p_stamina, e_stamina):
+    """Returns (win chance, expected rounds), from the odds table if the fight is
+    in it, otherwise solved by ff_combatengine"""
+    table = get_odds_table()
+    if table is not None:
+        odds = table.lookup(skill_diff, p_stamina, e_stamina)
+        if odds is not None:
+            return odds
+    return ff_combatengine.fight_odds(skill_diff, p_stamina, e_stamina)
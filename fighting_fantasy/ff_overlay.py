@@ -0,0 +1,238 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the OverlayServer class - serves the live stats and logbook on
+    localhost, for a browser or OBS overlay while streaming
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter.
+
+The server answers three paths:
+    /        - OVERLAY_PAGE, which shows the stats and logbook as they change
+    /state   - the whole state as JSON
+    /events  - server-sent events: a "state" event of the whole state, then a
+               "diff" event of only the keys that changed, after every change
+Logs are sent as they're added ("logs": the new log strings, oldest first),
+    never the whole logbook again.
+The server's asyncio loop runs in a thread of its own, so the Tk mainloop
+    never waits for a client: publish() only hands each diff over to it.
+Every client has a single pending diff that new diffs are merged into, so a
+    slow client skips straight to the latest state instead of building up a
+    backlog
+"""
+import asyncio
+import json
+import threading
+from . import ff_logbook
+
+OVERLAY_ON = False        #Serve the overlay while the program runs
+OVERLAY_HOST = "127.0.0.1" #Only this computer (and OBS on it) can connect
+OVERLAY_PORT = 8770
+KEEPALIVE = 15            #Seconds between keepalives to idle clients, which notice closed ones
+SEND_TIMEOUT = 30         #Seconds a client can take to accept a message before it's dropped
+
+OVERLAY_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Fighting Fantasy</title>
+<style>
+body {background: transparent; color: white; font: 16px courier, monospace;
+      text-shadow: 1px 1px 2px black;}
+#logs {white-space: pre; font-size: 12px;}
+</style></head>
+<body><div id="stats"></div><div id="logs"></div>
+<script>
+var state = {};
+var logs = [];
+function stats(character) {
+    var s = character.stats;
+    return character.name + "  STAMINA " + s.stamina + "  SKILL " + s.skill +
+           (s.luck === undefined ? "" : "  LUCK " + s.luck);
+}
+function show() {
+    var lines = [stats(state.player)];
+    (state.enemies || []).forEach(function (enemy, i) {
+        lines.push((i + 1 === state.target ? "> " : "  ") + stats(enemy));
+    });
+    document.getElementById("stats").innerText = lines.join("\\n");
+    document.getElementById("logs").innerText = logs.slice().reverse().join("\\n");
+}
+function take(message, whole) {
+    var data = JSON.parse(message.data);
+    if (whole) { state = {}; logs = []; }
+    logs = logs.concat(data.logs || []).slice(-LOG_LINES);
+    delete data.logs;
+    Object.assign(state, data);
+    show();
+}
+var events = new EventSource("/events");
+events.addEventListener("state", function (message) { take(message, true); });
+events.addEventListener("diff", function (message) { take(message, false); });
+</script></body></html>
+""".replace("LOG_LINES", str(ff_logbook.NUM_LOGS))
+
+def merge_diff(pending, diff):
+    """Merges diff into pending, so pending then does the job of both: changed
+    keys take the newest value, and logs are added on (keeping the last NUM_LOGS)"""
+    for key, value in diff.items():
+        if key == 'logs':
+            pending['logs'] = (pending.get('logs', []) + value)[ff_logbook.NUM_LOGS * -1:]
+        else:
+            pending[key] = value
+
+class Subscriber:
+    """
+    One client of /events
+
+    Attributes:
+    dict pending - every diff not yet sent, merged into one
+    obj  wake - asyncio.Event set when pending has something to send
+    """
+    def __init__(self):
+        """Starts with nothing to send"""
+        self.pending = {}
+        self.wake = asyncio.Event()
+
+class OverlayServer:
+    """
+    An HTTP server of the live state, run on an asyncio loop in its own thread
+
+    Attributes:
+    str  host, port - the address served (port is the one given once started,
+        so port 0 picks a free one)
+    dict published - the state as last published (only used by the Tk thread)
+    int  seq - number of diffs published, sent with each diff as "seq"
+    dict state - the whole state as the clients know it, including the last
+        NUM_LOGS logs (only used by the server thread)
+    set  subscribers - Subscribers of /events (only used by the server thread)
+    obj  loop - the server thread's asyncio event loop, None until started
+    """
+    def __init__(self, host=OVERLAY_HOST, port=OVERLAY_PORT):
+        """Sets up the server, which doesn't listen until start()"""
+        self.host = host
+        self.port = port
+        self.published = {}
+        self.seq = 0
+        self.state = {}
+        self.subscribers = set()
+        self.loop = None
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        """Starts listening, in a new daemon thread. Raises OSError if the
+        address can't be used (e.g. the port is taken)"""
+        started = threading.Event()
+        errors = []
+        def run():
+            self.loop = asyncio.new_event_loop()
+            try:
+                self.server = self.loop.run_until_complete(
+                    asyncio.start_server(self.handle_client, self.host, self.port))
+            except OSError as error:
+                errors.append(error)
+                self.loop.close()
+                started.set()
+                return
+            self.port = self.server.sockets[0].getsockname()[1]
+            started.set()
+            self.loop.run_forever()
+            self.server.close()
+            clients = asyncio.all_tasks(self.loop)
+            for client in clients:
+                client.cancel()
+            self.loop.run_until_complete(asyncio.gather(*clients, return_exceptions=True))
+            self.loop.close()
+        self.thread = threading.Thread(target=run, name="ff_overlay", daemon=True)
+        self.thread.start()
+        started.wait()
+        if errors:
+            self.loop = None
+            raise errors[0]
+
+    def stop(self):
+        """Stops the server and waits for its thread to finish"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop = None
+
+    def publish(self, state, logs=()):
+        """Called from the Tk thread with the whole current state (a dict of
+        JSON-able values) and the strings of any logs added since the last
+        call; sends the keys that changed and the logs on to every client"""
+        diff = {key: value for key, value in state.items() if self.published.get(key) != value}
+        self.published.update(diff)
+        if logs:
+            diff['logs'] = list(logs)[ff_logbook.NUM_LOGS * -1:]
+        if not diff or self.loop is None:
+            return
+        self.seq += 1
+        diff['seq'] = self.seq
+        self.loop.call_soon_threadsafe(self.fan_out, diff)
+
+    def fan_out(self, diff):
+        """Merges a published diff into the state and every client's pending diff"""
+        merge_diff(self.state, diff)
+        for subscriber in self.subscribers:
+            merge_diff(subscriber.pending, diff)
+            subscriber.wake.set()
+
+    async def handle_client(self, reader, writer):
+        """Answers one HTTP request"""
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE)
+            words = request.split(b"\r\n", 1)[0].decode('latin-1').split()
+            path = words[1].split("?", 1)[0] if len(words) >= 2 else ""
+            if path == "/events":
+                await self.stream_events(writer)
+            elif path == "/state":
+                await self.send(writer, "200 OK", "application/json", json.dumps(self.state))
+            elif path == "/":
+                await self.send(writer, "200 OK", "text/html; charset=utf-8", OVERLAY_PAGE)
+            else:
+                await self.send(writer, "404 Not Found", "text/plain", "Not found")
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass #The client went away or wasn't speaking HTTP; either way it's done with
+        except asyncio.CancelledError:
+            pass #The server is stopping; ending quietly is all that's left to do
+        finally:
+            writer.close()
+
+    async def send(self, writer, status, content_type, body):
+        """Writes a whole HTTP response"""
+        body = body.encode('utf-8')
+        writer.write("HTTP/1.1 {}\r\nContent-Type: {}\r\nContent-Length: {}\r\n"
+                     "Access-Control-Allow-Origin: *\r\nConnection: close\r\n\r\n".format(
+                         status, content_type, len(body)).encode('latin-1') + body)
+        await asyncio.wait_for(writer.drain(), SEND_TIMEOUT)
+
+    async def stream_events(self, writer):
+        """Sends the whole state, then the merged pending diff whenever there is
+        one, until the client goes away"""
+        subscriber = Subscriber()
+        self.subscribers.add(subscriber)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                         b"Cache-Control: no-cache\r\nAccess-Control-Allow-Origin: *\r\n\r\n")
+            writer.write(self.event("state", self.state))
+            while True:
+                await asyncio.wait_for(writer.drain(), SEND_TIMEOUT)
+                try:
+                    await asyncio.wait_for(subscriber.wake.wait(), KEEPALIVE)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                    continue
+                subscriber.wake.clear()
+                diff = subscriber.pending
+                subscriber.pending = {}
+                writer.write(self.event("diff", diff))
+        finally:
+            self.subscribers.discard(subscriber)
+
+    def event(self, name, data):
+        """Returns a server-sent event of data as JSON"""
+        return "event: {}\ndata: {}\n\n".format(name, json.dumps(data)).encode('utf-8')
@@ -0,0 +1,319 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the playthrough runner - plays a whole gamebook's worth of fights
+    from a script thousands of times, to see how far a character build gets
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program (use the play command of ff_cli).
+Does not import tkinter.
+
+A script is JSON (or YAML, if PyYAML is installed) like:
+    {"player": {"skill": 10, "luck": 9, "stamina": 20, "rations": 4},
+     "rules": {"eat_below": 8, "test_luck": "best"},
+     "encounters": [
+        {"name": "Goblin", "skill": 5, "stamina": 4},
+        {"name": "Ogre", "skill": 8, "stamina": 10, "test_luck": "always"},
+        {"name": "Orcs", "enemies": [{"name": "Orc", "skill": 6, "stamina": 5},
+                                     {"name": "Orc", "skill": 6, "stamina": 4}],
+         "rule": "spread"}]}
+player - the starting stats; with "roll": true the skill, luck and stamina
+    not given are rolled for every playthrough
+rules - eat_below: rations are eaten before an encounter until stamina is at
+    least this (0 to never eat)
+    test_luck: after a won or lost round, "never", "always", or "best" (only
+    when ff_combatengine.LuckPolicy says it raises the chance of winning)
+encounters - fought in order, each against one enemy (skill and stamina) or
+    several ("enemies", fighting by the targeting "rule"). An encounter can
+    override eat_below and test_luck for itself
+Playthroughs are run in chunks of PLAY_CHUNK across a process pool. Every
+    chunk has its own dice seed, drawn from the run's seed, so a run with a
+    seed gives the same results whichever worker plays each chunk
+"""
+import json
+import random
+from . import ff_character
+from . import ff_combatengine
+from . import ff_dice
+
+PLAY_CHUNK = 500 #Playthroughs per task sent to a worker, and between progress reports
+LUCK_RULES = ('never', 'always', 'best')
+DEFAULT_RULES = {'eat_below': 0, 'test_luck': 'never'}
+
+def load_script(path):
+    """Returns the checked script (see check_script) saved at path, which is
+    YAML if it ends .yaml or .yml and JSON otherwise"""
+    with open(path) as script_file:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError: #PyYAML is optional, JSON scripts work without it
+                raise ValueError("PyYAML is needed to read {}".format(path)) from None
+            try:
+                script = yaml.safe_load(script_file)
+            except yaml.YAMLError as error:
+                raise ValueError(str(error)) from None
+        else:
+            script = json.load(script_file)
+    return check_script(script)
+
+def is_whole(value):
+    """Returns True if value is a whole number (and not True or False, which
+    JSON and YAML would otherwise let through as 1 and 0)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def check_enemy(enemy, where):
+    """Returns an enemy of a script as {'name', 'skill', 'stamina'}, raising
+    ValueError if it's missing a stat"""
+    if not isinstance(enemy, dict):
+        raise ValueError("{}: an enemy must be an object of name, skill and stamina".format(where))
+    for stat in ('skill', 'stamina'):
+        if not is_whole(enemy.get(stat)):
+            raise ValueError("{} needs a whole number {}".format(where, stat))
+    name = enemy.get('name', ff_character.ENEMY_NAME)
+    if not isinstance(name, str):
+        raise ValueError("{}: a name must be text".format(where))
+    return {'name': name, 'skill': enemy['skill'], 'stamina': enemy['stamina']}
+
+def check_rules(rules, where):
+    """Raises ValueError if any of rules (eat_below and test_luck, as given
+    for the whole script or one encounter) is unknown or the wrong type"""
+    for rule, value in rules.items():
+        if rule not in DEFAULT_RULES:
+            raise ValueError("{}: unknown rule {}".format(where, rule))
+    if 'eat_below' in rules and not (is_whole(rules['eat_below']) and rules['eat_below'] >= 0):
+        raise ValueError("{}: eat_below must be a whole number, 0 or more".format(where))
+    if 'test_luck' in rules and rules['test_luck'] not in LUCK_RULES:
+        raise ValueError("{}: test_luck must be one of {}".format(where, ", ".join(LUCK_RULES)))
+
+def check_script(script):
+    """Returns script (a dict as described above) with every encounter in the
+    same long form, raising ValueError if anything in it is wrong"""
+    if not isinstance(script, dict):
+        raise ValueError("A script must be an object of player, rules and encounters")
+    for part, kind in (('player', dict), ('rules', dict), ('encounters', list)):
+        if not isinstance(script.get(part, kind()), kind):
+            raise ValueError("The script's {} must be {}".format(
+                part, "an object" if kind is dict else "a list"))
+    player = dict(script.get('player', {}))
+    for stat, value in player.items():
+        if stat == 'roll':
+            if not isinstance(value, bool):
+                raise ValueError("The player's roll must be true or false")
+        elif stat not in ff_character.STAT_INDEX or not is_whole(value):
+            raise ValueError("Unknown player stat: {} = {}".format(stat, value))
+    if not player.get('roll'):
+        missing = [stat for stat in ('skill', 'luck', 'stamina') if stat not in player]
+        if missing:
+            raise ValueError("The player needs {}, or \"roll\": true".format(", ".join(missing)))
+    rules = dict(DEFAULT_RULES)
+    rules.update(script.get('rules', {}))
+    check_rules(rules, "Rules")
+    encounters = []
+    for k, encounter in enumerate(script.get('encounters', [])):
+        where = "Encounter {}".format(k + 1)
+        if not isinstance(encounter, dict):
+            raise ValueError("{} must be an object".format(where))
+        if 'enemies' in encounter:
+            if not isinstance(encounter['enemies'], list):
+                raise ValueError("{}: enemies must be a list".format(where))
+            enemies = [check_enemy(enemy, where) for enemy in encounter['enemies']]
+        else:
+            enemies = [check_enemy(encounter, where)]
+        if not enemies:
+            raise ValueError("{} has no enemies".format(where))
+        check_rules({rule: encounter[rule] for rule in DEFAULT_RULES if rule in encounter}, where)
+        checked = {'name': encounter.get('name', enemies[0]['name']), 'enemies': enemies,
+                   'rule': encounter.get('rule', ff_combatengine.TARGET_RULES[0]),
+                   'eat_below': encounter.get('eat_below', rules['eat_below']),
+                   'test_luck': encounter.get('test_luck', rules['test_luck'])}
+        if not isinstance(checked['name'], str):
+            raise ValueError("{}: a name must be text".format(where))
+        if checked['rule'] not in ff_combatengine.TARGET_RULES:
+            raise ValueError("{}: unknown targeting rule {}".format(where, checked['rule']))
+        encounters.append(checked)
+    if not encounters:
+        raise ValueError("The script has no encounters")
+    return {'player': player, 'rules': rules, 'encounters': encounters}
+
+class PlaythroughResults:
+    """
+    How far the playthroughs of a script got, added up
+
+    Attributes:
+    list  names - the name of each encounter, in order
+    int   n_runs - number of playthroughs
+    list  deaths - deaths[k] is the number of playthroughs that ended in encounter k
+        (killed, or still fighting after ff_combatengine.MAX_ROUNDS rounds)
+    list  stamina_left - stamina_left[s] is the number of playthroughs that
+        got through every encounter with s stamina
+    int   rations_eaten - rations eaten over every playthrough
+    int   luck_tests - luck tests made over every playthrough
+    """
+    def __init__(self, names):
+        """Starts with no playthroughs"""
+        self.names = names
+        self.n_runs = 0
+        self.deaths = [0] * len(names)
+        self.stamina_left = []
+        self.rations_eaten = 0
+        self.luck_tests = 0
+
+    def __repr__(self):
+        """For testing"""
+        lines = ["Playthroughs: {}".format(self.n_runs)]
+        for name, alive in zip(self.names, self.survival()[1:]):
+            lines.append("{:>7.2%} alive after {}".format(alive, name))
+        return "\n".join(lines) + "\n"
+
+    def add_run(self, died_in, stamina, rations_eaten, luck_tests):
+        """Counts one playthrough, which died in encounter died_in (None if it
+        got through them all) with stamina left"""
+        self.n_runs += 1
+        if died_in is None:
+            if stamina >= len(self.stamina_left):
+                self.stamina_left.extend([0] * (stamina + 1 - len(self.stamina_left)))
+            self.stamina_left[stamina] += 1
+        else:
+            self.deaths[died_in] += 1
+        self.rations_eaten += rations_eaten
+        self.luck_tests += luck_tests
+
+    def add(self, other):
+        """Adds in the counts of other, e.g. a chunk back from a worker"""
+        self.n_runs += other.n_runs
+        self.deaths = [mine + theirs for mine, theirs in zip(self.deaths, other.deaths)]
+        if len(other.stamina_left) > len(self.stamina_left):
+            self.stamina_left.extend([0] * (len(other.stamina_left) - len(self.stamina_left)))
+        for stamina, count in enumerate(other.stamina_left):
+            self.stamina_left[stamina] += count
+        self.rations_eaten += other.rations_eaten
+        self.luck_tests += other.luck_tests
+
+    def survival(self):
+        """Returns the survival curve: the fraction of playthroughs still alive
+        at the start (1.0) and after each encounter"""
+        if not self.n_runs:
+            return [1.0] * (len(self.names) + 1)
+        curve = [1.0]
+        alive = self.n_runs
+        for deaths in self.deaths:
+            alive -= deaths
+            curve.append(alive / self.n_runs)
+        return curve
+
+def make_player(player, dice):
+    """Returns a new Character with the script's player stats, rolling the
+    ones not given if player['roll']"""
+    character = ff_character.Character(stats=player)
+    if player.get('roll'):
+        character.roll_stats(dice)
+        for stat, value in player.items():
+            if stat != 'roll':
+                character.set_stat(stat, value)
+    return character
+
+def wants_luck(test_luck, last_round, player, enemy):
+    """Returns True if the luck rule test_luck tests luck after a round with
+    the result last_round, between player and the enemy they attacked"""
+    if last_round == 'draw' or test_luck == 'never':
+        return False
+    values = player.stat_values
+    e_stamina = enemy.stat_values[ff_character.STAMINA]
+    if last_round == 'p_win' and e_stamina <= 0:
+        return False #Already dead, there's nothing to gain
+    if test_luck == 'always':
+        return True
+    p_stamina = values[ff_character.STAMINA]
+    luck = values[ff_character.LUCK]
+    skill_diff = values[ff_character.SKILL] - enemy.stat_values[ff_character.SKILL]
+    policy = ff_combatengine.get_luck_policy(skill_diff, max(p_stamina, 0), e_stamina, luck)
+    return policy.should_test_luck(last_round, p_stamina, e_stamina, luck)
+
+def play_encounter(player, encounter, dice):
+    """Fights one encounter of a checked script, returning True if the player
+    won it, and the number of luck tests made"""
+    enemies = [ff_character.Character(name=enemy['name'], stats=enemy)
+               for enemy in encounter['enemies']]
+    test_luck = encounter['test_luck']
+    luck_tests = 0
+    rounds = 0
+    if len(enemies) == 1: #The usual case; one-on-one rounds roll the same dice as a Melee, but quicker
+        enemy = enemies[0]
+        p_values = player.stat_values
+        e_values = enemy.stat_values
+        while p_values[ff_character.STAMINA] > 0 and e_values[ff_character.STAMINA] > 0:
+            if rounds == ff_combatengine.MAX_ROUNDS:
+                return False, luck_tests
+            rounds += 1
+            last_round = ff_combatengine.fight_round(player, enemy, dice)[0]
+            if wants_luck(test_luck, last_round, player, enemy):
+                ff_combatengine.luck_check(player, enemy, last_round, dice)
+                luck_tests += 1
+        return p_values[ff_character.STAMINA] > 0, luck_tests
+    melee = ff_combatengine.Melee([player], enemies, encounter['rule'])
+    while not melee.over():
+        if rounds == ff_combatengine.MAX_ROUNDS:
+            return False, luck_tests
+        rounds += 1
+        last_round = ff_combatengine.melee_result(melee.fight_round(dice)[1], 0)
+        enemy = melee.fighters[melee.target()]
+        if wants_luck(test_luck, last_round, player, enemy):
+            ff_combatengine.luck_check(player, enemy, last_round, dice)
+            luck_tests += 1
+    return melee.standing(0), luck_tests
+
+def play_chunk(script, n_runs, seed):
+    """Plays n_runs playthroughs of a checked script with dice from seed, and
+    returns their PlaythroughResults. Run by each worker of run_playthroughs"""
+    dice = ff_dice.DiceRoller(seed)
+    results = PlaythroughResults([encounter['name'] for encounter in script['encounters']])
+    for _ in range(n_runs):
+        player = make_player(script['player'], dice)
+        values = player.stat_values
+        died_in = None
+        eaten = luck_tests = 0
+        for k, encounter in enumerate(script['encounters']):
+            while (values[ff_character.STAMINA] < encounter['eat_below']
+                   and values[ff_character.RATIONS] > 0):
+                ff_combatengine.eat_ration(player)
+                eaten += 1
+            won, tests = play_encounter(player, encounter, dice)
+            luck_tests += tests
+            if not won:
+                died_in = k
+                break
+        results.add_run(died_in, max(values[ff_character.STAMINA], 0), eaten, luck_tests)
+    return results
+
+def run_playthroughs(script, n_runs, seed=None, workers=None):
+    """Plays n_runs playthroughs of script (see check_script) across a pool of
+    workers processes (as many as there are CPUs if None, or none at all if 1)
+    Yields the PlaythroughResults added up so far as each chunk comes back,
+    the last one being the whole run"""
+    import concurrent.futures #Only needed here, and slow to import
+    script = check_script(script)
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    seeds = random.Random(seed)
+    chunks = [(min(PLAY_CHUNK, n_runs - start), seeds.getrandbits(64))
+              for start in range(0, n_runs, PLAY_CHUNK)]
+    total = PlaythroughResults([encounter['name'] for encounter in script['encounters']])
+    if workers == 1:
+        for size, chunk_seed in chunks:
+            total.add(play_chunk(script, size, chunk_seed))
+            yield total
+        return
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(play_chunk, script, size, chunk_seed) for size, chunk_seed in chunks]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                total.add(future.result())
+                yield total
+        finally: #Stopped early, e.g. by Ctrl-C
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,217 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the Profiler class - opt-in timing of every button and of the Tk
+    event loop, kept as histograms that can be saved as JSON or watched in
+    the profile window (F12, see ff_profilescreen)
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter, it's only handed a widget to schedule on.
+
+Each button handler in PROFILED_METHODS is timed twice:
+    "<Class>.<method>"         - the handler on its own
+    "<Class>.<method> repaint" - from the click until the screen has been
+                                 repainted: the screens redraw in an
+                                 after_idle() flush, and Tk redraws widgets
+                                 in idle handlers queued by that flush, so the
+                                 click is only counted as shown once a second
+                                 round of idle handlers has run
+"lag" is how late a probe scheduled every PROBE_MS with after() runs, i.e.
+    how long the event loop was kept busy.
+Histograms have fixed-width buckets on a log scale, BUCKETS_PER_DOUBLING to
+    every doubling, so a long session's percentiles cost no more memory than a
+    short one's and are within ~9% of the exact value
+"""
+import functools
+import json
+import math
+import time
+from . import ff_files
+
+PROFILE_ON = False #Set to True (or run gui --profile) to time every button and the event loop
+PROFILE_FILE = "ff_profile.json" #Where (in the data directory) the timings are saved when the program closes
+PROBE_MS = 50 #How often the lag probe is scheduled
+BUCKETS_PER_DOUBLING = 8
+MIN_SECONDS = 1e-6 #Upper bound of the first bucket
+PROFILED_METHODS = ('fight_round', 'roll_luck', 'eat_ration', 'change_stat', 'auto_stats',
+                    'fight_battle', 'fight_to_end') #Timed in every class given to Profiler.instrument
+PERCENTILES = (50, 90, 99)
+
+def bucket_bound(k):
+    """Returns the upper bound in seconds of histogram bucket k"""
+    return MIN_SECONDS * 2 ** (k / BUCKETS_PER_DOUBLING)
+
+class Histogram:
+    """
+    Durations counted in log-spaced buckets
+
+    Attributes:
+    list  counts - counts[k] is the number of durations in bucket k, longer than
+        bucket_bound(k - 1) seconds and no longer than bucket_bound(k)
+    int   count - number of durations
+    float total - the durations added up, in seconds
+    float longest - the longest duration, in seconds
+    """
+    def __init__(self):
+        """Starts empty"""
+        self.counts = []
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+
+    def add(self, seconds):
+        """Counts one duration"""
+        k = 0
+        if seconds > MIN_SECONDS:
+            k = math.ceil(math.log2(seconds / MIN_SECONDS) * BUCKETS_PER_DOUBLING)
+        if k >= len(self.counts):
+            self.counts.extend([0] * (k + 1 - len(self.counts)))
+        self.counts[k] += 1
+        self.count += 1
+        self.total += seconds
+        self.longest = max(self.longest, seconds)
+
+    def percentile(self, percent):
+        """Returns the duration percent% of the durations were no longer than
+        (to the nearest bucket), 0.0 if there are none"""
+        wanted = self.count * percent / 100
+        seen = 0
+        for k, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= wanted:
+                return min(bucket_bound(k), self.longest)
+        return 0.0
+
+    def mean(self):
+        """Returns the mean duration, 0.0 if there are none"""
+        return self.total / self.count if self.count else 0.0
+
+    def to_json(self):
+        """Returns the histogram as plain dicts, in milliseconds"""
+        summary = {'count': self.count, 'mean_ms': self.mean() * 1000,
+                   'max_ms': self.longest * 1000}
+        for percent in PERCENTILES:
+            summary['p{}_ms'.format(percent)] = self.percentile(percent) * 1000
+        summary['buckets_ms'] = {"{:.4g}".format(bucket_bound(k) * 1000): count
+                                 for k, count in enumerate(self.counts) if count}
+        return summary
+
+class Profiler:
+    """
+    Times the instrumented button handlers and the event loop's lag
+
+    Attributes:
+    dict  histograms - {name: Histogram} (see above for the names)
+    obj   widget - Tk widget the probe and repaint checks are scheduled on,
+        None until start()
+    str   probe_id - Tk after() id of the next lag probe, None when stopped
+    float probe_due - time.perf_counter() the next probe should run at
+    int   depth - handlers running, so one called by another isn't timed twice
+    dict  originals - {(class, method name): function} replaced by instrument()
+    """
+    def __init__(self):
+        """Starts with nothing timed"""
+        self.histograms = {}
+        self.widget = None
+        self.probe_id = None
+        self.probe_due = 0.0
+        self.depth = 0
+        self.originals = {}
+
+    def histogram(self, name):
+        """Returns the Histogram called name, making it if it's new"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def instrument(self, cls, names=PROFILED_METHODS):
+        """Times the methods of cls in names (the ones it has) from now on.
+        Must be called before the GUIs are built, as their buttons keep the
+        methods they were given"""
+        for name in names:
+            method = cls.__dict__.get(name)
+            if method is not None and (cls, name) not in self.originals:
+                self.originals[(cls, name)] = method
+                setattr(cls, name, self.timed(cls.__name__ + "." + name, method))
+
+    def restore(self):
+        """Puts back every method replaced by instrument()"""
+        for (cls, name), method in self.originals.items():
+            setattr(cls, name, method)
+        self.originals = {}
+
+    def timed(self, name, func):
+        """Returns func wrapped to time each call into the histogram name, and
+        the time to repaint afterwards into name + " repaint" """
+        @functools.wraps(func)
+        def timed_func(*args, **kwargs):
+            if self.depth:
+                return func(*args, **kwargs)
+            self.depth += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.depth -= 1
+                self.histogram(name).add(time.perf_counter() - start)
+                if self.widget is not None:
+                    self.widget.after_idle(self.flushed, name, start)
+        return timed_func
+
+    def flushed(self, name, start):
+        """Runs just after the screen's own after_idle flush; the redraws it
+        queued run next"""
+        self.widget.after_idle(self.repainted, name, start)
+
+    def repainted(self, name, start):
+        """Counts the time from the click at start until the repaint"""
+        self.histogram(name + " repaint").add(time.perf_counter() - start)
+
+    def start(self, widget):
+        """Starts probing the event loop's lag, scheduling on widget"""
+        self.widget = widget
+        self.schedule_probe()
+
+    def stop(self):
+        """Stops probing (the handlers stay timed until restore())"""
+        if self.probe_id is not None:
+            self.widget.after_cancel(self.probe_id)
+            self.probe_id = None
+
+    def schedule_probe(self):
+        """Asks for the next probe in PROBE_MS"""
+        self.probe_due = time.perf_counter() + PROBE_MS / 1000
+        self.probe_id = self.widget.after(PROBE_MS, self.probe)
+
+    def probe(self):
+        """Counts how late it ran, then schedules the next probe"""
+        self.histogram("lag").add(max(time.perf_counter() - self.probe_due, 0.0))
+        self.schedule_probe()
+
+    def to_json(self):
+        """Returns every histogram as plain dicts (see Histogram.to_json)"""
+        return {name: histogram.to_json() for name, histogram in sorted(self.histograms.items())}
+
+    def save(self, path=None):
+        """Writes every histogram to path as JSON (PROFILE_FILE in the data
+        directory if None), and returns the path"""
+        if path is None:
+            path = ff_files.data_path(PROFILE_FILE)
+        ff_files.write_file(path, json.dumps(self.to_json(), indent=1))
+        return path
+
+    def report(self):
+        """Returns the count and percentiles of every histogram as a text table"""
+        header = "{:<40} {:>7} {:>9} {:>9} {:>9}".format("", "count", "p50 ms", "p99 ms", "max ms")
+        lines = [header]
+        for name, histogram in sorted(self.histograms.items()):
+            lines.append("{:<40} {:>7} {:>9.2f} {:>9.2f} {:>9.2f}".format(
+                name, histogram.count, histogram.percentile(50) * 1000,
+                histogram.percentile(99) * 1000, histogram.longest * 1000))
+        return "\n".join(lines)
@@ -0,0 +1,66 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the ProfileGui class - a debug window of the button and event loop
+    timings kept by ff_profiler, opened with F12 when profiling is on
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+"""
+from tkinter import *
+from tkinter.font import *
+from . import ff_resources
+
+REFRESH_MS = 1000 #How often the window is redrawn while it's open
+
+class ProfileGui:
+    """
+    A window showing the p50/p99 of every timing in a Profiler, redrawn every
+    REFRESH_MS (not on every click, so it doesn't skew what it's measuring)
+
+    Non-GUI Attributes:
+    obj profiler: ff_profiler.Profiler being shown
+    str refresh_id: Tk after() id of the next redraw
+
+    All widgets are classified by self.widgetname
+    """
+    def __init__(self, window, profiler):
+        """Builds the profile window in window (a Toplevel)"""
+        self.profile_window = window
+        self.profiler = profiler
+        self.refresh_id = None
+
+        resources = ff_resources.get_resources(window)
+        self.buttonfont = resources.font('button')
+        self.smallfont = resources.font('small')
+        self.build_profile_gui()
+        self.refresh()
+
+    def build_profile_gui(self):
+        """Builds the timings label and the save button"""
+        self.report_label = Label(self.profile_window, font=self.smallfont, anchor='nw',
+                                  justify='left', width=80)
+        self.report_label.grid(row=0, column=0, sticky='w')
+        self.save_button = Button(self.profile_window, font=self.buttonfont, text="SAVE JSON",
+                                  command=self.save)
+        self.save_button.grid(row=1, column=0)
+        self.saved_label = Label(self.profile_window, font=self.smallfont)
+        self.saved_label.grid(row=2, column=0)
+
+    def refresh(self):
+        """Redraws the timings, and schedules the next redraw"""
+        self.report_label['text'] = self.profiler.report()
+        self.refresh_id = self.profile_window.after(REFRESH_MS, self.refresh)
+
+    def save(self):
+        """Saves the timings to ff_profiler.PROFILE_FILE in the data directory"""
+        self.saved_label['text'] = "Saved to {}".format(self.profiler.save())
+
+    def close(self):
+        """Stops redrawing and closes the window"""
+        self.profile_window.after_cancel(self.refresh_id)
+        self.profile_window.destroy()
@@ -0,0 +1,228 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the Recording and ReplaySession classes - a session is recorded as
+    its dice seed plus every action the user took, and can be replayed to any
+    point without a GUI
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter.
+
+Actions are lists, so they save straight to JSON:
+    ['fight']                           - one combat round
+    ['luck']                            - ROLL LUCK on the combat screen
+    ['test_luck']                       - ROLL on the character sheet
+    ['eat']                             - eat a ration
+    ['reroll']                          - reroll the player's stats
+    ['change', stat, amount]            - a +/- button on the character sheet
+    ['stat', who, stat, value]          - a stat typed into an entry
+    ['detail', who, field, text]        - a name, potion or inventory typed in
+    ['new_fight', enemy snapshot]       - the combat screen opened
+    ['add_enemy', enemy snapshot]       - ADD ENEMY on the combat screen
+    ['remove_enemy', who]               - an enemy taken out of the fight
+    ['target', who]                     - the player chose which enemy to attack
+    ['rule', rule]                      - the targeting rule chosen
+    ['end_fight']                       - the combat screen closed
+    ['restore', snapshot]               - an undo or redo, which left this state
+who is the fighter's index in the fight: 0 for the player, 1 on for the enemies
+A full checkpoint of the state is kept every CHECKPOINT_EVERY actions, so
+    seeking only ever replays up to CHECKPOINT_EVERY actions
+"""
+import json
+from . import ff_character
+from . import ff_combatengine
+from . import ff_dice
+
+RECORDING_FILE = "ff_recording.json" #Where (in the data directory) the last session is saved when the program closes
+CHECKPOINT_EVERY = 100 #Actions between checkpoints
+RECORDING_VERSION = 3 #Recordings before version 3 can't be replayed, ff_dice made their dice differently
+
+def character_snapshot(character):
+    """Returns a plain dict of the character's attributes"""
+    return {'name': character.name, 'stats': dict(character.stats),
+            'potion': character.potion, 'inventory': character.inventory}
+
+def character_from_snapshot(snapshot):
+    """Returns a new Character made from character_snapshot()"""
+    return ff_character.Character(name=snapshot['name'], stats=dict(snapshot['stats']),
+                                  potion=snapshot['potion'], inventory=snapshot['inventory'])
+
+def make_snapshot(player, melee, rule, last_round, dice):
+    """Returns a checkpoint of a whole session, as plain lists and dicts
+    melee is the ff_combatengine.Melee being fought, None when not in a fight"""
+    seed, rng_state, buffers = dice.getstate()
+    enemies = target = None
+    if melee is not None:
+        enemies = [character_snapshot(enemy) for enemy in melee.fighters[melee.n_players:]]
+        target = melee.target()
+    return {'player': character_snapshot(player),
+            'enemies': enemies,
+            'target': target,
+            'rule': rule,
+            'last_round': last_round,
+            'dice': [seed, [rng_state[0], list(rng_state[1]), rng_state[2]],
+                     {str(sides): buffer for sides, buffer in buffers.items()}]}
+
+class ReplaySession:
+    """
+    The state of a session with all of the rules but none of the GUI
+
+    Attributes:
+    obj player: Character object
+    obj melee: ff_combatengine.Melee of the player against the enemies, None
+        when not in a fight
+    str rule: targeting rule of fights (one of ff_combatengine.TARGET_RULES)
+    str last_round: Result of previous round, "p_win", "e_win", "draw", or None
+    obj dice: the session's DiceRoller
+    """
+    def __init__(self, snapshot):
+        """Restores the session from a make_snapshot() checkpoint"""
+        self.restore(snapshot)
+
+    def restore(self, snapshot):
+        """Puts the whole state back as it was at a make_snapshot() checkpoint"""
+        self.player = character_from_snapshot(snapshot['player'])
+        self.rule = snapshot.get('rule', ff_combatengine.TARGET_RULES[0])
+        enemies = snapshot.get('enemies')
+        self.melee = None
+        if enemies is not None:
+            self.start_fight(enemies)
+            if snapshot.get('target') is not None:
+                self.melee.set_target(0, snapshot['target'])
+        self.last_round = snapshot['last_round']
+        seed, rng_state, buffers = snapshot['dice']
+        self.dice = ff_dice.DiceRoller(seed)
+        self.dice.setstate((seed, (rng_state[0], tuple(rng_state[1]), rng_state[2]),
+                            {int(sides): buffer for sides, buffer in buffers.items()}))
+
+    def snapshot(self):
+        """Returns a make_snapshot() checkpoint of the current state"""
+        return make_snapshot(self.player, self.melee, self.rule, self.last_round, self.dice)
+
+    def start_fight(self, enemy_snapshots):
+        """Starts a fight of the player against the enemies in enemy_snapshots"""
+        enemies = [character_from_snapshot(enemy) for enemy in enemy_snapshots]
+        self.melee = ff_combatengine.Melee([self.player], enemies, self.rule)
+
+    def enemy(self):
+        """Returns the enemy the player is attacking, None when not in a fight"""
+        if self.melee is None:
+            return None
+        return self.melee.fighters[self.melee.target()]
+
+    def character(self, who):
+        """Returns the fighter at index who (0 for the player)"""
+        if who == 0:
+            return self.player
+        elif self.melee is not None and isinstance(who, int) and 0 < who < len(self.melee.fighters):
+            return self.melee.fighters[who]
+        raise ValueError("Unknown character in action: {}".format(who))
+
+    def apply(self, action):
+        """Carries out one recorded action, exactly as the GUI did"""
+        kind = action[0]
+        if kind == 'fight':
+            hits = self.melee.fight_round(self.dice)[1]
+            self.last_round = ff_combatengine.melee_result(hits, 0)
+        elif kind == 'luck':
+            if self.last_round in ('p_win', 'e_win'):
+                ff_combatengine.luck_check(self.player, self.enemy(), self.last_round, self.dice)
+            self.last_round = None
+        elif kind == 'test_luck':
+            ff_combatengine.test_luck(self.player, self.dice)
+        elif kind == 'eat':
+            ff_combatengine.eat_ration(self.player)
+        elif kind == 'reroll':
+            self.player.roll_stats(self.dice)
+        elif kind == 'change':
+            self.player.change_char_stat(action[1], action[2])
+        elif kind == 'stat':
+            self.character(action[1]).set_stat(action[2], action[3])
+        elif kind == 'detail':
+            self.character(action[1]).set_detail(action[2], action[3])
+        elif kind == 'new_fight':
+            self.start_fight([action[1]])
+            self.last_round = None
+        elif kind == 'add_enemy':
+            self.melee.add_enemy(character_from_snapshot(action[1]))
+            self.last_round = None
+        elif kind == 'remove_enemy':
+            self.melee.remove_enemy(action[1])
+            self.last_round = None
+        elif kind == 'target':
+            self.melee.set_target(0, action[1])
+            self.last_round = None
+        elif kind == 'rule':
+            self.rule = action[1]
+            if self.melee is not None:
+                self.melee.set_rule(self.rule)
+        elif kind == 'restore':
+            self.restore(action[1])
+        elif kind == 'end_fight':
+            self.melee = None
+            self.last_round = None
+        else:
+            raise ValueError("Unknown action: {}".format(action))
+
+class Recording:
+    """
+    A session recorded as its starting checkpoint and every action since,
+    with a checkpoint after every CHECKPOINT_EVERY actions
+
+    Attributes:
+    list actions - every action, in order
+    list checkpoints - checkpoints[k] is the state after k * checkpoint_every actions
+    int  checkpoint_every - actions between checkpoints
+    func snapshot_source - returns a make_snapshot() of the live session, to
+        take checkpoints while recording; None for a loaded recording
+    """
+    def __init__(self, start, snapshot_source=None, checkpoint_every=CHECKPOINT_EVERY):
+        """Starts a recording from the start checkpoint"""
+        self.actions = []
+        self.checkpoints = [start]
+        self.checkpoint_every = checkpoint_every
+        self.snapshot_source = snapshot_source
+
+    def __len__(self):
+        """Returns the number of actions recorded"""
+        return len(self.actions)
+
+    def record(self, action):
+        """Adds an action, just after it was carried out"""
+        self.actions.append(action)
+        if len(self.actions) % self.checkpoint_every == 0:
+            self.checkpoints.append(self.snapshot_source())
+
+    def seek(self, index):
+        """Returns a ReplaySession of the state after the first index actions,
+        from the nearest checkpoint at or before index"""
+        if not 0 <= index <= len(self.actions):
+            raise IndexError("Cannot seek to action {} of {}".format(index, len(self.actions)))
+        checkpoint = min(index // self.checkpoint_every, len(self.checkpoints) - 1)
+        session = ReplaySession(self.checkpoints[checkpoint])
+        for action in self.actions[checkpoint * self.checkpoint_every:index]:
+            session.apply(action)
+        return session
+
+    def save(self, path):
+        """Writes the recording to a JSON file"""
+        with open(path, 'w') as recording_file:
+            json.dump({'version': RECORDING_VERSION, 'checkpoint_every': self.checkpoint_every,
+                       'checkpoints': self.checkpoints, 'actions': self.actions},
+                      recording_file)
+
+def load_recording(path):
+    """Returns the Recording saved at path"""
+    with open(path) as recording_file:
+        saved = json.load(recording_file)
+    if saved.get('version') != RECORDING_VERSION:
+        raise ValueError("{} is not a version {} recording".format(path, RECORDING_VERSION))
+    recording = Recording(saved['checkpoints'][0], checkpoint_every=saved['checkpoint_every'])
+    recording.checkpoints = saved['checkpoints']
+    recording.actions = saved['actions']
+    return recording
@@ -0,0 +1,105 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the Resources class - the fonts and images shared by every window,
+    made once per Tk root and handed out to each screen as it opens
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+
+Opening a screen, or rebuilding the character sheet after a battle, only
+    looks its fonts and images up: the gifs are read and each font's metrics
+    worked out the first time they're used, never again.
+The theme settings below only change through set_theme(), which reconfigures
+    the fonts and images in place, so every widget already using them
+    redraws with the new theme without being rebuilt
+"""
+import os
+from tkinter import *
+from tkinter.font import *
+
+FONT_FAMILY = "courier" #Use a monospaced font to make things easier
+BIG_FONT = 24    #Standard font size
+MIDDLE_FONT = 16 #For buttons
+SMALL_FONT = 10  #For credits and the logbook
+IMAGE_DIR = os.path.dirname(os.path.abspath(__file__)) #plus.gif and minus.gif are kept with the code
+IMAGE_FILES = {'plus': 'plus.gif', 'minus': 'minus.gif'}
+
+def font_options(name):
+    """Returns the Font options of the font called name ('header', 'button'
+    or 'small') for the current theme"""
+    sizes = {'header': BIG_FONT, 'button': MIDDLE_FONT, 'small': SMALL_FONT}
+    return {'family': FONT_FAMILY, 'size': sizes[name]}
+
+def image_path(name):
+    """Returns the file of the image called name ('plus' or 'minus') for the
+    current theme"""
+    return os.path.join(IMAGE_DIR, IMAGE_FILES[name])
+
+class Resources:
+    """
+    The fonts and images of one Tk root, each made the first time it's asked for
+
+    Attributes:
+    obj  root - the Tk root they belong to
+    dict fonts - {name: Font} of the fonts made so far
+    dict images - {name: PhotoImage} of the images loaded so far. Keeping them
+        here also stops Python throwing them away while a widget shows them
+    """
+    def __init__(self, root):
+        """Starts with nothing made yet"""
+        self.root = root
+        self.fonts = {}
+        self.images = {}
+
+    def font(self, name):
+        """Returns the shared Font called name"""
+        font = self.fonts.get(name)
+        if font is None:
+            font = self.fonts[name] = Font(root=self.root, **font_options(name))
+        return font
+
+    def image(self, name):
+        """Returns the shared PhotoImage called name"""
+        image = self.images.get(name)
+        if image is None:
+            image = self.images[name] = PhotoImage(master=self.root, file=image_path(name))
+        return image
+
+    def theme_changed(self):
+        """Remakes every font and image made so far for the new theme, in place"""
+        for name, font in self.fonts.items():
+            font.configure(**font_options(name))
+        for name, image in self.images.items():
+            image.configure(file=image_path(name))
+
+_resources = {} #{Tk root: Resources}, as fonts and images can't be shared between roots
+
+def get_resources(widget):
+    """Returns the Resources of the Tk root widget is in"""
+    root = widget._root()
+    resources = _resources.get(root)
+    if resources is None:
+        resources = _resources[root] = Resources(root)
+    return resources
+
+def set_theme(family=None, big=None, middle=None, small=None, image_dir=None):
+    """Changes the theme settings given (the others stay as they are), and
+    updates every font and image already in use to match"""
+    global FONT_FAMILY, BIG_FONT, MIDDLE_FONT, SMALL_FONT, IMAGE_DIR
+    if family is not None:
+        FONT_FAMILY = family
+    if big is not None:
+        BIG_FONT = big
+    if middle is not None:
+        MIDDLE_FONT = middle
+    if small is not None:
+        SMALL_FONT = small
+    if image_dir is not None:
+        IMAGE_DIR = image_dir
+    for resources in _resources.values():
+        resources.theme_changed()
@@ -0,0 +1,183 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the RollStats class - running totals of every die rolled and every
+    attack made this session, to answer "are the dice rigged?"
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter.
+
+Each die or log only adds to a few counters, so keeping the stats costs the
+    same however long the session has run, and reading them never looks back
+    through the dice or the logbook
+"""
+import math
+
+SIDES = 6
+MIN_FAIR_ROLLS = SIDES * 5 #Chi-square needs about 5 of each face expected to mean anything
+FAIR_P_VALUE = 0.01        #Dice are only called suspicious below this p-value
+
+def chi_square_p_value(chi_square, degrees):
+    """Returns the chance of a chi-square statistic at least this big from fair
+    dice, for an odd number of degrees of freedom (5 for a 6 sided die)"""
+    if chi_square <= 0:
+        return 1.0
+    #Survival function for odd degrees: erfc(sqrt(x/2)) + sqrt(2x/pi) e^(-x/2) (1 + x/3 + x^2/15 ...)
+    term = 1.0
+    total = 0.0
+    for k in range(1, (degrees + 1) // 2):
+        total += term
+        term *= chi_square / (2 * k + 1)
+    return (math.erfc(math.sqrt(chi_square / 2)) +
+            math.sqrt(2 * chi_square / math.pi) * math.exp(chi_square * -0.5) * total)
+
+class AttackStats:
+    """
+    Running totals of one character's attack values
+
+    Attributes:
+    dict counts - {attack value: times rolled}
+    int  rolls - number of attacks
+    int  total - sum of the attack values
+    int  rounds_won - rounds this character won
+    int  streak - rounds won in a row, up to now
+    int  best_streak - most rounds won in a row
+    """
+    def __init__(self):
+        """Starts with no attacks"""
+        self.counts = {}
+        self.rolls = 0
+        self.total = 0
+        self.rounds_won = 0
+        self.streak = 0
+        self.best_streak = 0
+
+    def mean(self):
+        """Returns the mean attack value, or None with no attacks"""
+        if self.rolls == 0:
+            return None
+        return self.total / self.rolls
+
+class RollStats:
+    """
+    Running totals of the dice rolled and attacks made this session
+
+    Attributes:
+    list faces - faces[n] is the number of n's rolled (faces[0] is unused)
+    int  dice - number of dice rolled
+    int  total - sum of all dice rolled
+    int  last_face, streak - the face of the last die, and how many in a row it's come up
+    int  best_face, best_streak - the face that came up most times in a row, and how many
+    dict attacks - {character name: AttackStats}
+    str  loser - name of the character who lost the round being logged, None if
+        there isn't one waiting for its attack logs
+    list fighters - names in the attack logs of that round so far
+
+    A round is logged as the damage (or draw) log then both attack logs, so the
+    winner is known once the second attack log comes in. With several enemies,
+    each hit_by log counts as a round between its two fighters
+    """
+    def __init__(self):
+        """Starts with no dice rolled"""
+        self.faces = [0] * (SIDES + 1)
+        self.dice = 0
+        self.total = 0
+        self.last_face = None
+        self.streak = 0
+        self.best_face = None
+        self.best_streak = 0
+        self.attacks = {}
+        self.loser = None
+        self.fighters = []
+
+    def dice_rolled(self, sides, faces):
+        """DiceRoller listener; counts each die of a roll"""
+        if sides != SIDES:
+            return
+        for face in faces:
+            self.faces[face] += 1
+            self.dice += 1
+            self.total += face
+            if face == self.last_face:
+                self.streak += 1
+            else:
+                self.last_face = face
+                self.streak = 1
+            if self.streak > self.best_streak:
+                self.best_face = face
+                self.best_streak = self.streak
+
+    def logs_added(self, logs):
+        """Logbook listener; counts attack values and round wins from combat logs"""
+        for log in logs:
+            if log.key == 'roll_die' and log.parts is not None:
+                for part in log.parts:
+                    if part.key == 'attack_val':
+                        self.add_attack(log.args[0], part.args[0])
+            elif log.key == 'take_dmg':
+                self.loser = log.args[0]
+                self.fighters = []
+            elif log.key == 'hit_by': #A round against several enemies names both fighters
+                self.round_won(log.args[:2], log.args[0])
+            elif log.key == 'draw':
+                self.round_drawn()
+
+    def attack_stats(self, name):
+        """Returns the AttackStats of the character name, making it if it's new"""
+        stats = self.attacks.get(name)
+        if stats is None:
+            stats = self.attacks[name] = AttackStats()
+        return stats
+
+    def add_attack(self, name, attack):
+        """Counts an attack value of the character name"""
+        stats = self.attack_stats(name)
+        stats.counts[attack] = stats.counts.get(attack, 0) + 1
+        stats.rolls += 1
+        stats.total += attack
+        if self.loser is not None:
+            self.fighters.append(name)
+            if len(self.fighters) == 2:
+                self.round_won(self.fighters, self.loser)
+                self.loser = None
+
+    def round_won(self, fighters, loser):
+        """Counts a round between the two fighters, won by the one that isn't loser"""
+        for name in fighters:
+            stats = self.attack_stats(name)
+            if name == loser:
+                stats.streak = 0
+            else:
+                stats.rounds_won += 1
+                stats.streak += 1
+                stats.best_streak = max(stats.best_streak, stats.streak)
+
+    def round_drawn(self):
+        """Counts a drawn round, which ends everyone's streak"""
+        for stats in self.attacks.values():
+            stats.streak = 0
+        self.loser = None
+
+    def mean(self):
+        """Returns the mean of all dice rolled, or None with no dice"""
+        if self.dice == 0:
+            return None
+        return self.total / self.dice
+
+    def chi_square(self):
+        """Returns the chi-square statistic of the faces rolled against fair dice"""
+        expected = self.dice / SIDES
+        return sum((count - expected) ** 2 for count in self.faces[1:]) / expected
+
+    def fairness(self):
+        """Returns (chi-square, p-value) of the faces rolled, or None if too few
+        dice have been rolled to tell"""
+        if self.dice < MIN_FAIR_ROLLS:
+            return None
+        chi_square = self.chi_square()
+        return chi_square, chi_square_p_value(chi_square, SIDES - 1)
@@ -0,0 +1,204 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the SessionHost class - many adventurers in one program, each with
+    their own character, logbooks, dice and fight in progress, and only the
+    one switched to shown by the GUI
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter.
+
+A Session is an ff_replay.ReplaySession (the rules with no GUI) and the last
+    NUM_LOGS logs of each logbook, a few kilobytes. Sessions not shown can
+    still be played by applying ff_replay actions to them.
+The GUI is only built for the session switched to (see
+    ff_extras.attach_session), and hands its state back to the session when
+    another is switched to.
+Each session is saved to SESSIONS_DIR/<name>.json in the data directory
+    (see ff_files) when another is switched
+    to, and when it's evicted (after IDLE_SECONDS idle). It's loaded again the
+    next time it's used, and the file is only ever overwritten, never deleted,
+    so a crash loses no more than what was done since then.
+Run with gui --session NAME (see ff_cli); the sessions window (F9, see
+    ff_sessionscreen) switches between them and starts new ones
+"""
+import collections
+import json
+import os
+import re
+import time
+from . import ff_character
+from . import ff_combatengine
+from . import ff_dice
+from . import ff_files
+from . import ff_logbook
+from . import ff_replay
+
+SESSIONS_DIR = "ff_sessions"
+SESSION_SUFFIX = ".json"
+SESSION_VERSION = 1
+IDLE_SECONDS = 10 * 60 #Sessions unused this long are evicted by evict_idle()
+NAME_PATTERN = re.compile(r"[A-Za-z0-9_\-]+") #Names are used as file names
+
+class Session:
+    """
+    One adventurer, with everything needed to carry on where they left off
+
+    Attributes:
+    str   name - the session's name, unique in its SessionHost
+    obj   game - ff_replay.ReplaySession: the player, fight, rule, last round and dice
+    dict  logs - {book: deque of the last NUM_LOGS Logs} for ff_logbook.LOG_BOOKS
+    float last_used - time.monotonic() when the session was last used
+    """
+    def __init__(self, name, game, logs=None):
+        """Makes a session of game, with logs ({book: [Log]}) in its logbooks"""
+        self.name = name
+        self.game = game
+        if logs is None:
+            logs = {}
+        self.logs = {book: collections.deque(logs.get(book, []), maxlen=ff_logbook.NUM_LOGS)
+                     for book in ff_logbook.LOG_BOOKS}
+        self.last_used = time.monotonic()
+
+    def touch(self):
+        """Marks the session as used now"""
+        self.last_used = time.monotonic()
+
+    def apply(self, action):
+        """Plays an ff_replay action on the session without a GUI"""
+        self.game.apply(action)
+        self.touch()
+
+    def to_json(self):
+        """Returns the session as plain lists and dicts"""
+        return {'version': SESSION_VERSION, 'name': self.name, 'game': self.game.snapshot(),
+                'logs': {book: [log.to_json() for log in logs] for book, logs in self.logs.items()}}
+
+def session_from_json(saved):
+    """Returns a new Session made from Session.to_json()"""
+    if saved.get('version') != SESSION_VERSION:
+        raise ValueError("Not a version {} session".format(SESSION_VERSION))
+    logs = {book: [ff_logbook.log_from_json(log) for log in saved_logs]
+            for book, saved_logs in saved['logs'].items()}
+    return Session(saved['name'], ff_replay.ReplaySession(saved['game']), logs)
+
+class SessionHost:
+    """
+    Every session of the program, loaded or evicted to disk
+
+    Attributes:
+    str  directory - where evicted sessions are saved
+    func attach - called with a Session when it's switched to, returning the
+        GUI it's shown on, which has detach(); None to run without a GUI
+    dict sessions - {name: Session} of the sessions in memory
+    str  attached - name of the session switched to, None if there isn't one
+    obj  gui - what attach returned for it
+    """
+    def __init__(self, directory=None, attach=None):
+        """Sets up a host of the sessions saved in directory, SESSIONS_DIR in
+        the data directory if None (none are loaded yet)"""
+        if directory is None:
+            directory = ff_files.data_path(SESSIONS_DIR)
+        self.directory = directory
+        self.attach = attach
+        self.sessions = {}
+        self.attached = None
+        self.gui = None
+
+    def path(self, name):
+        """Returns the file an evicted session name is saved to"""
+        return os.path.join(self.directory, name + SESSION_SUFFIX)
+
+    def names(self):
+        """Returns the names of every session, loaded or evicted, in order"""
+        names = set(self.sessions)
+        if os.path.isdir(self.directory):
+            names.update(file_name[:len(SESSION_SUFFIX) * -1] for file_name in os.listdir(self.directory)
+                         if file_name.endswith(SESSION_SUFFIX))
+        return sorted(names)
+
+    def new_session(self, name, character=None, seed=None):
+        """Starts a session called name for character (a standard Character
+        if None) with dice from seed (random if None), and returns it"""
+        if not NAME_PATTERN.fullmatch(name):
+            raise ValueError("Session names can only have letters, numbers, _ and -: {}".format(name))
+        if name in self.sessions or os.path.exists(self.path(name)):
+            raise ValueError("There's already a session called {}".format(name))
+        if character is None:
+            character = ff_character.Character()
+        snapshot = ff_replay.make_snapshot(character, None, ff_combatengine.TARGET_RULES[0], None,
+                                           ff_dice.DiceRoller(seed))
+        session = self.sessions[name] = Session(name, ff_replay.ReplaySession(snapshot))
+        self.save(name)
+        return session
+
+    def get(self, name):
+        """Returns the session name, loading it if it was evicted. Raises
+        KeyError if there's no such session"""
+        session = self.sessions.get(name)
+        if session is None:
+            try:
+                with open(self.path(name)) as session_file:
+                    session = session_from_json(json.load(session_file))
+            except FileNotFoundError:
+                raise KeyError("No session called {}".format(name)) from None
+            self.sessions[name] = session
+        session.touch()
+        return session
+
+    def switch(self, name):
+        """Shows the session name on the GUI (if there is one) in place of the
+        session shown now, and returns it"""
+        session = self.get(name)
+        if name == self.attached:
+            return session
+        self.detach()
+        self.attached = name
+        if self.attach is not None:
+            self.gui = self.attach(session)
+        return session
+
+    def detach(self):
+        """Takes the session shown off the GUI, which hands its state back"""
+        if self.attached is None:
+            return
+        if self.gui is not None:
+            self.gui.detach()
+            self.gui = None
+        self.sessions[self.attached].touch()
+        self.save(self.attached)
+        self.attached = None
+
+    def save(self, name):
+        """Saves the session name to disk, keeping it in memory"""
+        os.makedirs(self.directory, exist_ok=True)
+        ff_files.write_file(self.path(name), json.dumps(self.sessions[name].to_json()))
+
+    def evict(self, name):
+        """Saves the session name to disk and drops it from memory"""
+        if name == self.attached:
+            raise ValueError("Can't evict {}, it's the session shown".format(name))
+        self.save(name)
+        del self.sessions[name]
+
+    def evict_idle(self, idle_seconds=IDLE_SECONDS):
+        """Evicts every session (apart from the one shown) unused for
+        idle_seconds, and returns their names"""
+        idle_since = time.monotonic() - idle_seconds
+        idle = [name for name, session in self.sessions.items()
+                if name != self.attached and session.last_used <= idle_since]
+        for name in idle:
+            self.evict(name)
+        return idle
+
+    def close(self):
+        """Detaches the session shown and evicts every session, so they're all
+        on disk for next time"""
+        self.detach()
+        for name in list(self.sessions):
+            self.evict(name)
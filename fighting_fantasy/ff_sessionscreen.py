@@ -0,0 +1,93 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the SessionsGui class - a window listing every session of an
+    ff_sessions.SessionHost, to switch between them or start a new one,
+    opened with F9 when the program is run with gui --session
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+"""
+from tkinter import *
+from tkinter.font import *
+from . import ff_resources
+
+class SessionsGui:
+    """
+    A window with a button for every session, the one shown selected, and an
+    entry to name a new one
+
+    Non-GUI Attributes:
+    obj host: ff_sessions.SessionHost of the sessions
+
+    All widgets are classified by self.widgetname
+    """
+    def __init__(self, window, host):
+        """Builds the sessions window in window (a Toplevel)"""
+        self.sessions_window = window
+        self.host = host
+
+        resources = ff_resources.get_resources(window)
+        self.buttonfont = resources.font('button')
+        self.smallfont = resources.font('small')
+        self.names_frame = None
+        self.build_sessions_gui()
+        self.build_name_rows()
+
+    def build_sessions_gui(self):
+        """Builds the new session entry and button, and the message label"""
+        self.chosen_var = StringVar(self.sessions_window, value=self.host.attached)
+        self.new_name_var = StringVar(self.sessions_window)
+        new_frame = Frame(self.sessions_window)
+        new_frame.grid(row=1, column=0, sticky='w')
+        self.new_name_entry = Entry(new_frame, font=self.buttonfont, width=16,
+                                    textvariable=self.new_name_var)
+        self.new_name_entry.grid(row=0, column=0)
+        self.new_button = Button(new_frame, font=self.buttonfont, text="NEW",
+                                 command=self.new_session)
+        self.new_button.grid(row=0, column=1)
+        self.message_label = Label(self.sessions_window, font=self.smallfont)
+        self.message_label.grid(row=2, column=0, sticky='w')
+
+    def build_name_rows(self):
+        """(Re)builds a button for each session, loaded or on disk"""
+        if self.names_frame is not None:
+            self.names_frame.destroy()
+        self.names_frame = Frame(self.sessions_window)
+        self.names_frame.grid(row=0, column=0, sticky='w')
+        for row, name in enumerate(self.host.names()):
+            Radiobutton(self.names_frame, font=self.buttonfont, text=name, value=name,
+                        variable=self.chosen_var,
+                        command=lambda name=name: self.switch(name)).grid(row=row, column=0, sticky='w')
+        if self.chosen_var.get() != self.host.attached:
+            self.chosen_var.set(self.host.attached)
+
+    def switch(self, name):
+        """Command of the session buttons; shows the session name"""
+        try:
+            self.host.switch(name)
+        except (KeyError, ValueError) as error: #e.g. its file was deleted, or is from another version
+            self.message_label['text'] = "Can't switch: {}".format(error)
+            self.build_name_rows()
+            return
+        self.message_label['text'] = ""
+
+    def new_session(self):
+        """NEW button; starts a session with the name typed, and shows it"""
+        name = self.new_name_var.get().strip()
+        try:
+            self.host.new_session(name)
+        except ValueError as error:
+            self.message_label['text'] = str(error)
+            return
+        self.new_name_var.set("")
+        self.switch(name)
+        self.build_name_rows()
+
+    def close(self):
+        """Closes the window"""
+        self.sessions_window.destroy()
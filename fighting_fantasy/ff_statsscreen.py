@@ -0,0 +1,105 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the StatsGui class - a window of the session's dice statistics,
+    with a fairness check, and each character's attack values
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+"""
+from tkinter import *
+from tkinter.font import *
+from . import ff_resources
+from . import ff_rollstats
+
+BAR_WIDTH = 30 #Characters in the longest bar of the faces histogram
+
+class StatsGui:
+    """
+    A window showing a RollStats, redrawn once per event loop turn while rolls
+    come in
+
+    Non-GUI Attributes:
+    obj  roll_stats: ff_rollstats.RollStats being shown
+    bool flush_pending: True if the window is waiting to be redrawn
+
+    All widgets are classified by self.widgetname
+    """
+    def __init__(self, window, roll_stats):
+        """Builds the stats window in window (a Toplevel)"""
+        self.stats_window = window
+        self.roll_stats = roll_stats
+        self.flush_pending = False
+
+        resources = ff_resources.get_resources(window)
+        self.buttonfont = resources.font('button')
+        self.smallfont = resources.font('small')
+        self.build_stats_gui()
+        self.flush()
+
+    def build_stats_gui(self):
+        """Builds the dice and attack labels"""
+        self.dice_title = Label(self.stats_window, font=self.buttonfont, text="Dice:")
+        self.dice_title.grid(row=0, column=0, sticky='w')
+        self.dice_label = Label(self.stats_window, font=self.smallfont, anchor='nw',
+                                justify='left', width=64)
+        self.dice_label.grid(row=1, column=0, sticky='w')
+        self.attacks_title = Label(self.stats_window, font=self.buttonfont, text="Attacks:")
+        self.attacks_title.grid(row=2, column=0, sticky='w')
+        self.attacks_label = Label(self.stats_window, font=self.smallfont, anchor='nw',
+                                   justify='left', width=64)
+        self.attacks_label.grid(row=3, column=0, sticky='w')
+
+    def mark_dirty(self, *args):
+        """Listener for rolls and logs; makes sure the window is redrawn once the
+        current event has been handled"""
+        if not self.flush_pending:
+            self.flush_pending = True
+            self.stats_window.after_idle(self.flush)
+
+    def flush(self):
+        """Redraws both labels from the running totals"""
+        self.flush_pending = False
+        self.dice_label['text'] = self.dice_text()
+        self.attacks_label['text'] = self.attacks_text()
+
+    def dice_text(self):
+        """Returns the faces histogram, mean, streaks and fairness check as text"""
+        stats = self.roll_stats
+        if stats.dice == 0:
+            return "No dice rolled yet."
+        lines = ["{} dice rolled, mean {:.2f} (fair dice: {:.2f})".format(
+            stats.dice, stats.mean(), (ff_rollstats.SIDES + 1) / 2)]
+        most = max(stats.faces[1:])
+        for face in range(1, ff_rollstats.SIDES + 1):
+            count = stats.faces[face]
+            lines.append("{}: {:<{width}} {} ({:.1%})".format(
+                face, "#" * (count * BAR_WIDTH // most), count, count / stats.dice,
+                width=BAR_WIDTH))
+        lines.append("Longest run: {} {}s in a row, now {} {}s".format(
+            stats.best_streak, stats.best_face, stats.streak, stats.last_face))
+        fairness = stats.fairness()
+        if fairness is None:
+            lines.append("Roll at least {} dice to check they're fair.".format(
+                ff_rollstats.MIN_FAIR_ROLLS))
+        else:
+            chi_square, p_value = fairness
+            verdict = "suspicious!" if p_value < ff_rollstats.FAIR_P_VALUE else "looks fair."
+            lines.append("Chi-square {:.2f}, p = {:.3f}: {}".format(chi_square, p_value, verdict))
+        return "\n".join(lines)
+
+    def attacks_text(self):
+        """Returns each character's attack values and round wins as text"""
+        if not self.roll_stats.attacks:
+            return "No attacks yet."
+        lines = []
+        for name, stats in self.roll_stats.attacks.items():
+            lines.append("{}: {} attacks, mean {:.2f}, {} rounds won, best run {}".format(
+                name, stats.rolls, stats.mean(), stats.rounds_won, stats.best_streak))
+            lines.append("  " + " ".join("{}x{}".format(attack, stats.counts[attack])
+                                         for attack in sorted(stats.counts)))
+        return "\n".join(lines)
@@ -0,0 +1,150 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Module for the Fighting Fantasy Program
+Includes the UndoHistory class - unlimited undo and redo on the character
+    sheet and combat screen
+
+For Fighting Fantasy Gamebooks:
+Ian Livingstone's Caverns of the White Witch & similar
+
+Cannot be run as the initial program.
+Does not import tkinter.
+
+Nothing is ever copied whole: each step (everything done in one go, e.g. a
+    click of FIGHT or TO THE END) is kept as a reversible delta, the fields it
+    changed with their values before and after. A field changed many times in
+    one step is only kept once, so a step costs O(fields changed) however long
+    it ran, and thousands of steps cost no more than their changes.
+The values are ints, strings and tuples, which are never changed in place,
+    so a delta shares them with the live state instead of copying them
+"""
+
+def set_character_field(character, field, value):
+    """Sets a stat or detail of a Character, for its deltas"""
+    if field in character.stats:
+        character.set_stat(field, value)
+    else:
+        character.set_detail(field, value)
+
+def character_fields(character):
+    """Returns {field: value} of every field of a Character"""
+    fields = dict(character.stats)
+    fields.update(name=character.name, potion=character.potion, inventory=character.inventory)
+    return fields
+
+class UndoHistory:
+    """
+    The steps that can be undone and redone
+
+    Attributes:
+    list undo_steps - steps that can be undone, oldest first. A step is a dict
+        {(obj, field): [setter, value before, value after]}, and is undone
+        by setter(obj, field, value before)
+    list redo_steps - steps undone that can be redone, the last undone last
+    dict step - the step being built, None if nothing has changed since end_step()
+    dict shadows - {Character: {field: value}} the last known fields of each
+        character watched, so a change's value before is known
+    bool applying - True while undoing or redoing, when changes aren't kept
+    func on_step - called when a new step starts, e.g. to end it once the
+        current event has been handled; None to end steps by hand
+    """
+    def __init__(self, on_step=None):
+        """Starts with nothing to undo"""
+        self.undo_steps = []
+        self.redo_steps = []
+        self.step = None
+        self.shadows = {}
+        self.applying = False
+        self.on_step = on_step
+
+    def watch(self, character):
+        """Keeps every change to character from now on"""
+        if character not in self.shadows:
+            self.shadows[character] = character_fields(character)
+            character.add_listener(self.character_changed)
+
+    def unwatch(self, character):
+        """Stops keeping changes to character, e.g. an enemy once they're out of
+        the fight. Steps that changed them still set them back if undone, and
+        watching them again (say, when that brings them back) starts afresh"""
+        if self.shadows.pop(character, None) is not None:
+            character.remove_listener(self.character_changed)
+
+    def close(self):
+        """Stops watching every character"""
+        for character in self.shadows:
+            character.remove_listener(self.character_changed)
+        self.shadows = {}
+
+    def character_changed(self, character, field):
+        """Listener for each character watched"""
+        shadow = self.shadows[character]
+        before = shadow[field]
+        if field in character.stats:
+            after = character.stats[field]
+        else:
+            after = getattr(character, field)
+        shadow[field] = after
+        self.changed(character, field, before, after, set_character_field)
+
+    def changed(self, obj, field, before, after, setter):
+        """Keeps a change to field of obj in the current step, which setter
+        (called as setter(obj, field, value)) can reverse"""
+        if self.applying:
+            return
+        if self.step is None:
+            self.step = {}
+            if self.on_step is not None:
+                self.on_step()
+        delta = self.step.get((obj, field))
+        if delta is None:
+            self.step[(obj, field)] = [setter, before, after]
+        else:
+            delta[2] = after
+
+    def end_step(self):
+        """Closes the current step, which can then be undone. A new step
+        means the steps undone can no longer be redone"""
+        step = self.step
+        self.step = None
+        if step is None:
+            return
+        for key in [key for key, delta in step.items() if delta[1] == delta[2]]:
+            del step[key] #Changed, then changed back
+        if step:
+            self.undo_steps.append(step)
+            self.redo_steps.clear()
+
+    def undo(self):
+        """Undoes the last step, returning False if there wasn't one"""
+        self.end_step()
+        if not self.undo_steps:
+            return False
+        step = self.undo_steps.pop()
+        self.apply(step, 1, reverse=True)
+        self.redo_steps.append(step)
+        return True
+
+    def redo(self):
+        """Redoes the last step undone, returning False if there wasn't one"""
+        self.end_step()
+        if not self.redo_steps:
+            return False
+        step = self.redo_steps.pop()
+        self.apply(step, 2)
+        self.undo_steps.append(step)
+        return True
+
+    def apply(self, step, which, reverse=False):
+        """Sets every field of step to its value before (which=1) or after (which=2)"""
+        deltas = list(step.items())
+        if reverse:
+            deltas.reverse()
+        self.applying = True
+        try:
+            for (obj, field), delta in deltas:
+                delta[0](obj, field, delta[which])
+        finally:
+            self.applying = False
@@ -0,0 +1,104 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Tests for the Fighting Fantasy Program
+Includes checks of ff_combatengine's exact odds against hand-computed fights,
+    and of its simulated fights against the exact odds
+
+Run with python -m pytest from the top of the repository
+"""
+import pytest
+from fighting_fantasy import ff_character
+from fighting_fantasy import ff_combatengine
+from fighting_fantasy import ff_dice
+
+TRIALS = 20000  #Fights simulated for each check
+TOLERANCE = 0.02 #Over 5 standard deviations of a win rate from TRIALS fights
+SEED = 8
+FIGHTS = [(2, 20, 12), (0, 18, 18), (-3, 24, 10)] #(skill_diff, p_stamina, e_stamina)
+
+def make_fighters(skill_diff, p_stamina, e_stamina):
+    """Returns a player and enemy Character with the given difference in skill"""
+    player = ff_character.Character(stats={'skill': 9 + skill_diff, 'stamina': p_stamina})
+    enemy = ff_character.Character(name="Enemy", stats={'skill': 9, 'stamina': e_stamina})
+    return player, enemy
+
+@pytest.mark.parametrize("skill_diff, p_stamina, e_stamina", FIGHTS)
+def test_simulate_matches_fight_odds(skill_diff, p_stamina, e_stamina):
+    player, enemy = make_fighters(skill_diff, p_stamina, e_stamina)
+    result = ff_combatengine.simulate(player, enemy, TRIALS, seed=1)
+    win_chance, rounds = ff_combatengine.fight_odds(skill_diff, p_stamina, e_stamina)
+    assert result.win_rate == pytest.approx(win_chance, abs=TOLERANCE)
+    assert sum(result.stamina_left) == TRIALS
+    assert sum(result.rounds) == TRIALS
+
+@pytest.mark.parametrize("skill_diff, p_stamina, e_stamina", FIGHTS)
+def test_python_path_matches_fight_odds(skill_diff, p_stamina, e_stamina):
+    #simulate() only takes this path when NumPy isn't installed
+    dice = ff_dice.DiceRoller(2)
+    result = ff_combatengine._simulate_python(skill_diff, p_stamina, e_stamina, TRIALS, dice)
+    win_chance, rounds = ff_combatengine.fight_odds(skill_diff, p_stamina, e_stamina)
+    assert result.win_rate == pytest.approx(win_chance, abs=TOLERANCE)
+
+def test_simulate_same_with_or_without_numpy(monkeypatch):
+    pytest.importorskip("numpy")
+    player, enemy = make_fighters(1, 16, 14)
+    with_numpy = ff_combatengine.simulate(player, enemy, TRIALS, seed=5)
+    monkeypatch.setattr(ff_combatengine, 'load_numpy', lambda: None)
+    monkeypatch.setattr(ff_dice, 'load_numpy', lambda: None)
+    without_numpy = ff_combatengine.simulate(player, enemy, TRIALS, seed=5)
+    assert (with_numpy.wins, with_numpy.stamina_left, with_numpy.rounds) == \
+           (without_numpy.wins, without_numpy.stamina_left, without_numpy.rounds)
+
+def test_simulate_draws_from_the_dice():
+    #The same dice the GUI rolls: a simulation moves the stream on
+    player, enemy = make_fighters(0, 4, 4)
+    dice = ff_dice.DiceRoller(SEED)
+    ff_combatengine.simulate(player, enemy, 10, dice=dice)
+    assert dice.roll_many(2, 6, 5) != ff_dice.DiceRoller(SEED).roll_many(2, 6, 5)
+
+def test_simulate_seed_repeats():
+    player, enemy = make_fighters(1, 16, 14)
+    first = ff_combatengine.simulate(player, enemy, 1000, seed=7)
+    second = ff_combatengine.simulate(player, enemy, 1000, seed=7)
+    assert (first.wins, first.stamina_left, first.rounds) == \
+           (second.wins, second.stamina_left, second.rounds)
+
+def test_round_odds_even_fight():
+    #146 of the 1296 pairs of 2d6 totals are equal; the rest split evenly
+    assert ff_combatengine.attack_difference_odds(0) == \
+           pytest.approx((575 / 1296, 575 / 1296, 146 / 1296))
+
+def test_fight_odds_hand_computed():
+    p_win, e_win, draw = ff_combatengine.attack_difference_odds(2)
+    q = p_win / (p_win + e_win) #Chance a round that isn't a draw goes the player's way
+    decisive_rounds = 1296 / 1150 #Rounds fought, draws included, per decisive round at skill_diff 0
+    #One hit each way ends it
+    assert ff_combatengine.fight_odds(0, 2, 2) == pytest.approx((0.5, decisive_rounds))
+    #The player needs two hits before taking one
+    assert ff_combatengine.fight_odds(0, 2, 4) == pytest.approx((0.25, 1.5 * decisive_rounds))
+    #The player needs three hits before taking two (3 stamina survives one)
+    assert ff_combatengine.fight_odds(2, 3, 5)[0] == pytest.approx(q ** 3 + 3 * q ** 3 * (1 - q))
+
+def test_fight_odds_edge_cases():
+    assert ff_combatengine.fight_odds(0, 10, 0) == (1.0, 0.0)
+    assert ff_combatengine.fight_odds(0, 0, 10) == (0.0, 0.0)
+    #A skill 11 higher always wins the round: five rounds for 10 stamina
+    assert ff_combatengine.fight_odds(11, 1, 10) == pytest.approx((1.0, 5.0))
+
+def test_fight_odds_symmetry():
+    for skill_diff, p_stamina, e_stamina in FIGHTS:
+        win_chance, rounds = ff_combatengine.fight_odds(skill_diff, p_stamina, e_stamina)
+        lose_chance, same_rounds = ff_combatengine.fight_odds(-skill_diff, e_stamina, p_stamina)
+        assert win_chance + lose_chance == pytest.approx(1.0)
+        assert rounds == pytest.approx(same_rounds)
+
+def test_fight_odds_long_fight():
+    #Far more rounds than SOLVE_DEPTH, so solved from the smaller fights up
+    assert ff_combatengine.fight_odds(0, 300, 300)[0] == pytest.approx(0.5)
+
+def test_simulate_leaves_characters_alone():
+    player, enemy = make_fighters(0, 12, 12)
+    ff_combatengine.simulate(player, enemy, 100, seed=3)
+    assert (player.stats['stamina'], enemy.stats['stamina']) == (12, 12)
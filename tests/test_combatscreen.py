@@ -0,0 +1,83 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Tests for the Fighting Fantasy Program
+Includes checks that the combat screen records its actions so that
+    ff_replay seeks to the same state the screen was in
+
+Run with python -m pytest from the top of the repository
+Skipped where Tk can't open a window (e.g. no display)
+"""
+import pytest
+
+tkinter = pytest.importorskip("tkinter")
+
+from fighting_fantasy import ff_character
+from fighting_fantasy import ff_extras
+from fighting_fantasy import ff_replay
+
+SEED = 4
+
+@pytest.fixture
+def root():
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError: #No display to open a window on
+        pytest.skip("Tk can't open a window here")
+    yield root
+    root.destroy()
+
+def start_fight(root):
+    """Returns the ScreenManager of a new fight, taking a checkpoint after every action"""
+    player = ff_character.Character(stats={'skill': 10, 'luck': 12, 'stamina': 100})
+    screens = ff_extras.ScreenManager(root, player, seed=SEED)
+    screens.recording.checkpoint_every = 1
+    screens.start('combat')
+    set_enemy_stamina(screens.combat_gui, 1)
+    root.update()
+    return screens
+
+def set_enemy_stamina(combat_gui, who):
+    """Types a big stamina in for the enemy at index who, as the user would"""
+    combat_gui.entry_vars[(who, 'stamina')].set('100')
+
+def fight_until_hit(combat_gui):
+    """Fights rounds until one isn't a draw, so ROLL LUCK would roll"""
+    combat_gui.fight_round()
+    while combat_gui.last_round == 'draw':
+        combat_gui.fight_round()
+
+def check_seeks(screens):
+    """Checks that seeking to every action gives the state replayed from the start"""
+    recording = screens.recording
+    replayed = ff_replay.ReplaySession(recording.checkpoints[0])
+    for k, action in enumerate(recording.actions, 1):
+        replayed.apply(action)
+        assert recording.seek(k).snapshot() == replayed.snapshot(), action
+    assert replayed.snapshot() == screens.snapshot()
+
+def add_enemy(combat_gui):
+    combat_gui.add_enemy()
+    set_enemy_stamina(combat_gui, 2)
+
+def remove_enemy(combat_gui):
+    combat_gui.remove_enemy(2)
+
+def choose_target(combat_gui):
+    combat_gui.target_var.set(2)
+    combat_gui.target_chosen()
+
+@pytest.mark.parametrize("change_fight", [add_enemy, remove_enemy, choose_target])
+def test_seek_after_changing_the_fight(root, change_fight):
+    screens = start_fight(root)
+    combat_gui = screens.combat_gui
+    if change_fight is not add_enemy:
+        add_enemy(combat_gui)
+    fight_until_hit(combat_gui)
+    change_fight(combat_gui) #Checkpointed just after, with the luck check no longer possible
+    combat_gui.roll_luck()
+    fight_until_hit(combat_gui)
+    combat_gui.roll_luck()
+    root.update()
+    check_seeks(screens)
@@ -0,0 +1,74 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Tests for the Fighting Fantasy Program
+Includes checks that an ff_dice.DiceRoller seed always gives the same rolls,
+    however they're rolled
+
+Run with python -m pytest from the top of the repository
+"""
+import pytest
+from fighting_fantasy import ff_dice
+
+SEED = 12345
+ROLLS = 3000 #More than a BLOCK_SIZE, so the buffer is refilled along the way
+
+@pytest.mark.parametrize("dice", [1, 2])
+def test_roll_matches_roll_many(dice):
+    one_at_a_time = ff_dice.DiceRoller(SEED)
+    all_at_once = ff_dice.DiceRoller(SEED)
+    rolls = [one_at_a_time.roll(dice) for _ in range(ROLLS)]
+    assert rolls == list(all_at_once.roll_many(dice, 6, ROLLS))
+
+def test_listeners_see_the_same_rolls():
+    #A listener takes roll() off its fast path
+    heard = []
+    listened = ff_dice.DiceRoller(SEED)
+    listened.add_listener(lambda sides, faces: heard.extend(faces))
+    quiet = ff_dice.DiceRoller(SEED)
+    assert [listened.roll() for _ in range(ROLLS)] == [quiet.roll() for _ in range(ROLLS)]
+    assert len(heard) == ROLLS
+
+def test_mixed_rolls_repeat():
+    def mixed_rolls(roller):
+        rolls = []
+        for i in range(200):
+            rolls.append(roller.roll(2))
+            rolls.extend(roller.roll_many(1, 6, i % 7))
+            rolls.append(roller.roll(1, 20))
+        return rolls
+    assert mixed_rolls(ff_dice.DiceRoller(SEED)) == mixed_rolls(ff_dice.DiceRoller(SEED))
+
+def test_setstate_repeats_rolls():
+    roller = ff_dice.DiceRoller(SEED)
+    roller.roll_many(2, 6, 100)
+    state = roller.getstate()
+    rolls = list(roller.roll_many(2, 6, ROLLS))
+    resumed = ff_dice.DiceRoller()
+    resumed.setstate(state)
+    assert list(resumed.roll_many(2, 6, ROLLS)) == rolls
+
+def test_faces_in_range():
+    rolls = ff_dice.DiceRoller(SEED).roll_many(1, 6, ROLLS)
+    assert set(rolls) == {1, 2, 3, 4, 5, 6}
+
+def test_numpy_gives_the_same_dice(monkeypatch):
+    pytest.importorskip("numpy")
+    data = bytes(range(256)) * (ff_dice.NUMPY_MIN_DICE // 256)
+    with_numpy = [ff_dice.dice_from_bytes(data, sides) for sides in (6, 20, 256)]
+    monkeypatch.setattr(ff_dice, 'load_numpy', lambda: None)
+    assert [ff_dice.dice_from_bytes(data, sides) for sides in (6, 20, 256)] == with_numpy
+
+def test_numpy_gives_the_same_rolls(monkeypatch):
+    #Big roll_many() calls are made with NumPy arrays, small ones from lists
+    pytest.importorskip("numpy")
+    def mixed_rolls(roller):
+        rolls = [roller.roll(2)]
+        for dice in (2, 1, 3):
+            rolls.extend(roller.roll_many(dice, 6, ff_dice.NUMPY_MIN_DICE))
+            rolls.append(roller.roll())
+        return rolls, roller.getstate()
+    with_numpy = mixed_rolls(ff_dice.DiceRoller(SEED))
+    monkeypatch.setattr(ff_dice, 'load_numpy', lambda: None)
+    assert mixed_rolls(ff_dice.DiceRoller(SEED)) == with_numpy
@@ -0,0 +1,75 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Tests for the Fighting Fantasy Program
+Includes checks that the ff_journal gives back the character and logbooks it
+    saved, through a compaction into the snapshot
+
+Run with python -m pytest from the top of the repository
+"""
+import os
+from fighting_fantasy import ff_character
+from fighting_fantasy import ff_journal
+from fighting_fantasy import ff_logbook
+
+COMPACT_EVERY = 10 #Low enough for a few changes to be compacted more than once
+
+def open_journal(tmp_path):
+    """Returns a Journal in tmp_path and what it loads, as (Journal, Character, logs)"""
+    journal = ff_journal.Journal(str(tmp_path / "journal.jsonl"),
+                                 str(tmp_path / "snapshot.json"))
+    character, logs = journal.load(ff_character.Character())
+    return journal, character, logs
+
+def watched_logbook(journal, logs, book):
+    """Returns a bounded Logbook holding the saved logs of book, journaled"""
+    logbook = ff_logbook.Logbook(bounded=True)
+    logbook.restore(logs[book])
+    journal.watch_logbook(logbook, book)
+    return logbook
+
+def log_strings(logs):
+    return [log.log_string for log in logs]
+
+def test_round_trip_through_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(ff_journal, 'COMPACT_EVERY', COMPACT_EVERY)
+    journal, character, logs = open_journal(tmp_path)
+    journal.watch_character(character)
+    sheet_logs = watched_logbook(journal, logs, 'sheet')
+    combat_logs = watched_logbook(journal, logs, 'combat')
+    for i in range(1, 26):
+        character.set_stat('stamina', i)
+        sheet_logs.add_log(ff_logbook.Log('stat_up', "Stamina", 1))
+    character.set_detail('name', "Zed")
+    character.set_detail('potion', "Potion of Skill")
+    combat_logs.add_log(ff_logbook.Log('take_dmg', "Zed", 2))
+    log = ff_logbook.Log('roll_die', "Zed", 3)
+    log.append_log(ff_logbook.Log('roll_die_ext', 4))
+    combat_logs.add_log(log)
+    sheet_logs.add_log(ff_logbook.Log("Pre-formatted"))
+    journal.close()
+    assert os.path.exists(tmp_path / "snapshot.json")
+
+    journal, loaded, logs = open_journal(tmp_path)
+    journal.close()
+    assert repr(loaded) == repr(character)
+    assert loaded.inventory == character.inventory
+    assert log_strings(logs['sheet']) == log_strings(sheet_logs.log_list)
+    assert log_strings(logs['combat']) == log_strings(combat_logs.log_list)
+
+def test_half_written_entry_is_dropped(tmp_path):
+    journal, character, logs = open_journal(tmp_path)
+    journal.watch_character(character)
+    character.set_stat('skill', 11)
+    journal.close()
+    with open(tmp_path / "journal.jsonl", 'a') as journal_file:
+        journal_file.write('[2, "stat", "luck", 1')
+
+    journal, loaded, logs = open_journal(tmp_path)
+    loaded.add_listener(journal.character_changed)
+    loaded.set_stat('luck', 8)
+    journal.close()
+    journal, loaded, logs = open_journal(tmp_path)
+    journal.close()
+    assert (loaded.stats['skill'], loaded.stats['luck']) == (11, 8)
@@ -0,0 +1,137 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Tests for the Fighting Fantasy Program
+Includes checks that an ff_logsearch LogIndex finds exactly the archived logs
+    a plain scan of the archive would, in memory and saved with the history
+
+Run with python -m pytest from the top of the repository
+"""
+import os
+import pytest
+from fighting_fantasy import ff_history
+from fighting_fantasy import ff_logbook
+from fighting_fantasy import ff_logsearch
+
+def attack_log(name, roll1, roll2, power):
+    """Returns an attack log, as the combat screen makes them"""
+    log = ff_logbook.Log('roll_die', name, roll1)
+    log.append_log(ff_logbook.Log('roll_die_ext', roll2))
+    log.append_log(ff_logbook.Log('total_roll', roll1 + roll2))
+    log.append_log(ff_logbook.Log('attack_val', power))
+    return log
+
+def make_logs(count):
+    """Returns count logs of several kinds, about two characters"""
+    logs = []
+    for i in range(count):
+        name = ("Champion", "Orc")[i % 2]
+        kind = i % 5
+        if kind == 0:
+            logs.append(ff_logbook.Log('take_dmg', name, 2))
+        elif kind == 1:
+            logs.append(ff_logbook.Log('roll_luck', i % 12 + 1))
+        elif kind == 2:
+            logs.append(attack_log(name, i % 6 + 1, i % 4 + 1, i % 6 + i % 4 + 10))
+        elif kind == 3:
+            logs.append(ff_logbook.Log('space'))
+        else:
+            logs.append(ff_logbook.Log("Pre-formatted, never found"))
+    return logs
+
+def scan(logs, key=None, name=None, low=None, high=None):
+    """Returns the positions of the matching logs, by reading every one"""
+    if (key, name, low, high) == (None, None, None, None):
+        return list(range(len(logs)))
+    positions = []
+    for position, log in enumerate(logs):
+        records = ff_logsearch.log_record(log)
+        if not records:
+            continue
+        if key is not None and key not in [record[0] for record in records]:
+            continue
+        first_key, *first_args = records[0]
+        if name is not None and (first_key not in ff_logsearch.NAME_ARG
+                                 or first_args[ff_logsearch.NAME_ARG[first_key]] != name):
+            continue
+        if low is not None or high is not None:
+            numbers = [next((arg for arg in args if isinstance(arg, int)), None)
+                       for record_key, *args in records if key is None or record_key == key]
+            if not any(number is not None and (low is None or number >= low)
+                       and (high is None or number <= high) for number in numbers):
+                continue
+        positions.append(position)
+    return positions
+
+QUERIES = [{}, {'key': 'take_dmg'}, {'name': "Orc"}, {'name': "orc", 'key': 'roll_die'},
+           {'key': 'roll_luck', 'high': 4}, {'key': 'attack_val', 'low': 14},
+           {'key': 'roll_die_ext', 'low': 2, 'high': 3}, {'low': 12}, {'key': 'missing'},
+           {'name': "Nobody"}, {'key': 'roll_luck', 'low': 20}]
+
+def make_archive(logs, history=None, index=None):
+    if index is None:
+        index = ff_logsearch.LogIndex()
+    archive = ff_logbook.LogArchive(history, index)
+    for log in logs:
+        archive.add_log(log)
+    return archive
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_scan(query):
+    logs = make_logs(200)
+    archive = make_archive(logs)
+    results = ff_logsearch.search(archive, **query)
+    expected = scan(logs, **{name: (value.title() if name == 'name' else value)
+                             for name, value in query.items()})
+    assert results.positions == expected
+    assert [log.log_string for log in results] == [logs[k].log_string for k in expected]
+
+def test_saved_index_reloads(tmp_path):
+    logs = make_logs(300)
+    history_path = str(tmp_path / "history.dat")
+    terms_path = history_path + ff_logsearch.TERMS_SUFFIX
+
+    def open_archive():
+        history = ff_history.HistoryFile(history_path)
+        records = ff_history.HistoryFile(history_path + ff_logsearch.RECORDS_SUFFIX)
+        index = ff_logsearch.LogIndex(records, terms_path)
+        return history, records, ff_logbook.LogArchive(history, index)
+
+    def close_archive(history, records, archive):
+        archive.flush()
+        archive.index.save_terms()
+        history.close()
+        records.close()
+
+    history, records, archive = open_archive()
+    for log in logs[:200]:
+        archive.add_log(log)
+    close_archive(history, records, archive)
+    history, records, archive = open_archive() #Posting lists read back from the terms file
+    assert len(archive.index) == 200
+    for log in logs[200:]:
+        archive.add_log(log)
+    expected = ff_logsearch.search(archive, key='roll_luck', high=4).positions
+    assert expected == scan(logs, key='roll_luck', high=4)
+    assert [log.log_string for log in archive[:]] == [log.log_string for log in logs]
+    close_archive(history, records, archive)
+
+    os.remove(terms_path)
+    history, records, archive = open_archive() #Rebuilt from the records
+    assert ff_logsearch.search(archive, key='roll_luck', high=4).positions == expected
+    history.close()
+    records.close()
+
+def test_parse_filter():
+    assert ff_logsearch.parse_filter("take_dmg name=Champion >=2") == \
+           {'key': 'take_dmg', 'name': "Champion", 'low': 2, 'high': None}
+    assert ff_logsearch.parse_filter("roll_luck <5") == \
+           {'key': 'roll_luck', 'name': None, 'low': None, 'high': 4}
+    assert ff_logsearch.parse_filter(">3 <=6") == {'key': None, 'name': None, 'low': 4, 'high': 6}
+    assert ff_logsearch.parse_filter("=7")['low'] == ff_logsearch.parse_filter("=7")['high'] == 7
+
+@pytest.mark.parametrize("text", ["roll_luck <x", "dance", "name"])
+def test_parse_filter_errors(text):
+    with pytest.raises(ValueError):
+        ff_logsearch.parse_filter(text)
@@ -0,0 +1,46 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Tests for the Fighting Fantasy Program
+Includes checks that ff_oddstable.build_table writes a table that agrees with
+    ff_combatengine, replacing the old one whole while it is still mapped
+
+Run with python -m pytest from the top of the repository
+"""
+import os
+import struct
+from fighting_fantasy import ff_combatengine
+from fighting_fantasy import ff_oddstable
+
+MAX_SKILL_DIFF = 1 #Small enough for the tests to build tables quickly
+MAX_STAMINA = 4
+
+def test_table_matches_solver(tmp_path):
+    path = str(tmp_path / "odds.bin")
+    ff_oddstable.build_table(path, MAX_SKILL_DIFF, MAX_STAMINA)
+    table = ff_oddstable.OddsTable(path)
+    for skill_diff in range(MAX_SKILL_DIFF * -1, MAX_SKILL_DIFF + 1):
+        for p_stamina in range(MAX_STAMINA + 1):
+            for e_stamina in range(MAX_STAMINA + 1):
+                odds = ff_combatengine.fight_odds(skill_diff, p_stamina, e_stamina)
+                #The table holds single precision floats
+                expected = struct.unpack(ff_oddstable.ENTRY_FORMAT,
+                                         struct.pack(ff_oddstable.ENTRY_FORMAT, *odds))
+                assert table.lookup(skill_diff, p_stamina, e_stamina) == expected
+    assert table.lookup(MAX_SKILL_DIFF + 1, 1, 1) is None
+    table.data.close()
+
+def test_rebuild_replaces_table(tmp_path):
+    path = str(tmp_path / "odds.bin")
+    ff_oddstable.build_table(path, MAX_SKILL_DIFF, MAX_STAMINA)
+    old = ff_oddstable.OddsTable(path)
+    before = old.lookup(0, 2, 2)
+    ff_oddstable.build_table(path, MAX_SKILL_DIFF + 1, MAX_STAMINA)
+    assert os.listdir(str(tmp_path)) == ["odds.bin"]
+    #The mapped table is the old file, which the rebuild left alone
+    assert old.max_skill_diff == MAX_SKILL_DIFF and old.lookup(0, 2, 2) == before
+    new = ff_oddstable.OddsTable(path)
+    assert new.max_skill_diff == MAX_SKILL_DIFF + 1 and new.lookup(0, 2, 2) == before
+    old.data.close()
+    new.data.close()
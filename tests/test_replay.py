@@ -0,0 +1,91 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Tests for the Fighting Fantasy Program
+Includes checks that an ff_replay Recording seeks, from its checkpoints, to
+    the same state as replaying every action from the start
+
+Run with python -m pytest from the top of the repository
+"""
+import json
+import pytest
+from fighting_fantasy import ff_character
+from fighting_fantasy import ff_dice
+from fighting_fantasy import ff_replay
+
+SEED = 99
+CHECKPOINT_EVERY = 3 #Small, so the session below crosses several checkpoints
+
+def enemy_snapshot(name, stamina):
+    return ff_replay.character_snapshot(
+        ff_character.Character(name=name, stats={'skill': 7, 'stamina': stamina}))
+
+#A session touching every kind of action, as the screens record them
+ACTIONS = ([['detail', 0, 'name', "Zed"], ['reroll'], ['change', 'rations', 2], ['eat'],
+            ['test_luck'], ['new_fight', enemy_snapshot("Orc", 12)]]
+           + [['fight'], ['luck']] * 3
+           + [['add_enemy', enemy_snapshot("Goblin", 6)], ['stat', 2, 'stamina', 8],
+              ['target', 2], ['rule', 'one_at_a_time'], ['fight'], ['fight'], ['luck'],
+              ['remove_enemy', 1], ['fight'], ['end_fight'], ['stat', 0, 'luck', 3],
+              ['detail', 0, 'potion', "Potion of Fortune"], ['test_luck']])
+
+def record_session(actions):
+    """Returns the Recording of a session taking the actions, each recorded
+    just after it was carried out"""
+    player = ff_character.Character(stats={'skill': 10, 'luck': 9, 'stamina': 20})
+    start = ff_replay.make_snapshot(player, None, 'together', None, ff_dice.DiceRoller(SEED))
+    live = ff_replay.ReplaySession(start)
+    recording = ff_replay.Recording(start, snapshot_source=live.snapshot,
+                                    checkpoint_every=CHECKPOINT_EVERY)
+    for action in actions:
+        live.apply(action)
+        recording.record(action)
+    return recording, live
+
+def test_seek_matches_replay_from_start():
+    recording, live = record_session(ACTIONS)
+    assert len(recording.checkpoints) == len(ACTIONS) // CHECKPOINT_EVERY + 1
+    replayed = ff_replay.ReplaySession(recording.checkpoints[0])
+    assert recording.seek(0).snapshot() == replayed.snapshot()
+    for k, action in enumerate(ACTIONS, 1):
+        replayed.apply(action)
+        assert recording.seek(k).snapshot() == replayed.snapshot(), action
+    assert replayed.snapshot() == live.snapshot()
+
+def test_restore_action_puts_state_back():
+    recording, live = record_session(ACTIONS[:8])
+    saved = live.snapshot()
+    live.apply(['fight'])
+    recording.record(['fight'])
+    live.apply(['restore', saved])
+    recording.record(['restore', saved])
+    assert recording.seek(len(recording)).snapshot() == saved
+
+def test_seek_out_of_range():
+    recording, live = record_session(ACTIONS[:4])
+    with pytest.raises(IndexError):
+        recording.seek(5)
+    with pytest.raises(IndexError):
+        recording.seek(-1)
+
+def test_save_and_load(tmp_path):
+    recording, live = record_session(ACTIONS)
+    path = str(tmp_path / "recording.json")
+    recording.save(path)
+    loaded = ff_replay.load_recording(path)
+    assert loaded.actions == recording.actions
+    assert loaded.seek(len(loaded)).snapshot() == live.snapshot()
+    assert loaded.seek(7).snapshot() == recording.seek(7).snapshot()
+
+def test_load_refuses_other_versions(tmp_path):
+    path = tmp_path / "recording.json"
+    path.write_text(json.dumps({'version': ff_replay.RECORDING_VERSION - 1, 'checkpoint_every': 1,
+                                'checkpoints': [], 'actions': []}))
+    with pytest.raises(ValueError):
+        ff_replay.load_recording(str(path))
+
+def test_unknown_action():
+    recording, live = record_session([])
+    with pytest.raises(ValueError):
+        live.apply(['dance'])
@@ -0,0 +1,125 @@
+"""
+Alasdair Smith
+Started 18/10/2026
+
+Tests for the Fighting Fantasy Program
+Includes checks of ff_undo's UndoHistory - undo and redo of whole steps of
+    changes to characters and other state
+
+Run with python -m pytest from the top of the repository
+"""
+from fighting_fantasy import ff_character
+from fighting_fantasy import ff_undo
+
+def make_watched(stats=None):
+    """Returns a new UndoHistory, and a Character it watches"""
+    history = ff_undo.UndoHistory()
+    character = ff_character.Character(stats=stats or {'skill': 10, 'luck': 9, 'stamina': 20})
+    history.watch(character)
+    return history, character
+
+def fields(character):
+    return ff_undo.character_fields(character)
+
+def test_undo_and_redo_steps():
+    history, character = make_watched()
+    states = [fields(character)]
+    for stamina in (18, 16, 14):
+        character.set_stat('stamina', stamina)
+        character.set_detail('potion', "Potion {}".format(stamina))
+        history.end_step()
+        states.append(fields(character))
+    for state in reversed(states[:-1]):
+        assert history.undo()
+        assert fields(character) == state
+    assert not history.undo()
+    for state in states[1:]:
+        assert history.redo()
+        assert fields(character) == state
+    assert not history.redo()
+
+def test_step_keeps_first_and_last_values():
+    history, character = make_watched()
+    for stamina in range(19, 0, -1): #One step however many changes, e.g. TO THE END
+        character.set_stat('stamina', stamina)
+    history.end_step()
+    assert len(history.undo_steps) == 1
+    assert len(history.undo_steps[0]) == 1
+    history.undo()
+    assert character.stats['stamina'] == 20
+    history.redo()
+    assert character.stats['stamina'] == 1
+
+def test_changed_back_is_not_a_step():
+    history, character = make_watched()
+    character.set_stat('luck', 8)
+    character.set_stat('luck', 9)
+    history.end_step()
+    assert history.undo_steps == []
+    assert not history.undo()
+
+def test_new_step_clears_redo():
+    history, character = make_watched()
+    character.set_stat('skill', 11)
+    history.end_step()
+    history.undo()
+    character.set_stat('skill', 7)
+    history.end_step()
+    assert not history.redo()
+    history.undo()
+    assert character.stats['skill'] == 10
+
+def test_changes_after_undo_know_their_value_before():
+    history, character = make_watched()
+    character.set_stat('stamina', 12)
+    history.end_step()
+    history.undo() #Back to 20, which the next change must start from
+    character.set_stat('stamina', 15)
+    history.end_step()
+    history.undo()
+    assert character.stats['stamina'] == 20
+
+def test_other_state_with_its_own_setter():
+    class Fight:
+        last_round = None
+    def set_field(obj, field, value):
+        setattr(obj, field, value)
+    history, character = make_watched()
+    fight = Fight()
+    fight.last_round = 'p_win'
+    history.changed(fight, 'last_round', None, 'p_win', set_field)
+    character.set_stat('stamina', 18)
+    history.end_step()
+    history.undo()
+    assert (fight.last_round, character.stats['stamina']) == (None, 20)
+    history.redo()
+    assert (fight.last_round, character.stats['stamina']) == ('p_win', 18)
+
+def test_on_step_called_once_per_step():
+    started = []
+    history = ff_undo.UndoHistory(on_step=lambda: started.append(True))
+    character = ff_character.Character()
+    history.watch(character)
+    character.set_stat('skill', 5)
+    character.set_stat('luck', 5)
+    assert len(started) == 1
+    history.end_step()
+    character.set_stat('skill', 6)
+    assert len(started) == 2
+
+def test_unwatch():
+    history, character = make_watched()
+    character.set_stat('stamina', 10)
+    history.end_step()
+    history.unwatch(character)
+    assert character.listeners == ()
+    character.set_stat('stamina', 5) #No longer kept
+    history.end_step()
+    assert len(history.undo_steps) == 1
+    history.undo() #The step from before still sets them back
+    assert character.stats['stamina'] == 20
+    history.watch(character) #Starts afresh from the value now
+    character.set_stat('stamina', 4)
+    history.end_step()
+    history.undo()
+    assert character.stats['stamina'] == 20